@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Student, Session, Attendance, Assessment, StudentAssessment, Project, StudyMaterial, Certificate, Notification, InternshipAgenda
+from .broadcasts import dispatch_broadcast
+from .models import Broadcast, MaterialUpload, Student, Session, Attendance, Assessment, StudentAssessment, Project, StudyMaterial, Certificate, Notification, InternshipAgenda
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
@@ -40,10 +41,17 @@ class ProjectAdmin(admin.ModelAdmin):
 
 @admin.register(StudyMaterial)
 class StudyMaterialAdmin(admin.ModelAdmin):
-    list_display = ('title', 'file_type', 'uploaded_by', 'uploaded_at', 'file_size')
+    list_display = ('title', 'file_type', 'uploaded_by', 'uploaded_at', 'file_size', 'page_count')
     list_filter = ('file_type', 'uploaded_at')
     search_fields = ('title', 'description', 'uploaded_by__username')
 
+@admin.register(MaterialUpload)
+class MaterialUploadAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'uploaded_by', 'status', 'received', 'total_size', 'material', 'created_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('filename', 'title', 'uploaded_by__username')
+    readonly_fields = ('received', 'status', 'error', 'material', 'completed_at')
+
 @admin.register(Certificate)
 class CertificateAdmin(admin.ModelAdmin):
     list_display = ('student', 'title', 'issued_date', 'verification_code')
@@ -58,6 +66,20 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ('is_read', 'created_at')
     search_fields = ('student__user__username', 'student__full_name', 'title', 'message')
 
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ('title', 'college', 'branch', 'year', 'status', 'delivered', 'recipients', 'created_at')
+    list_filter = ('status', 'notification_type', 'created_at')
+    search_fields = ('title', 'message')
+    readonly_fields = ('status', 'recipients', 'delivered', 'created_by', 'started_at', 'finished_at')
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+        if not change:
+            dispatch_broadcast(obj)
+
 @admin.register(InternshipAgenda)
 class InternshipAgendaAdmin(admin.ModelAdmin):
     list_display = ('week', 'order')
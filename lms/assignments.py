@@ -0,0 +1,29 @@
+"""
+Materialisation of per-student assessment rows.
+
+Every active ``Assessment`` needs a ``StudentAssessment`` row for each student
+before the assessment page can list it. Missing pairs are found with a single
+anti-join and inserted in one ``bulk_create`` instead of one query per
+assessment.
+"""
+from .models import Assessment, StudentAssessment
+
+
+def missing_assessment_ids(student, assessments=None):
+    """Return the ids of ``assessments`` the student has no row for yet."""
+    if assessments is None:
+        assessments = Assessment.objects.filter(is_active=True)
+    assigned = StudentAssessment.objects.filter(student=student).values('assessment_id')
+    return list(assessments.exclude(id__in=assigned).values_list('id', flat=True))
+
+
+def materialize_student_assessments(student, assessments=None):
+    """Create the missing ``StudentAssessment`` rows for ``student``; return how many were added."""
+    missing = missing_assessment_ids(student, assessments)
+    if not missing:
+        return 0
+    StudentAssessment.objects.bulk_create(
+        [StudentAssessment(student=student, assessment_id=assessment_id) for assessment_id in missing],
+        ignore_conflicts=True,
+    )
+    return len(missing)
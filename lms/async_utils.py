@@ -0,0 +1,33 @@
+"""
+Helpers for the async (ASGI) views.
+
+Templates must not touch the database from inside the event loop, so the user
+and the header badge count are resolved up front through ``sync_to_async``
+and handed to the template as plain values.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render
+
+from .notifications import get_unread_count
+
+
+def async_login_required(view):
+    """``login_required`` for ``async def`` views; also replaces the lazy ``request.user``."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await sync_to_async(get_user)(request)
+        request.user = user
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def arender(request, template_name, context):
+    """Render ``template_name`` from an async view without lazy database access."""
+    context.setdefault('unread_notification_count', await sync_to_async(get_unread_count)(request.user.pk))
+    return render(request, template_name, context)
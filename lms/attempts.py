@@ -0,0 +1,42 @@
+"""
+Race-free attempt numbering for mock tests.
+
+``MockTestAttemptCounter`` holds the last attempt number handed out for each
+(student, mock test). Numbers are allocated with a single ``UPDATE ... SET
+last_attempt = last_attempt + n`` that takes the row's write lock, so two
+concurrent submissions can never receive the same number; the unique
+constraint on ``StudentMockTest`` backs this up.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max
+
+from .models import MockTestAttemptCounter, StudentMockTest
+
+
+def allocate_attempt_numbers(student_id, mock_test_id, count=1):
+    """
+    Reserve ``count`` consecutive attempt numbers and return the first one.
+
+    Must be called inside ``transaction.atomic()`` together with the insert of
+    the attempts so a rolled-back submission gives its numbers back.
+    """
+    counters = MockTestAttemptCounter.objects.filter(student_id=student_id, mock_test_id=mock_test_id)
+    if not counters.update(last_attempt=F('last_attempt') + count):
+        # No counter yet: continue after any attempts stored without one (e.g. added in the admin).
+        last = StudentMockTest.objects.filter(student_id=student_id, mock_test_id=mock_test_id).aggregate(
+            last=Max('attempt_number'),
+        )['last'] or 0
+        try:
+            with transaction.atomic():
+                MockTestAttemptCounter.objects.create(
+                    student_id=student_id, mock_test_id=mock_test_id, last_attempt=last + count,
+                )
+            return last + 1
+        except IntegrityError:
+            # Another submission created the counter first.
+            counters.update(last_attempt=F('last_attempt') + count)
+    return counters.values_list('last_attempt', flat=True).get() - count + 1
+
+
+def allocate_attempt_number(student_id, mock_test_id):
+    return allocate_attempt_numbers(student_id, mock_test_id)
@@ -0,0 +1,414 @@
+"""
+Synthetic data and latency benchmarks for every route in ``lms.urls``.
+
+``seed`` fills the database with a reproducible cohort: the same ``seed``
+and scale always produce the same rows, with dates relative to today so the
+upcoming/past splits of the pages stay realistic. ``route_requests`` turns
+each URL pattern into one request against that data, or a reason it is
+skipped, so a new route shows up in the results as soon as it is added.
+
+``run_client`` replays the requests through the Django test client,
+in-process, timing each one and counting its queries. ``run_http`` fires
+the GET requests concurrently at a running server and reads the query
+counts from the ``Server-Timing`` header of ``QueryInstrumentationMiddleware``.
+``manage.py seed_benchmark_data`` and ``manage.py benchmark`` wrap them; run
+both with ``LMS_DATABASE_PATH`` pointing at a scratch database so the
+benchmark cohort stays out of the real one.
+"""
+import json
+import math
+import random
+import re
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as dtime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.test import Client
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from . import urls
+from .catalog import bump_catalog_version
+from .instrumentation import record_queries
+from .models import (
+    Assessment, Attendance, Broadcast, Certificate, InternshipAgenda, MaterialUpload, MockInterview, MockTest,
+    MockTestAttemptCounter, Notification, OfferLetter, Project, Session, Student, StudentMockTest, StudyMaterial,
+)
+from .search import get_backend
+
+USERNAME_PREFIX = 'bench-'
+PASSWORD = 'benchmark'
+# Catalog rows created by seed() start with this, so clear() can find them.
+TITLE_PREFIX = '[bench] '
+BATCH_SIZE = 1000
+
+TOPICS = ['Python', 'Django', 'JavaScript', 'React', 'SQL', 'Git', 'Data Structures', 'System Design']
+MENTORS = ['Asha Rao', 'Vikram Iyer', 'Meera Nair', 'Rahul Verma', 'Sara Thomas']
+COLLEGES = ['Tech University', 'Engineering College', 'Science Institute', 'State University']
+BRANCHES = ['Computer Science', 'Information Technology', 'Electronics', 'Computer Engineering']
+YEARS = ['1st', '2nd', '3rd', '4th']
+
+MOCK_TESTS = 10
+QUESTIONS_PER_TEST = 10
+ASSESSMENTS = 12
+STUDY_MATERIALS = 40
+AGENDA_WEEKS = 12
+
+# Routes that can't be replayed as one repeatable request.
+SKIPPED_ROUTES = {
+    'logout': 'ends the benchmark session',
+    'event_stream': 'long-lived server-sent events stream',
+    'broadcast_notification': 'fans a notification out to every student',
+    'cancel_mock_interview': 'deletes the interview, so it cannot be repeated',
+    'quiz_result': 'needs the receipt of a queued quiz submission',
+    'quiz_result_status': 'needs the receipt of a queued quiz submission',
+}
+
+QUERY_STRINGS = {
+    'search': '?q=python',
+    'session_search': '?topic=Python',
+}
+
+BenchRequest = namedtuple('BenchRequest', ['name', 'method', 'path', 'data', 'content_type'])
+
+SERVER_TIMING_QUERIES_RE = re.compile(r'\bdb;[^,]*desc="(\d+) queries"')
+
+
+def username(number):
+    return f'{USERNAME_PREFIX}{number:05d}'
+
+
+def clear():
+    """Delete everything ``seed`` created."""
+    for material in StudyMaterial.objects.filter(title__startswith=TITLE_PREFIX).exclude(file='').exclude(file=None):
+        material.file.delete(save=False)
+    with transaction.atomic():
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        for model in (Session, MockTest, Assessment, StudyMaterial, Broadcast):
+            model.objects.filter(title__startswith=TITLE_PREFIX).delete()
+        InternshipAgenda.objects.filter(week__startswith=TITLE_PREFIX).delete()
+    bump_catalog_version(Session, StudyMaterial, InternshipAgenda)
+    get_backend().rebuild()
+
+
+def seed(students=200, sessions=120, attendance_rate=0.8, mock_attempts=5, notifications=30, random_seed=0):
+    """
+    Create a synthetic cohort and catalog; returns ``{model name: rows created}``.
+
+    Three quarters of the ``sessions`` are in the past; each student has an
+    attendance row for every past session (present with probability
+    ``attendance_rate``), ``mock_attempts`` mock test attempts and
+    ``notifications`` notifications. The first student is staff, so the
+    mentor-only routes can be benchmarked as them.
+    """
+    rng = random.Random(random_seed)
+    today = date.today()
+    now = timezone.now()
+    created = Counter()
+
+    def create(model, rows):
+        model.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        created[model.__name__] += len(rows)
+
+    with transaction.atomic():
+        password = make_password(PASSWORD)
+        create(User, [
+            User(username=username(number), password=password, is_staff=number == 0,
+                 first_name='Bench', last_name=f'Student {number}', email=f'{username(number)}@example.com')
+            for number in range(students)
+        ])
+        users = list(User.objects.filter(username__startswith=USERNAME_PREFIX).order_by('username'))
+        create(Student, [
+            Student(
+                user=user, full_name=user.get_full_name(), college=rng.choice(COLLEGES),
+                branch=rng.choice(BRANCHES), year=rng.choice(YEARS), enrollment_date=today - timedelta(days=90),
+            )
+            for user in users
+        ])
+        cohort = list(Student.objects.filter(user__username__startswith=USERNAME_PREFIX).order_by('id'))
+
+        past = int(sessions * 0.75)
+        create(Session, [
+            Session(
+                title=f'{TITLE_PREFIX}{topic} session {number}', topic=topic, mentor=rng.choice(MENTORS),
+                date=today + timedelta(days=number - past), start_time=dtime(rng.choice([10, 14, 17])),
+                end_time=dtime(rng.choice([11, 15, 18])), description=f'{topic} hands-on session',
+                recording_url=f'https://videos.example.com/{number}' if number < past and rng.random() < 0.6 else '',
+                is_completed=number < past,
+            )
+            for number, topic in ((number, rng.choice(TOPICS)) for number in range(sessions))
+        ])
+        completed = list(
+            Session.objects.filter(title__startswith=TITLE_PREFIX, is_completed=True).order_by('id').values_list('id', flat=True)
+        )
+        create(Attendance, [
+            Attendance(student=student, session_id=session_id, is_present=rng.random() < attendance_rate)
+            for student in cohort for session_id in completed
+        ])
+
+        questions = [
+            {'question': f'Question {number}', 'options': ['A', 'B', 'C', 'D'], 'correct': 'B'}
+            for number in range(QUESTIONS_PER_TEST)
+        ]
+        create(MockTest, [
+            MockTest(title=f'{TITLE_PREFIX}{TOPICS[number % len(TOPICS)]} mock test {number}',
+                     topic=TOPICS[number % len(TOPICS)], questions=questions, total_marks=QUESTIONS_PER_TEST)
+            for number in range(MOCK_TESTS)
+        ])
+        mock_tests = list(MockTest.objects.filter(title__startswith=TITLE_PREFIX).order_by('id').values_list('id', flat=True))
+        attempts, counters = [], Counter()
+        for student in cohort:
+            for _ in range(mock_attempts):
+                mock_test_id = rng.choice(mock_tests)
+                counters[student.id, mock_test_id] += 1
+                attempts.append(StudentMockTest(
+                    student=student, mock_test_id=mock_test_id, score=rng.randint(0, QUESTIONS_PER_TEST),
+                    max_score=QUESTIONS_PER_TEST, is_completed=True, attempt_number=counters[student.id, mock_test_id],
+                    submitted_at=now - timedelta(days=rng.randint(0, 60)),
+                ))
+        create(StudentMockTest, attempts)
+        create(MockTestAttemptCounter, [
+            MockTestAttemptCounter(student_id=student_id, mock_test_id=mock_test_id, last_attempt=last)
+            for (student_id, mock_test_id), last in counters.items()
+        ])
+
+        create(Notification, [
+            Notification(
+                student=student, title=f'Update {number}', message='A new session has been scheduled.',
+                notification_type=rng.choice(['info', 'success', 'warning']), is_read=rng.random() < 0.7,
+                created_at=now - timedelta(hours=rng.randint(0, 24 * 60)),
+            )
+            for student in cohort for number in range(notifications)
+        ])
+
+        create(Assessment, [
+            Assessment(title=f'{TITLE_PREFIX}{TOPICS[number % len(TOPICS)]} assessment {number}',
+                       topic=TOPICS[number % len(TOPICS)], due_date=now + timedelta(days=number - ASSESSMENTS // 2))
+            for number in range(ASSESSMENTS)
+        ])
+        create(StudyMaterial, [
+            StudyMaterial(title=f'{TITLE_PREFIX}{TOPICS[number % len(TOPICS)]} notes {number}',
+                          description='Lecture notes and exercises', file_type='pdf',
+                          file_url=f'https://files.example.com/{number}.pdf', uploaded_by=users[0])
+            for number in range(STUDY_MATERIALS)
+        ])
+        create(InternshipAgenda, [
+            InternshipAgenda(week=f'{TITLE_PREFIX}Week {number + 1}', agenda='Build and review a feature',
+                             deliverables='Pull request and demo', order=number)
+            for number in range(AGENDA_WEEKS)
+        ])
+        create(Project, [
+            Project(student=student, title=f'Project {number}', description='Capstone project', status='submitted',
+                    submitted_at=now - timedelta(days=rng.randint(0, 60)))
+            for student in cohort for number in range(2)
+        ])
+        create(Certificate, [
+            Certificate(student=student, title='Full Stack Development', verification_code=f'BENCH{student.id:07d}')
+            for student in cohort
+        ])
+        create(OfferLetter, [
+            OfferLetter(student=student, start_date=today + timedelta(days=30), compensation=15000) for student in cohort
+        ])
+        create(MockInterview, [MockInterview(student=student, title='Technical interview') for student in cohort])
+
+        # One stored file so the download route serves real bytes.
+        material = StudyMaterial(title=f'{TITLE_PREFIX}Downloadable notes', file_type='other', uploaded_by=users[0])
+        material.file.save('bench-notes.txt', ContentFile(b'benchmark notes\n' * 4096), save=False)
+        material.file_size = material.file.size
+        material.save()
+        created['StudyMaterial'] += 1
+        MaterialUpload.objects.create(title=f'{TITLE_PREFIX}Upload', filename='bench.pdf', total_size=1024, uploaded_by=users[0])
+        Broadcast.objects.create(title=f'{TITLE_PREFIX}Broadcast', message='Hello', created_by=users[0])
+
+    # bulk_create skips the signals that keep the catalog cache and search index current.
+    bump_catalog_version(Session, StudyMaterial, InternshipAgenda)
+    get_backend().rebuild()
+    return dict(created)
+
+
+def route_requests(user):
+    """Return ``(requests, skipped)``: a ``BenchRequest`` per route of ``lms.urls`` and ``{name: reason}`` for the rest."""
+    student = Student.objects.get(user=user)
+    ids = {
+        'session_id': Session.objects.filter(is_completed=True).order_by('-date').values_list('id', flat=True).first(),
+        'mock_test_id': MockTest.objects.filter(is_active=True).values_list('id', flat=True).first(),
+        'material_id': StudyMaterial.objects.exclude(file='').exclude(file=None).values_list('id', flat=True).first(),
+        'upload_id': MaterialUpload.objects.filter(uploaded_by=user).values_list('id', flat=True).first(),
+        'notification_id': Notification.objects.filter(student=student).values_list('id', flat=True).first(),
+        'broadcast_id': Broadcast.objects.values_list('id', flat=True).first(),
+    }
+    answers = {'answers': json.dumps({'0': 'B', '1': 'A'})}
+    writes = {
+        'mark_attendance': ({'attendance': [{'student_id': student.id, 'is_present': True}]}, 'application/json'),
+        'quiz_submit': (answers, None),
+        'mock_test_quiz_submit': (answers, None),
+        'start_material_upload': ({'filename': 'bench.pdf', 'size': 1024}, 'application/json'),
+        'mark_all_notifications_read': ({}, None),
+        'mark_notification_read': ({}, None),
+        'submit_project': ({'title': 'Benchmark project', 'description': 'Load test'}, 'application/json'),
+        'schedule_mock_interview': (
+            {'title': 'Benchmark interview', 'description': 'Load test', 'scheduled_date': '2030-01-01T10:00'}, None,
+        ),
+    }
+
+    requests, skipped, seen = [], {}, set()
+    for pattern in urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or pattern.name in seen:
+            continue
+        seen.add(pattern.name)
+        if pattern.name in SKIPPED_ROUTES:
+            skipped[pattern.name] = SKIPPED_ROUTES[pattern.name]
+            continue
+        missing = [key for key in pattern.pattern.converters if ids.get(key) is None]
+        if missing:
+            skipped[pattern.name] = f'no benchmark data for {", ".join(missing)}'
+            continue
+        kwargs = {key: ids[key] for key in pattern.pattern.converters}
+        path = reverse(f'{urls.app_name}:{pattern.name}', kwargs=kwargs) + QUERY_STRINGS.get(pattern.name, '')
+        if pattern.name in writes:
+            data, content_type = writes[pattern.name]
+            if content_type:
+                data = json.dumps(data)
+            requests.append(BenchRequest(pattern.name, 'POST', path, data, content_type))
+        else:
+            requests.append(BenchRequest(pattern.name, 'GET', path, None, None))
+    return requests, skipped
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def summarize(request, timings, queries, statuses, wall_seconds=None):
+    result = {
+        'method': request.method,
+        'path': request.path,
+        'requests': len(timings),
+        'status': {str(status): count for status, count in sorted(statuses.items())},
+        'latency_ms': {
+            'p50': round(percentile(timings, 50), 3),
+            'p95': round(percentile(timings, 95), 3),
+            'p99': round(percentile(timings, 99), 3),
+            'mean': round(sum(timings) / len(timings), 3),
+            'max': round(max(timings), 3),
+        },
+        'queries': {'mean': round(sum(queries) / len(queries), 2), 'max': max(queries)} if queries else None,
+    }
+    if wall_seconds:
+        result['requests_per_second'] = round(len(timings) / wall_seconds, 1)
+    return result
+
+
+def _client_request(client, request):
+    if request.method == 'GET':
+        response = client.get(request.path)
+    elif request.content_type:
+        response = client.post(request.path, request.data, content_type=request.content_type)
+    else:
+        response = client.post(request.path, request.data)
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def run_client(requests, user, iterations=50, warmup=3):
+    """Time ``iterations`` sequential requests per route through the test client, after ``warmup`` untimed ones."""
+    # A view that raises is reported as a 500 instead of ending the run.
+    client = Client(raise_request_exception=False)
+    client.force_login(user)
+    results = {}
+    for request in requests:
+        for _ in range(warmup):
+            _client_request(client, request)
+        timings, queries, statuses = [], [], Counter()
+        for _ in range(iterations):
+            with record_queries() as recorder:
+                start = time.perf_counter()
+                response = _client_request(client, request)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(recorder.count)
+            statuses[response.status_code] += 1
+        results[request.name] = summarize(request, timings, queries, statuses)
+    return results
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def _http_get(opener, url, cookie):
+    request = urllib.request.Request(url, headers={'Cookie': cookie})
+    start = time.perf_counter()
+    try:
+        with opener.open(request, timeout=60) as response:
+            response.read()
+            status, headers = response.status, response.headers
+    except urllib.error.HTTPError as error:
+        error.read()
+        status, headers = error.code, error.headers
+    elapsed = (time.perf_counter() - start) * 1000
+    match = SERVER_TIMING_QUERIES_RE.search(headers.get('Server-Timing', ''))
+    return elapsed, status, int(match.group(1)) if match else None
+
+
+def run_http(base_url, requests, cookie, total=200, concurrency=8, warmup=3):
+    """
+    Send ``total`` GETs per route from ``concurrency`` threads to the server at ``base_url``.
+
+    ``cookie`` is the ``Cookie`` header of a logged-in session. Writes are
+    left to ``run_client``: concurrent writes to SQLite measure lock waits
+    rather than the views.
+    """
+    opener = urllib.request.build_opener(_NoRedirect)
+    base_url = base_url.rstrip('/')
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='lms-bench') as executor:
+        for request in requests:
+            if request.method != 'GET':
+                continue
+            url = base_url + request.path
+            for _ in range(warmup):
+                _http_get(opener, url, cookie)
+            start = time.perf_counter()
+            samples = list(executor.map(lambda _: _http_get(opener, url, cookie), range(total)))
+            wall_seconds = time.perf_counter() - start
+            timings = [elapsed for elapsed, status, queries in samples]
+            statuses = Counter(status for elapsed, status, queries in samples)
+            queries = [queries for elapsed, status, queries in samples if queries is not None]
+            results[request.name] = summarize(request, timings, queries, statuses, wall_seconds)
+    return results
+
+
+def compare(previous, current):
+    """Yield ``(phase, route, old p95, new p95, old max queries, new max queries)`` for routes in both results."""
+    for phase in ('client', 'http'):
+        old_routes, new_routes = previous.get(phase) or {}, current.get(phase) or {}
+        for route, new in new_routes.items():
+            old = old_routes.get(route)
+            if old is None:
+                continue
+            yield (
+                phase, route, old['latency_ms']['p95'], new['latency_ms']['p95'],
+                (old['queries'] or {}).get('max'), (new['queries'] or {}).get('max'),
+            )
+
+
+def scale():
+    """Row counts of the tables whose size drives the benchmark."""
+    return {
+        'students': Student.objects.count(),
+        'sessions': Session.objects.count(),
+        'attendance': Attendance.objects.count(),
+        'mock_test_attempts': StudentMockTest.objects.count(),
+        'notifications': Notification.objects.count(),
+    }
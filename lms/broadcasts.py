@@ -0,0 +1,163 @@
+"""
+Fan-out of announcements to a cohort.
+
+A ``Broadcast`` is delivered as one ``Notification`` per targeted student so
+the feed, the unread badge and their indexes keep working unchanged. Rows are
+inserted with ``bulk_create`` in chunks, each chunk in its own short
+transaction, so a 20k-student announcement never holds the write lock for
+more than one chunk. Delivery runs on a single background thread in the web
+process (``LMS_BROADCAST_IN_PROCESS``) or from the ``broadcast_notification``
+management command, which also resumes deliveries cut short by a restart.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .events import get_broker, publish_notification, student_channel
+from .models import Broadcast, Notification, Student
+from .notifications import UNREAD_KEY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_STALE_AFTER = 600
+
+# One worker: broadcasts are delivered one after another so they never compete
+# with each other for the database write lock.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='lms-broadcast')
+
+
+def target_students(broadcast):
+    students = Student.objects.all()
+    if broadcast.college:
+        students = students.filter(college=broadcast.college)
+    if broadcast.branch:
+        students = students.filter(branch=broadcast.branch)
+    if broadcast.year:
+        students = students.filter(year=broadcast.year)
+    return students
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _publish_live(broadcast, student_ids):
+    broker = get_broker()
+    live = [student_id for student_id in student_ids if broker.has_subscribers(student_channel(student_id))]
+    if live:
+        # Rows inserted with ignore_conflicts come back without primary keys, so read them again.
+        for notification in Notification.objects.filter(broadcast=broadcast, student_id__in=live):
+            publish_notification(notification)
+
+
+def deliver_broadcast(broadcast, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Create the notifications of ``broadcast`` in chunks and return new rows per second.
+
+    Progress is written to ``broadcast.delivered`` after every chunk. Students
+    who already have the notification are skipped, so an interrupted delivery
+    can be run again to finish it.
+    """
+    students = target_students(broadcast)
+    broadcast.recipients = students.count()
+    broadcast.status = 'sending'
+    broadcast.started_at = timezone.now()
+    broadcast.save(update_fields=['recipients', 'status', 'started_at'])
+
+    started = time.monotonic()
+    delivered = already_delivered = Notification.objects.filter(broadcast=broadcast).count()
+    try:
+        recipients = students.order_by('id').values_list('id', 'user_id').iterator(chunk_size=chunk_size)
+        for chunk in _chunks(recipients, chunk_size):
+            with transaction.atomic():
+                # Students who already have it (an earlier, interrupted run) are skipped and not counted.
+                existing = set(Notification.objects.filter(
+                    broadcast=broadcast, student_id__in=[student_id for student_id, user_id in chunk],
+                ).order_by().values_list('student_id', flat=True))
+                chunk = [(student_id, user_id) for student_id, user_id in chunk if student_id not in existing]
+                if not chunk:
+                    continue
+                # ignore_conflicts guards against a second worker delivering the same broadcast.
+                Notification.objects.bulk_create([
+                    Notification(
+                        student_id=student_id,
+                        broadcast=broadcast,
+                        title=broadcast.title,
+                        message=broadcast.message,
+                        notification_type=broadcast.notification_type,
+                        created_at=broadcast.created_at,
+                    )
+                    for student_id, user_id in chunk
+                ], ignore_conflicts=True)
+                # Count the rows rather than the chunk: conflicting rows were not inserted.
+                delivered = Notification.objects.filter(broadcast=broadcast).count()
+                Broadcast.objects.filter(pk=broadcast.pk).update(delivered=delivered)
+            # bulk_create() bypasses the signals that reset the unread badge and push live events.
+            cache.delete_many([UNREAD_KEY.format(user_id=user_id) for student_id, user_id in chunk])
+            _publish_live(broadcast, [student_id for student_id, user_id in chunk])
+    except Exception:
+        Broadcast.objects.filter(pk=broadcast.pk).update(status='failed', finished_at=timezone.now())
+        raise
+
+    broadcast.delivered = delivered
+    broadcast.status = 'sent'
+    broadcast.finished_at = timezone.now()
+    broadcast.save(update_fields=['delivered', 'status', 'finished_at'])
+
+    elapsed = time.monotonic() - started
+    inserted = delivered - already_delivered
+    rate = inserted / elapsed if elapsed else 0
+    logger.info(
+        'Broadcast %s delivered to %d students (%d new) in %.2fs (%.0f rows/s)',
+        broadcast.pk, delivered, inserted, elapsed, rate,
+    )
+    return rate
+
+
+def stale_broadcasts(stale_after=None):
+    """
+    Broadcasts left ``sending`` by a worker that stopped, e.g. a web process that was restarted.
+
+    A delivery takes seconds, so one still ``sending`` ``LMS_BROADCAST_STALE_AFTER``
+    seconds after it started is taken to be abandoned.
+    """
+    if stale_after is None:
+        stale_after = getattr(settings, 'LMS_BROADCAST_STALE_AFTER', DEFAULT_STALE_AFTER)
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    return Broadcast.objects.filter(status='sending', started_at__lt=cutoff)
+
+
+def _deliver_in_background(broadcast_id, chunk_size):
+    try:
+        deliver_broadcast(Broadcast.objects.get(pk=broadcast_id), chunk_size)
+    except Exception:
+        logger.exception('Broadcast %s failed', broadcast_id)
+    finally:
+        close_old_connections()
+
+
+def dispatch_broadcast(broadcast, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Queue ``broadcast`` for delivery on the background worker.
+
+    When ``LMS_BROADCAST_IN_PROCESS`` is off the broadcast stays ``pending``
+    for ``manage.py broadcast_notification --pending``.
+    """
+    if not getattr(settings, 'LMS_BROADCAST_IN_PROCESS', True):
+        return
+    # Start only after the Broadcast row is committed and visible to the worker thread.
+    transaction.on_commit(lambda: _executor.submit(_deliver_in_background, broadcast.pk, chunk_size))
@@ -0,0 +1,88 @@
+"""
+Shared cache for the catalog pages: sessions, recordings, study material and
+the internship agenda.
+
+These pages list the same rows for every student, so the listing part of each
+page is rendered once into an HTML fragment and stored in the default cache;
+only the personalised header is rendered per request. Fragment keys embed a
+per-model version which the signal handlers in ``lms.signals`` (admin saves
+and deletes), the populate scripts and bulk writers bump, so stale fragments
+are never read again and simply expire.
+
+The cache backend is chosen with ``LMS_CACHE_BACKEND`` in the settings. Only
+the ``file`` and ``redis`` backends are shared between processes; with
+``locmem`` (the default outside the sqlite-prod profile) a version bump made
+by a separate process such as the populate scripts never reaches the web
+processes, which keep their fragments until they expire or restart.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import HAS_RECORDING, InternshipAgenda, Session, StudyMaterial
+
+VERSION_KEY = 'lms:catalog-version:{model}'
+FRAGMENT_KEY = 'lms:catalog-fragment:{name}:{template_version}:{version}'
+# Bump when a fragment template changes so shared caches drop the old markup.
+FRAGMENT_TEMPLATE_VERSION = 2
+
+# model: the model whose version keys the fragment; queryset: rows it lists;
+# context_name: the variable the fragment template loops over.
+Fragment = namedtuple('Fragment', ['model', 'queryset', 'template', 'context_name'])
+
+FRAGMENTS = {
+    'sessions': Fragment(Session, Session.objects.order_by('-date'), 'lms/session_list.html', 'sessions'),
+    'recordings': Fragment(
+        Session,
+        Session.objects.filter(HAS_RECORDING).order_by('-date', '-start_time'),
+        'lms/recording_list.html',
+        'recordings',
+    ),
+    'study_material': Fragment(
+        StudyMaterial, StudyMaterial.objects.order_by('-uploaded_at'), 'lms/material_list.html', 'materials',
+    ),
+    'internship_agenda': Fragment(
+        InternshipAgenda, InternshipAgenda.objects.all(), 'lms/agenda_list.html', 'agenda_items',
+    ),
+}
+
+
+def _fragment_timeout():
+    return getattr(settings, 'LMS_CATALOG_CACHE_TIMEOUT', 86400)
+
+
+def _version_key(model):
+    return VERSION_KEY.format(model=model._meta.label_lower)
+
+
+def bump_catalog_version(*models):
+    """Make every cached fragment built from ``models`` stale."""
+    for model in models:
+        key = _version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, timeout=None)
+
+
+async def acatalog_fragment(name):
+    """Return the rendered listing ``name`` from the cache, rendering it on a miss."""
+    fragment = FRAGMENTS[name]
+    version = await cache.aget_or_set(_version_key(fragment.model), 1, timeout=None)
+    key = FRAGMENT_KEY.format(name=name, template_version=FRAGMENT_TEMPLATE_VERSION, version=version)
+    html = await cache.aget(key)
+    if html is None:
+        # Read where the router sends this request (the replica for @read_replica views).
+        queryset = fragment.queryset.all()
+        rows = [row async for row in queryset]
+        html = render_to_string(fragment.template, {fragment.context_name: rows})
+        timeout = _fragment_timeout()
+        if queryset.db != DEFAULT_DB_ALIAS:
+            # A lagging replica may not have the rows behind this version yet: keep it briefly.
+            timeout = min(timeout, getattr(settings, 'LMS_PRIMARY_PIN_SECONDS', 10))
+        await cache.aset(key, str(html), timeout)
+    return mark_safe(html)
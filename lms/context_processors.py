@@ -0,0 +1,19 @@
+from functools import partial
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+
+from .notifications import get_unread_count
+
+
+def notification_badge(request):
+    """Expose the unread notification count; it is only looked up if a template renders it."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {'unread_notification_count': 0}
+    return {'unread_notification_count': partial(get_unread_count, user.pk)}
+
+
+def live_events(request):
+    """Only pages served by the ASGI app load the live events script; the WSGI app cannot stream them."""
+    return {'live_events': getattr(settings, 'LMS_LIVE_EVENTS', True) and isinstance(request, ASGIRequest)}
@@ -0,0 +1,95 @@
+"""
+Database connection tuning, the read-only/replica aliases and read routing.
+
+With ``LMS_DATABASE_PROFILE = 'sqlite-prod'`` every new SQLite connection is
+configured by ``configure_sqlite_connection`` (wired to ``connection_created``
+in ``lms.signals``) with the ``LMS_SQLITE_PRAGMAS`` of the settings: WAL so
+readers never block the writer, ``synchronous=NORMAL`` (safe under WAL),
+memory-mapped reads and a larger page cache. The profile also adds a
+``readonly`` alias that opens the same file with ``mode=ro``; setting
+``LMS_REPLICA_DATABASE_PATH`` adds a ``replica`` alias on a copy of the
+database instead. ``read_database()`` names whichever one is configured.
+
+``ReadReplicaRouter`` sends every write to ``default``. Reads go to
+``default`` too unless a request is routed to the read alias: the
+``read_replica`` view decorator (or ``LMS_REPLICA_VIEWS``) marks views whose
+safe requests may read stale data, and ``ReadReplicaMiddleware`` applies the
+mark while pinning a client to the primary for a few seconds after any write
+so it always reads its own writes.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Pragmas that change the database file itself; a read-only connection can't set them.
+PERSISTENT_PRAGMAS = {'journal_mode'}
+
+
+def is_read_only(connection):
+    return 'mode=ro' in str(connection.settings_dict['NAME'])
+
+
+def configure_sqlite_connection(connection):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'LMS_SQLITE_PRAGMAS', {})
+    read_only = is_read_only(connection)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if read_only and name in PERSISTENT_PRAGMAS:
+                continue
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if read_only:
+            cursor.execute('PRAGMA query_only = ON')
+
+
+def read_database():
+    """Alias for queries that never write: ``LMS_READ_DATABASE`` when configured, else ``default``."""
+    alias = getattr(settings, 'LMS_READ_DATABASE', DEFAULT_DB_ALIAS)
+    return alias if alias in connections.databases else DEFAULT_DB_ALIAS
+
+
+# Alias reads are routed to for the current request; None means the default.
+_read_alias = ContextVar('lms_read_alias', default=None)
+
+
+def read_replica(view):
+    """Mark ``view`` as safe to serve from the read alias (it never needs to read its own writes)."""
+    view.read_replica = True
+    return view
+
+
+@contextmanager
+def reads_from(alias):
+    """Route reads inside the block to ``alias`` (``None`` restores the default)."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def read_aliases():
+    return {DEFAULT_DB_ALIAS, read_database()}
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The read aliases hold the same data, so objects loaded from either may be related.
+        if obj1._state.db in read_aliases() and obj2._state.db in read_aliases():
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Read aliases receive the schema by replication, never by migrate.
+        if db != DEFAULT_DB_ALIAS and db in read_aliases():
+            return False
+        return None
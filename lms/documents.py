@@ -0,0 +1,287 @@
+"""
+PDF documents issued to students.
+
+Rendering a document with ReportLab costs tens of milliseconds of CPU, so
+generated files are kept in ``OfferLetter.offer_letter_file`` and
+``Certificate.certificate_file`` and reused for as long as the document's
+content hash matches. The hash covers every field printed on the document plus
+its ``*_TEMPLATE_VERSION``; bump the version whenever a layout below changes so
+stale files are regenerated.
+"""
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+from io import BytesIO
+from types import SimpleNamespace
+
+from django.core.files.base import ContentFile
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import landscape, letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+OFFER_LETTER_TEMPLATE_VERSION = 1
+CERTIFICATE_TEMPLATE_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def _offer_letter_styles():
+    styles = getSampleStyleSheet()
+
+    # Define custom styles
+    title_style = ParagraphStyle(
+        'Title',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=1,  # Center alignment
+    )
+    company_style = ParagraphStyle(
+        'Company',
+        parent=styles['Normal'],
+        fontSize=14,
+        spaceAfter=20,
+        alignment=1,
+    )
+    return title_style, company_style, styles['Normal'], styles['Heading4']
+
+
+def offer_letter_hash(offer_letter):
+    """Return the content hash of everything printed on ``offer_letter``."""
+    fields = [
+        OFFER_LETTER_TEMPLATE_VERSION,
+        offer_letter.pk,
+        offer_letter.student.full_name,
+        offer_letter.title,
+        offer_letter.company,
+        offer_letter.start_date.isoformat(),
+        offer_letter.compensation,
+        offer_letter.reporting_to,
+        offer_letter.location,
+        offer_letter.issued_date.isoformat(),
+    ]
+    return _hash_fields(fields)
+
+
+def _hash_fields(fields):
+    return hashlib.sha256('\x1f'.join(str(field) for field in fields).encode('utf-8')).hexdigest()[:32]
+
+
+def render_offer_letter_pdf(offer_letter):
+    """Render ``offer_letter`` to PDF and return the bytes."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    title_style, company_style, normal_style, bold_style = _offer_letter_styles()
+
+    # Build the PDF content
+    content = []
+
+    # Company header
+    content.append(Paragraph("Manac Infotech Pvt Ltd", title_style))
+    content.append(Paragraph("Excellence in Technology", company_style))
+    content.append(Spacer(1, 0.5*inch))
+
+    # Date
+    content.append(Paragraph(f"Date: {offer_letter.issued_date.strftime('%B %d, %Y')}", normal_style))
+    content.append(Spacer(1, 0.5*inch))
+
+    # Salutation
+    content.append(Paragraph(f"Dear {offer_letter.student.full_name},", bold_style))
+    content.append(Spacer(1, 0.25*inch))
+
+    # Body
+    content.append(Paragraph(f"We are delighted to extend this offer of employment for the position of <b>{offer_letter.title}</b> with {offer_letter.company}. We were very impressed with your background and skills, and we are confident that you will make a significant contribution to our team.", normal_style))
+    content.append(Spacer(1, 0.25*inch))
+
+    # Offer details table
+    data = [
+        ['Start Date', offer_letter.start_date.strftime('%B %d, %Y')],
+        ['Compensation', f"₹{offer_letter.compensation}/Month"],
+        ['Reporting To', offer_letter.reporting_to],
+        ['Location', offer_letter.location],
+    ]
+
+    table = Table(data, colWidths=[2*inch, 3*inch])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]))
+    content.append(table)
+    content.append(Spacer(1, 0.25*inch))
+
+    # Closing
+    content.append(Paragraph("Please review the attached document for full terms and conditions. By accepting this offer, you agree to the policies and procedures of our company.", normal_style))
+    content.append(Spacer(1, 0.5*inch))
+    content.append(Paragraph("Sincerely,", normal_style))
+    content.append(Paragraph("Manac Infotech Pvt Ltd", bold_style))
+
+    # Build the PDF
+    doc.build(content)
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=None)
+def _certificate_styles():
+    styles = getSampleStyleSheet()
+    name_style = ParagraphStyle(
+        'CertificateName',
+        parent=styles['Heading1'],
+        fontSize=26,
+        spaceBefore=12,
+        spaceAfter=12,
+        alignment=1,
+    )
+    centered_style = ParagraphStyle(
+        'CertificateBody',
+        parent=styles['Normal'],
+        fontSize=13,
+        leading=18,
+        alignment=1,
+    )
+    return name_style, centered_style
+
+
+def render_certificate_pdf(certificate):
+    """Render ``certificate`` to PDF and return the bytes."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(letter))
+    title_style, company_style, normal_style, bold_style = _offer_letter_styles()
+    name_style, centered_style = _certificate_styles()
+
+    content = []
+
+    # Header
+    content.append(Paragraph("Manac Infotech Pvt Ltd", title_style))
+    content.append(Paragraph("Certificate of Completion", company_style))
+    content.append(Spacer(1, 0.4*inch))
+
+    # Recipient
+    content.append(Paragraph("This is to certify that", centered_style))
+    content.append(Paragraph(certificate.student.full_name, name_style))
+    content.append(Paragraph(f"has successfully completed <b>{certificate.title}</b>.", centered_style))
+    if certificate.description:
+        content.append(Spacer(1, 0.2*inch))
+        content.append(Paragraph(certificate.description, centered_style))
+    content.append(Spacer(1, 0.5*inch))
+
+    # Issue details
+    content.append(Paragraph(f"Issued on {certificate.issued_date.strftime('%B %d, %Y')}", centered_style))
+    content.append(Paragraph(f"Verification code: {certificate.verification_code}", centered_style))
+
+    doc.build(content)
+    return buffer.getvalue()
+
+
+def certificate_hash(certificate):
+    """Return the content hash of everything printed on ``certificate``."""
+    fields = [
+        CERTIFICATE_TEMPLATE_VERSION,
+        certificate.pk,
+        certificate.student.full_name,
+        certificate.title,
+        certificate.description,
+        certificate.issued_date.isoformat(),
+        certificate.verification_code,
+    ]
+    return _hash_fields(fields)
+
+
+def offer_letter_snapshot(offer_letter):
+    """Plain, picklable copy of the fields ``render_offer_letter_pdf`` reads."""
+    return SimpleNamespace(
+        pk=offer_letter.pk,
+        student=SimpleNamespace(full_name=offer_letter.student.full_name),
+        title=offer_letter.title,
+        company=offer_letter.company,
+        start_date=offer_letter.start_date,
+        compensation=offer_letter.compensation,
+        reporting_to=offer_letter.reporting_to,
+        location=offer_letter.location,
+        issued_date=offer_letter.issued_date,
+    )
+
+
+def certificate_snapshot(certificate):
+    """Plain, picklable copy of the fields ``render_certificate_pdf`` reads."""
+    return SimpleNamespace(
+        pk=certificate.pk,
+        student=SimpleNamespace(full_name=certificate.student.full_name),
+        title=certificate.title,
+        description=certificate.description,
+        issued_date=certificate.issued_date,
+        verification_code=certificate.verification_code,
+    )
+
+
+def document_filename(prefix, pk, content_hash):
+    return f'{prefix}_{pk}_{content_hash}.pdf'
+
+
+def stored_name(field_file, filename):
+    """Storage name ``filename`` gets under the field's ``upload_to``."""
+    return field_file.field.generate_filename(field_file.instance, filename)
+
+
+def is_current(field_file, filename):
+    """True when ``field_file`` already holds ``filename`` on its storage."""
+    return bool(field_file) and field_file.name == stored_name(field_file, filename) and field_file.storage.exists(field_file.name)
+
+
+def store_pdf(field_file, filename, pdf_data):
+    """Write ``pdf_data`` to ``field_file`` at exactly ``filename``, replacing any previous file.
+
+    ``Storage.save`` would add a random suffix when the name is taken (two
+    concurrent first downloads), and a suffixed name never matches
+    ``is_current`` again, so the file is overwritten in place instead: written
+    to a temporary file and renamed over the target. Concurrent writers
+    produce the same bytes, so the last rename wins harmlessly.
+
+    The model instance is not saved; callers persist the field themselves.
+    """
+    storage = field_file.storage
+    name = stored_name(field_file, filename)
+    previous = field_file.name
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        path = None
+
+    if path is not None:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as part:
+            part.write(pdf_data)
+        os.chmod(part.name, getattr(storage, 'file_permissions_mode', None) or 0o644)
+        os.replace(part.name, path)
+    else:
+        # Storages without local paths: free the name first so it is kept.
+        if storage.exists(name):
+            storage.delete(name)
+        name = storage.save(name, ContentFile(pdf_data))
+
+    if previous and previous != name and storage.exists(previous):
+        storage.delete(previous)
+    field_file.name = name
+
+
+def get_offer_letter_pdf(offer_letter):
+    """
+    Return an open file with the PDF for ``offer_letter``.
+
+    The stored ``offer_letter_file`` is reused when its name carries the current
+    content hash; otherwise the letter is rendered, saved over the old file and
+    the field updated.
+    """
+    filename = document_filename('offer_letter', offer_letter.pk, offer_letter_hash(offer_letter))
+    if not is_current(offer_letter.offer_letter_file, filename):
+        store_pdf(offer_letter.offer_letter_file, filename, render_offer_letter_pdf(offer_letter))
+        offer_letter.save(update_fields=['offer_letter_file'])
+    return offer_letter.offer_letter_file.open('rb')
@@ -0,0 +1,147 @@
+"""
+File downloads with resume support.
+
+``serve_file`` answers conditional GETs from an ETag built from the file's
+size and modification time, honours single ``Range`` requests (guarded by
+``If-Range``) so interrupted downloads resume where they stopped, and hands
+the transfer to the front-end server when ``LMS_DOWNLOAD_OFFLOAD`` is set:
+
+``'x-accel-redirect'``
+    nginx serves ``LMS_DOWNLOAD_ACCEL_PREFIX`` + the path relative to
+    ``MEDIA_ROOT`` from an ``internal`` location.
+``'x-sendfile'``
+    Apache mod_xsendfile (or lighttpd) serves the absolute path.
+
+Without offloading the file goes out as a ``FileResponse``. Under gunicorn
+that is passed to ``wsgi.file_wrapper``, which copies it with
+``os.sendfile`` from the current offset for ``Content-Length`` bytes, so
+partial responses are zero-copy as well.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import content_disposition_header, parse_etags, quote_etag
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """Read-only view of ``length`` bytes of an open file from its current position."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+        self.name = file.name
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def file_etag(stat):
+    return quote_etag(f'{stat.st_size:x}-{stat.st_mtime_ns:x}')
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single-range ``Range`` header.
+
+    Returns ``None`` when the header should be ignored (absent, malformed or
+    multi-range) and raises ``ValueError`` when the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            raise ValueError('Empty suffix range')
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError('Range not satisfiable')
+    return start, end
+
+
+def _offload_response(path, offload):
+    response = HttpResponse()
+    if offload == 'x-accel-redirect':
+        relative = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        prefix = getattr(settings, 'LMS_DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + relative
+    elif offload == 'x-sendfile':
+        response['X-Sendfile'] = path
+    else:
+        raise ValueError(f'Unknown LMS_DOWNLOAD_OFFLOAD: {offload!r}')
+    # Let the front-end server fill these in from the file it sends.
+    del response['Content-Type']
+    return response
+
+
+def serve_file(request, path, filename=None, as_attachment=True):
+    """Return a download response for the file at ``path``; raises ``FileNotFoundError`` if it is missing."""
+    stat = os.stat(path)
+    etag = file_etag(stat)
+    filename = filename or os.path.basename(path)
+
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    offload = getattr(settings, 'LMS_DOWNLOAD_OFFLOAD', None)
+    if offload:
+        response = _offload_response(path, offload)
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    else:
+        response = _file_response(request, path, stat.st_size, etag, filename, as_attachment)
+    response['ETag'] = etag
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _file_response(request, path, size, etag, filename, as_attachment):
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    # A stale If-Range means the file changed since the partial download started: send it all again.
+    if not if_range or if_range.strip() == etag:
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    file = open(path, 'rb')
+    if byte_range is None:
+        return FileResponse(file, as_attachment=as_attachment, filename=filename, content_type=content_type)
+
+    start, end = byte_range
+    file.seek(start)
+    response = FileResponse(
+        FileRange(file, end - start + 1), as_attachment=as_attachment, filename=filename, content_type=content_type,
+    )
+    response.status_code = 206
+    response['Content-Length'] = end - start + 1
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -0,0 +1,156 @@
+"""
+Live events for the browser: an in-process pub/sub broker and its publishers.
+
+Model signals (and bulk writers such as ``lms.broadcasts``) publish events to
+channels; the ``event_stream`` view subscribes a connected student to
+``student:<id>`` and ``sessions`` and relays everything as server-sent events.
+
+``InProcessBroker`` only reaches subscribers connected to the same process,
+which is enough for a single ASGI worker. Point ``LMS_EVENT_BROKER`` at another
+class with the same ``subscribe``/``publish`` interface (e.g. one backed by
+Redis pub/sub) when running several workers.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.template.defaultfilters import date as date_filter, time as time_filter
+from django.utils.module_loading import import_string
+
+SESSIONS_CHANNEL = 'sessions'
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def student_channel(student_id):
+    return f'student:{student_id}'
+
+
+class Subscription:
+    """Queue of events for one connected client, fed from any thread."""
+
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = channels
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if self.queue.full():
+            # A stalled client loses its oldest events rather than blocking publishers.
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout):
+        """Return the next ``(event, data)`` or ``None`` after ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        """Subscribe to ``channels``; must be called from the event loop that will read the events."""
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in channels:
+                self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].discard(subscription)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+    def has_subscribers(self, channel):
+        return channel in self._subscribers
+
+    def publish(self, channel, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver((event, data))
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        broker_class = import_string(getattr(settings, 'LMS_EVENT_BROKER', 'lms.events.InProcessBroker'))
+        _broker = broker_class()
+    return _broker
+
+
+def notification_event(notification, unread=None):
+    data = {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'notification_type': notification.notification_type,
+        'created_at': notification.created_at.isoformat(),
+    }
+    if unread is not None:
+        data['unread'] = unread
+    return data
+
+
+def session_event(session):
+    """Session fields for the browser, with labels formatted as the dashboard template formats them."""
+    return {
+        'id': session.id,
+        'title': session.title,
+        'topic': session.topic,
+        'mentor': session.mentor,
+        'date': str(session.date),
+        'start_time': str(session.start_time),
+        'end_time': str(session.end_time),
+        'is_completed': session.is_completed,
+        'date_label': date_filter(session.date, 'M d'),
+        'time_label': f'{time_filter(session.start_time)} - {time_filter(session.end_time)}',
+    }
+
+
+def publish_notification(notification, unread=None):
+    get_broker().publish(student_channel(notification.student_id), 'notification', notification_event(notification, unread))
+
+
+def format_sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+async def stream_events(channels, initial=(), heartbeat=15, max_duration=300):
+    """
+    Async generator of server-sent event frames for ``channels``.
+
+    ``initial`` events are sent first. A comment line every ``heartbeat``
+    seconds keeps proxies from closing an idle stream, and the stream ends after
+    ``max_duration`` seconds; ``EventSource`` reconnects on its own.
+    """
+    subscription = get_broker().subscribe(channels)
+    try:
+        yield f'retry: {heartbeat * 1000}\n\n'
+        for event, data in initial:
+            yield format_sse(event, data)
+        deadline = time.monotonic() + max_duration
+        while time.monotonic() < deadline:
+            message = await subscription.get(timeout=heartbeat)
+            yield ': keep-alive\n\n' if message is None else format_sse(*message)
+    finally:
+        subscription.close()
@@ -0,0 +1,134 @@
+"""
+Constant-memory attendance exports.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` so neither the
+HTTP endpoint nor the management command ever holds the attendance table in
+memory. Two layouts are available:
+
+``rows``
+    one line per attendance record with the student and session columns.
+``matrix``
+    one line per student and one column per session (``P``/``A``, blank when
+    the student has no record for that session).
+"""
+import csv
+from itertools import groupby
+
+from django.utils.dateparse import parse_date
+
+from .db import read_database
+from .models import Attendance, Session
+
+LAYOUTS = ('rows', 'matrix')
+DEFAULT_CHUNK_SIZE = 2000
+
+ROW_HEADER = [
+    'student_id', 'username', 'full_name', 'college', 'branch', 'year',
+    'session_id', 'session_title', 'session_date', 'is_present', 'marked_at',
+]
+STUDENT_HEADER = ['student_id', 'username', 'full_name', 'college', 'branch', 'year']
+
+
+class ExportError(ValueError):
+    pass
+
+
+def _parse_date(name, value):
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ExportError(f'{name} must be a date in YYYY-MM-DD format, not {value!r}.')
+    return parsed
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value, for ``csv.writer`` streaming."""
+
+    def write(self, value):
+        return value
+
+
+def attendance_queryset(college=None, branch=None, year=None, date_from=None, date_to=None):
+    """
+    Attendance filtered by cohort (student college/branch/year) and session date range.
+
+    Dates are ``YYYY-MM-DD`` strings (or ``date`` objects); a malformed one raises
+    ``ExportError`` here, before any row is streamed.
+    """
+    # Explicit alias: a streamed export is still reading after the request's routing has ended.
+    attendances = Attendance.objects.using(read_database())
+    if college:
+        attendances = attendances.filter(student__college=college)
+    if branch:
+        attendances = attendances.filter(student__branch=branch)
+    if year:
+        attendances = attendances.filter(student__year=year)
+    if date_from:
+        attendances = attendances.filter(session__date__gte=_parse_date('date_from', str(date_from)))
+    if date_to:
+        attendances = attendances.filter(session__date__lte=_parse_date('date_to', str(date_to)))
+    return attendances
+
+
+def attendance_rows(attendances, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the header and one list per attendance record."""
+    yield ROW_HEADER
+    records = attendances.order_by('session__date', 'session_id', 'student_id').values_list(
+        'student_id', 'student__user__username', 'student__full_name', 'student__college',
+        'student__branch', 'student__year', 'session_id', 'session__title', 'session__date',
+        'is_present', 'marked_at',
+    )
+    for record in records.iterator(chunk_size=chunk_size):
+        yield list(record)
+
+
+def attendance_matrix(attendances, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the header and one list per student with a ``P``/``A`` cell per session."""
+    sessions = list(
+        Session.objects.using(attendances.db).filter(id__in=attendances.values('session_id'))
+        .order_by('date', 'start_time', 'id')
+        .values_list('id', 'title', 'date')
+    )
+    columns = {session_id: index for index, (session_id, title, date) in enumerate(sessions)}
+    yield STUDENT_HEADER + [f'{date:%Y-%m-%d} {title}' for session_id, title, date in sessions]
+
+    records = attendances.order_by('student_id').values_list(
+        'student_id', 'student__user__username', 'student__full_name', 'student__college',
+        'student__branch', 'student__year', 'session_id', 'is_present',
+    )
+    for student, marks in groupby(records.iterator(chunk_size=chunk_size), key=lambda record: record[:6]):
+        cells = [''] * len(sessions)
+        for record in marks:
+            cells[columns[record[6]]] = 'P' if record[7] else 'A'
+        yield list(student) + cells
+
+
+def export_rows(layout, attendances, chunk_size=DEFAULT_CHUNK_SIZE):
+    if layout == 'matrix':
+        return attendance_matrix(attendances, chunk_size)
+    return attendance_rows(attendances, chunk_size)
+
+
+def stream_csv(rows):
+    """Yield CSV-encoded lines for ``rows``."""
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(rows, path):
+    """Write ``rows`` to ``path`` with openpyxl's write-only workbook (optional dependency)."""
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError('XLSX export requires openpyxl (pip install openpyxl).')
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Attendance')
+    count = -1
+    for count, row in enumerate(rows):
+        sheet.append(row)
+    workbook.save(path)
+    return max(count, 0)
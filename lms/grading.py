@@ -0,0 +1,212 @@
+"""
+Precompiled answer keys for quiz and mock test grading.
+
+A question set is compiled once into an ``AnswerKey``: for every question the
+option-to-index lookup, the set of correct option indices and its weight. Keys
+are cached in-process by ``(test id, version)`` where the version is a hash of
+the raw questions JSON, so a submission only has to hash the stored text to
+find its key and never re-decodes the questions while the test is unchanged.
+
+Questions use the format stored in ``MockTest.questions``::
+
+    {'question': '...', 'options': ['a', 'b', ...], 'correct': 'b'}
+
+``correct`` may also be a list of options for multi-select questions, and an
+optional ``weight`` (default 1) sets how much a question is worth.
+"""
+import hashlib
+import json
+import threading
+from collections import namedtuple
+
+from django.db.models import TextField
+from django.db.models.functions import Cast
+
+DEFAULT_QUIZ_ID = 'default'
+
+DEFAULT_QUIZ_QUESTIONS = [
+    {
+        'question': 'What is the output of print(2 + 3)?',
+        'options': ['5', '23', 'Error', 'None'],
+        'correct': '5'
+    },
+    {
+        'question': 'Which keyword is used to define a function in Python?',
+        'options': ['def', 'function', 'fun', 'define'],
+        'correct': 'def'
+    },
+    {
+        'question': 'What does the len() function return?',
+        'options': ['Length of a string or list', 'Type of variable', 'Memory usage', 'File size'],
+        'correct': 'Length of a string or list'
+    },
+    {
+        'question': 'Which data type is mutable in Python?',
+        'options': ['List', 'Tuple', 'String', 'Integer'],
+        'correct': 'List'
+    },
+    {
+        'question': 'What is the correct way to comment in Python?',
+        'options': ['# This is a comment', '// This is a comment', '/* This is a comment */', '-- This is a comment'],
+        'correct': '# This is a comment'
+    },
+    {
+        'question': 'Which statement is used for conditional execution?',
+        'options': ['if', 'for', 'while', 'def'],
+        'correct': 'if'
+    },
+    {
+        'question': 'What is the built-in function to get user input?',
+        'options': ['print', 'input', 'read', 'get'],
+        'correct': 'input'
+    },
+    {
+        'question': 'What is the result of 3 * 2?',
+        'options': ['6', '32', 'Error', 'None'],
+        'correct': '6'
+    },
+    {
+        'question': 'Which symbol is used for string concatenation?',
+        'options': ['+', '-', '*', '/'],
+        'correct': '+'
+    },
+    {
+        'question': 'What does the break statement do?',
+        'options': ['Ends a loop prematurely', 'Starts a loop', 'Skips to next iteration', 'Ends the program'],
+        'correct': 'Ends a loop prematurely'
+    }
+]
+
+# One compiled question: option text -> index, correct indices, weight, and the
+# original option texts for rendering results.
+CompiledQuestion = namedtuple('CompiledQuestion', ['lookup', 'correct', 'weight', 'options'])
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class AnswerKey:
+    """Compiled, immutable answer key for one version of a question set."""
+
+    def __init__(self, test_id, version, questions):
+        self.test_id = test_id
+        self.version = version
+        self.questions = tuple(_compile_question(question) for question in questions)
+        self.max_score = sum(question.weight for question in self.questions)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def grade(self, answers):
+        """
+        Grade ``answers`` (``{'<question index>': option or [options]}``) against the key.
+
+        Returns a ``GradeResult`` with the weighted score and per-question results.
+        """
+        selected = [_selected_indices(question, answers.get(str(i), '')) for i, question in enumerate(self.questions)]
+        marks = [selection == question.correct for selection, question in zip(selected, self.questions)]
+        score = sum(question.weight for question, is_correct in zip(self.questions, marks) if is_correct)
+
+        results = [
+            {
+                'question_number': i + 1,
+                'user_answer': _display(answers.get(str(i), '')),
+                'correct_answer': _display([question.options[index] for index in sorted(question.correct)]),
+                'is_correct': is_correct,
+            }
+            for i, (question, is_correct) in enumerate(zip(self.questions, marks))
+        ]
+        return GradeResult(score, self.max_score, marks.count(True), len(self.questions), results)
+
+
+class GradeResult:
+    def __init__(self, score, max_score, correct_count, total_questions, results):
+        self.score = score
+        self.max_score = max_score
+        self.correct_count = correct_count
+        self.total_questions = total_questions
+        self.results = results
+
+    @property
+    def incorrect(self):
+        return self.total_questions - self.correct_count
+
+    @property
+    def percentage(self):
+        return (self.score / self.max_score) * 100 if self.max_score > 0 else 0
+
+
+def _compile_question(question):
+    options = tuple(str(option) for option in question.get('options', []))
+    lookup = {option: index for index, option in enumerate(options)}
+    correct = question.get('correct')
+    correct = correct if isinstance(correct, (list, tuple)) else [correct]
+    indices = set()
+    for answer in correct:
+        answer = str(answer)
+        if answer not in lookup:
+            # Answers outside the option list are still gradable as free text.
+            lookup[answer] = len(options)
+            options += (answer,)
+        indices.add(lookup[answer])
+    return CompiledQuestion(lookup, frozenset(indices), question.get('weight', 1), options)
+
+
+def _selected_indices(question, answer):
+    answer = answer if isinstance(answer, (list, tuple)) else [answer]
+    return frozenset(question.lookup.get(str(option), -1) for option in answer if option not in ('', None))
+
+
+def _display(answer):
+    if isinstance(answer, (list, tuple)):
+        return ', '.join(str(option) for option in answer)
+    return answer
+
+
+def questions_version(raw_questions):
+    """Return the version hash of a questions payload (JSON text or decoded list)."""
+    if not isinstance(raw_questions, (str, bytes)):
+        raw_questions = json.dumps(raw_questions, sort_keys=True)
+    if isinstance(raw_questions, str):
+        raw_questions = raw_questions.encode('utf-8')
+    return hashlib.sha1(raw_questions).hexdigest()[:16]
+
+
+def get_answer_key(test_id, raw_questions):
+    """
+    Return the compiled ``AnswerKey`` for ``test_id``, compiling it on first use.
+
+    ``raw_questions`` is the stored questions JSON, either as text (preferred:
+    it is only decoded when the version is not cached yet) or already decoded.
+    """
+    version = questions_version(raw_questions)
+    key = _cache.get(test_id)
+    if key is not None and key.version == version:
+        return key
+
+    questions = json.loads(raw_questions) if isinstance(raw_questions, (str, bytes)) else raw_questions
+    key = AnswerKey(test_id, version, questions)
+    with _cache_lock:
+        _cache[test_id] = key
+    return key
+
+
+def get_mock_test_answer_key(mock_test):
+    """Return the answer key for a ``MockTest`` loaded with ``with_raw_questions``."""
+    raw_questions = getattr(mock_test, 'questions_raw', None)
+    if raw_questions is None:
+        raw_questions = mock_test.questions
+    return get_answer_key(mock_test.pk, raw_questions)
+
+
+def with_raw_questions(queryset):
+    """Defer the decoded ``questions`` column and select it as raw JSON text instead."""
+    return queryset.defer('questions').annotate(questions_raw=Cast('questions', output_field=TextField()))
+
+
+def clear_answer_keys():
+    with _cache_lock:
+        _cache.clear()
+
+
+DEFAULT_ANSWER_KEY = get_answer_key(DEFAULT_QUIZ_ID, DEFAULT_QUIZ_QUESTIONS)
@@ -0,0 +1,186 @@
+"""
+Per-request database instrumentation and query budgets.
+
+``record_queries()`` installs a ``QueryRecorder`` with
+``connection.execute_wrapper`` on every database alias, so it sees each
+query with its duration whichever alias the router picked.
+``QueryInstrumentationMiddleware`` (in ``lms.middleware``) records every
+request this way and reports the query count, total database time,
+duplicated SQL and slow queries as ``Server-Timing`` headers and one
+``lms.queries`` log line.
+
+A view declares how many queries a request may run with ``@query_budget(n)``
+(the count includes the session, user and student lookups of
+``login_required``). The middleware logs a warning when a request goes over,
+and ``assert_query_budget`` fails a test.
+"""
+import json
+import logging
+import time
+from collections import Counter, namedtuple
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.urls import resolve
+
+logger = logging.getLogger('lms.queries')
+
+DEFAULT_SLOW_QUERY_MS = 100
+# SQL is truncated to this many characters in log lines and failure messages.
+SQL_PREVIEW = 300
+
+Query = namedtuple('Query', ['alias', 'sql', 'duration_ms'])
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def slow_query_ms():
+    return getattr(settings, 'LMS_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS)
+
+
+class QueryRecorder:
+    """``execute_wrapper`` that keeps the alias, SQL and duration of every query it sees."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self.queries.append(Query(context['connection'].alias, sql, duration_ms))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def db_ms(self):
+        return sum(query.duration_ms for query in self.queries)
+
+    def duplicates(self):
+        """``{sql: times}`` for statements run more than once, most repeated first (usually an N+1 loop)."""
+        counts = Counter(query.sql for query in self.queries)
+        return {sql: times for sql, times in counts.most_common() if times > 1}
+
+    def slow_queries(self, threshold_ms=None):
+        threshold_ms = slow_query_ms() if threshold_ms is None else threshold_ms
+        return [query for query in self.queries if query.duration_ms >= threshold_ms]
+
+    def summary(self):
+        duplicates = self.duplicates()
+        return {
+            'queries': self.count,
+            'db_ms': round(self.db_ms, 2),
+            'duplicated': sum(times - 1 for times in duplicates.values()),
+            'slow': len(self.slow_queries()),
+        }
+
+
+def _install(stack, recorder):
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(recorder))
+
+
+@contextmanager
+def record_queries():
+    """Record every query run on any database alias inside the block; yields the ``QueryRecorder``."""
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        _install(stack, recorder)
+        yield recorder
+
+
+@asynccontextmanager
+async def arecord_queries():
+    """
+    ``record_queries`` for async code.
+
+    Connections are per thread, so the wrappers go on the connections of the
+    ``sync_to_async`` thread where the request's queries run.
+    """
+    recorder = QueryRecorder()
+    stack = ExitStack()
+    await sync_to_async(_install)(stack, recorder)
+    try:
+        yield recorder
+    finally:
+        await sync_to_async(stack.close)()
+
+
+def query_budget(limit):
+    """Declare that a request to the decorated view runs at most ``limit`` queries."""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def view_budget(view):
+    return getattr(view, 'query_budget', None)
+
+
+def server_timing(recorder, total_ms):
+    """``Server-Timing`` header value for a request that took ``total_ms``."""
+    summary = recorder.summary()
+    return ', '.join([
+        f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries"',
+        f'db-duplicated;desc="{summary["duplicated"]}"',
+        f'db-slow;desc="{summary["slow"]}"',
+        f'total;dur={total_ms:.2f}',
+    ])
+
+
+def log_request(request, response, recorder, total_ms):
+    """Write the ``lms.queries`` line for one request; warn about slow queries and blown budgets."""
+    match = request.resolver_match
+    budget = view_budget(match.func) if match else None
+    data = {
+        'method': request.method,
+        'path': request.path,
+        'view': match.view_name if match else None,
+        'status': response.status_code,
+        'total_ms': round(total_ms, 2),
+        **recorder.summary(),
+        'budget': budget,
+    }
+    duplicates = recorder.duplicates()
+    if duplicates:
+        data['top_duplicates'] = [
+            {'sql': sql[:SQL_PREVIEW], 'times': times} for sql, times in list(duplicates.items())[:3]
+        ]
+    logger.info(json.dumps(data), extra={'db_stats': data})
+
+    for query in recorder.slow_queries():
+        logger.warning('Slow query on %s (%.1f ms) in %s: %s', query.alias, query.duration_ms, request.path, query.sql[:SQL_PREVIEW])
+    if budget is not None and recorder.count > budget:
+        logger.warning('%s ran %d queries, over its budget of %d', data['view'], recorder.count, budget)
+
+
+def assert_query_budget(client, path, method='get', **kwargs):
+    """
+    Request ``path`` with the test ``client`` and fail if its view runs more queries than its budget.
+
+    Returns the response. Raises ``QueryBudgetExceeded`` (an ``AssertionError``)
+    listing the queries, or ``ValueError`` if the view declares no budget.
+    """
+    match = resolve(path.split('?', 1)[0])
+    budget = view_budget(match.func)
+    if budget is None:
+        raise ValueError(f'{match.view_name} declares no query budget; decorate it with @query_budget(n).')
+    with record_queries() as recorder:
+        response = getattr(client, method)(path, **kwargs)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    if recorder.count > budget:
+        queries = '\n'.join(f'  {number}. {query.sql[:SQL_PREVIEW]}' for number, query in enumerate(recorder.queries, 1))
+        raise QueryBudgetExceeded(
+            f'{match.view_name} ran {recorder.count} queries for {path}, over its budget of {budget}:\n{queries}'
+        )
+    return response
@@ -0,0 +1,154 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from lms.models import Student
+
+# Pages replayed by default: every student-facing GET view that takes no URL arguments.
+AUDITED_URLS = [
+    ('lms:dashboard', ''),
+    ('lms:session_details', ''),
+    ('lms:session_recordings', ''),
+    ('lms:session_search', '?mentor=x&date_from=2020-01-01'),
+    ('lms:attendance', ''),
+    ('lms:project_details', ''),
+    ('lms:assessment', ''),
+    ('lms:study_material', ''),
+    ('lms:certificate', ''),
+    ('lms:placement_readiness', ''),
+    ('lms:profile', ''),
+    ('lms:notifications', ''),
+    ('lms:notification_feed', ''),
+    ('lms:notification_badge', ''),
+    ('lms:internship_agenda', ''),
+    ('lms:offer_letter', ''),
+    ('lms:search', '?q=python'),
+]
+
+# Scanning or sorting these small lookup and catalog tables (a few dozen rows)
+# is cheaper than an index and not worth flagging.
+DEFAULT_IGNORED_TABLES = [
+    'django_session', 'django_content_type', 'auth_user',
+    'lms_assessment', 'lms_mocktest', 'lms_internshipagenda',
+]
+
+# SQLite >= 3.36 prints "SCAN t", older versions "SCAN TABLE t".
+FULL_SCAN_RE = re.compile(r'\bSCAN (?:TABLE )?(\w+)\b(?! USING (?:COVERING )?INDEX)(?! VIRTUAL TABLE)')
+INDEX_SCAN_RE = re.compile(r'\bSCAN (?:TABLE )?(\w+) USING (?:COVERING )?INDEX')
+ACCESS_RE = re.compile(r'\b(?:SCAN|SEARCH) (?:TABLE )?(\w+)')
+TEMP_BTREE_RE = re.compile(r'USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT|RIGHT PART OF ORDER BY)')
+# Django aliases tables in subqueries: FROM "lms_assessment" U0
+TABLE_ALIAS_RE = re.compile(r'"(\w+)" (U\d+)\b')
+
+
+def plan_issues(sql, plan_lines, tables, ignored_tables, index_scans=False):
+    """
+    Return descriptions of the full scans and temp B-tree sorts in an EXPLAIN QUERY PLAN.
+
+    ``tables`` are the real table names, so scans of derived tables (window
+    and subquery results) are not reported; a query that only reads
+    ``ignored_tables`` is not reported at all.
+    """
+    aliases = dict((alias, table) for table, alias in TABLE_ALIAS_RE.findall(sql))
+    accessed = {aliases.get(name, name) for line in plan_lines for name in ACCESS_RE.findall(line)} & tables
+    if accessed <= ignored_tables:
+        return []
+
+    issues = []
+    for line in plan_lines:
+        scan = FULL_SCAN_RE.search(line)
+        table = aliases.get(scan.group(1), scan.group(1)) if scan else None
+        if table in tables and table not in ignored_tables:
+            issues.append(f'full table scan of {table}')
+        if index_scans:
+            issues += [f'full index scan of {aliases.get(name, name)}' for name in INDEX_SCAN_RE.findall(line)]
+        sort = TEMP_BTREE_RE.search(line)
+        if sort:
+            issues.append(f'temp B-tree for {sort.group(1)}')
+    return issues
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay the student pages as a real student, run EXPLAIN QUERY PLAN on every query they '
+        'execute and flag full table scans and temporary B-tree sorts. Writes are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='Student to replay the pages as (default: the first student).')
+        parser.add_argument('--url', action='append', default=[], help='Extra path to replay; may be repeated.')
+        parser.add_argument('--ignore-table', action='append', default=[], help='Do not flag full scans of this table.')
+        parser.add_argument('--index-scans', action='store_true', help='Also flag full scans of an index.')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the plan of every query, not only flagged ones.')
+        parser.add_argument('--fail-on-issues', action='store_true', help='Exit with an error when anything is flagged.')
+
+    def handle(self, *args, **options):
+        aliases = [alias for alias in connections if connections[alias].vendor == 'sqlite']
+        if not aliases:
+            raise CommandError('audit_query_plans uses SQLite EXPLAIN QUERY PLAN; no SQLite database is configured.')
+
+        self.tables = {alias: set(connections[alias].introspection.table_names()) for alias in aliases}
+        student = self.get_student(options['username'])
+        ignored_tables = set(DEFAULT_IGNORED_TABLES) | set(options['ignore_table'])
+        paths = [reverse(name) + query for name, query in AUDITED_URLS] + options['url']
+
+        flagged = 0
+        # The test client talks to the handler in-process as "testserver".
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            client = Client()
+            client.force_login(student.user)
+            for path in paths:
+                flagged += self.audit_path(client, path, aliases, ignored_tables, options)
+            transaction.set_rollback(True)
+
+        summary = f'{len(paths)} page(s) replayed, {flagged} flagged query(ies).'
+        if flagged and options['fail_on_issues']:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary) if not flagged else self.style.WARNING(summary))
+
+    def get_student(self, username):
+        students = Student.objects.select_related('user')
+        student = students.filter(user__username=username).first() if username else students.order_by('id').first()
+        if student is None:
+            raise CommandError(f'No student {username!r}.' if username else 'There are no students to replay the pages as.')
+        return student
+
+    def audit_path(self, client, path, aliases, ignored_tables, options):
+        captures = [CaptureQueriesContext(connections[alias]) for alias in aliases]
+        for capture in captures:
+            capture.__enter__()
+        try:
+            response = client.get(path)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        finally:
+            for capture in reversed(captures):
+                capture.__exit__(None, None, None)
+
+        queries = []
+        for alias, capture in zip(aliases, captures):
+            for query in capture.captured_queries:
+                sql = query['sql']
+                if sql.lstrip().upper().startswith('SELECT') and (alias, sql) not in queries:
+                    queries.append((alias, sql))
+
+        self.stdout.write(f'{path} -> {response.status_code}, {len(queries)} distinct SELECT(s)')
+        flagged = 0
+        for alias, sql in queries:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plan = [row[-1] for row in cursor.fetchall()]
+            issues = plan_issues(sql, plan, self.tables[alias], ignored_tables, options['index_scans'])
+            if issues:
+                flagged += 1
+                self.stdout.write(self.style.WARNING(f'  [{alias}] {"; ".join(issues)}'))
+            if issues or options['verbose_plans']:
+                self.stdout.write(f'    {sql}')
+                for line in plan:
+                    self.stdout.write(f'      {line}')
+        return flagged
@@ -0,0 +1,187 @@
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from lms import benchmark
+
+SERVER_START_TIMEOUT = 30
+
+
+def git_revision():
+    """``(short commit, has uncommitted changes)``, or ``(None, None)`` outside a git checkout."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure p50/p95/p99 latency and queries per request for every route in lms.urls, '
+        'through the test client and with concurrent HTTP requests against a local server, '
+        'and save the results as JSON. Seed the data first with `manage.py seed_benchmark_data`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default=benchmark.username(0), help='User to request the pages as.')
+        parser.add_argument('--route', action='append', default=[], help='Only benchmark this route name; may be repeated.')
+        parser.add_argument('--iterations', type=int, default=50, help='Test client requests per route.')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per route before measuring.')
+        parser.add_argument('--http-requests', type=int, default=200, help='HTTP requests per GET route.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent HTTP clients.')
+        parser.add_argument(
+            '--server',
+            help='Base URL of a running server (e.g. gunicorn on http://127.0.0.1:8000). '
+                 'By default `manage.py runserver` is started on a free port.',
+        )
+        parser.add_argument('--no-client', action='store_true', help='Skip the test client run.')
+        parser.add_argument('--no-http', action='store_true', help='Skip the HTTP run.')
+        parser.add_argument('--output', help='Results file (default: benchmark_results/<time>-<commit>.json).')
+        parser.add_argument('--compare', help='Earlier results file to print p95 and query count changes against.')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f'No user {options["username"]!r}; run `manage.py seed_benchmark_data` first.')
+        previous = None
+        if options['compare']:
+            with open(options['compare']) as file:
+                previous = json.load(file)
+
+        requests, skipped = benchmark.route_requests(user)
+        if options['route']:
+            unknown = set(options['route']) - {request.name for request in requests}
+            if unknown:
+                raise CommandError(f'Unknown or skipped route(s): {", ".join(sorted(unknown))}')
+            requests = [request for request in requests if request.name in options['route']]
+
+        commit, dirty = git_revision()
+        started_at = timezone.now()
+        results = {
+            'meta': {
+                'commit': commit,
+                'dirty': dirty,
+                'started_at': started_at.isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'database_profile': getattr(settings, 'LMS_DATABASE_PROFILE', 'default'),
+                'cache_backend': settings.CACHES['default']['BACKEND'],
+                'scale': benchmark.scale(),
+                'iterations': options['iterations'],
+                'http_requests': options['http_requests'],
+                'concurrency': options['concurrency'],
+            },
+            'skipped': skipped,
+            'client': None,
+            'http': None,
+        }
+
+        if not options['no_client']:
+            self.stdout.write(f'Test client: {len(requests)} route(s) x {options["iterations"]} requests')
+            # The test client talks to the handler in-process as "testserver"; queries
+            # are counted here, so the middleware's per-request log lines are turned off.
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], LMS_QUERY_INSTRUMENTATION=False):
+                results['client'] = benchmark.run_client(requests, user, options['iterations'], options['warmup'])
+            self.print_results(results['client'])
+
+        if not options['no_http']:
+            results['http'] = self.run_http(requests, user, options)
+            self.print_results(results['http'])
+
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmark_results' / f'{started_at:%Y%m%d-%H%M%S}-{commit or "nogit"}.json')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+        if previous is not None:
+            self.print_comparison(previous, results)
+
+    def run_http(self, requests, user, options):
+        client = Client()
+        client.force_login(user)
+        session = client.cookies[settings.SESSION_COOKIE_NAME]
+        cookie = f'{session.key}={session.value}'
+
+        server = None
+        base_url = options['server']
+        if not base_url:
+            port = free_port()
+            base_url = f'http://127.0.0.1:{port}'
+            server = subprocess.Popen(
+                [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload'],
+                cwd=settings.BASE_DIR, env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            self.wait_for_server(port, server)
+        try:
+            gets = sum(request.method == 'GET' for request in requests)
+            self.stdout.write(
+                f'HTTP {base_url}: {gets} GET route(s) x {options["http_requests"]} requests, '
+                f'{options["concurrency"]} concurrent'
+            )
+            return benchmark.run_http(
+                base_url, requests, cookie, options['http_requests'], options['concurrency'], options['warmup'],
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    def wait_for_server(self, port, server):
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'runserver exited with status {server.returncode}.')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'runserver did not start listening within {SERVER_START_TIMEOUT}s.')
+
+    def print_results(self, results):
+        self.stdout.write(f'  {"route":32} {"status":>12} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"queries":>8}')
+        for name, result in results.items():
+            latency = result['latency_ms']
+            status = ','.join(result['status'])
+            queries = result['queries']['max'] if result['queries'] else '-'
+            self.stdout.write(
+                f'  {name:32} {status:>12} {latency["p50"]:>9.2f} {latency["p95"]:>9.2f} {latency["p99"]:>9.2f} {queries:>8}'
+            )
+
+    def print_comparison(self, previous, current):
+        self.stdout.write(f'Compared with {previous["meta"].get("commit")} ({previous["meta"].get("started_at")}):')
+        for phase, route, old_p95, new_p95, old_queries, new_queries in benchmark.compare(previous, current):
+            change = (new_p95 - old_p95) / old_p95 * 100 if old_p95 else 0
+            line = f'  {phase:6} {route:32} p95 {old_p95:>8.2f} -> {new_p95:>8.2f} ms ({change:+6.1f}%)  queries {old_queries} -> {new_queries}'
+            if new_queries is not None and old_queries is not None and new_queries > old_queries:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from lms.broadcasts import DEFAULT_CHUNK_SIZE, deliver_broadcast, stale_broadcasts
+from lms.models import NOTIFICATION_TYPES, Broadcast
+
+
+class Command(BaseCommand):
+    help = 'Send a notification to every student of a cohort, or deliver pending broadcasts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--title', help='Notification title.')
+        parser.add_argument('--message', help='Notification message.')
+        parser.add_argument('--type', dest='notification_type', choices=[choice for choice, label in NOTIFICATION_TYPES], default='info')
+        parser.add_argument('--college', default='', help='Only students from this college.')
+        parser.add_argument('--branch', default='', help='Only students from this branch.')
+        parser.add_argument('--year', default='', help='Only students in this year.')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Notifications inserted per transaction.')
+        parser.add_argument('--pending', action='store_true', help='Deliver broadcasts left pending, and resume stale ones stuck sending, instead of creating one.')
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            broadcasts = list(
+                (Broadcast.objects.filter(status='pending') | stale_broadcasts()).order_by('created_at')
+            )
+        else:
+            if not options['title'] or not options['message']:
+                raise CommandError('--title and --message are required.')
+            broadcasts = [Broadcast.objects.create(
+                title=options['title'],
+                message=options['message'],
+                notification_type=options['notification_type'],
+                college=options['college'],
+                branch=options['branch'],
+                year=options['year'],
+            )]
+
+        for broadcast in broadcasts:
+            rate = deliver_broadcast(broadcast, options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Broadcast {broadcast.pk} "{broadcast.title}": {broadcast.delivered} notification(s), {rate:.0f} rows/s.'
+            ))
@@ -0,0 +1,57 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lms.exports import DEFAULT_CHUNK_SIZE, LAYOUTS, ExportError, attendance_queryset, export_rows, stream_csv, write_xlsx
+
+
+class Command(BaseCommand):
+    help = 'Export attendance as CSV or XLSX in constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--layout', choices=LAYOUTS, default='rows', help='One row per record, or a student x session matrix.')
+        parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv', help='Output format.')
+        parser.add_argument('--output', '-o', help='Output file (default: stdout, CSV only).')
+        parser.add_argument('--college', help='Only students from this college.')
+        parser.add_argument('--branch', help='Only students from this branch.')
+        parser.add_argument('--year', help='Only students in this year.')
+        parser.add_argument('--date-from', help='Only sessions on or after this date (YYYY-MM-DD).')
+        parser.add_argument('--date-to', help='Only sessions on or before this date (YYYY-MM-DD).')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows fetched per database round trip.')
+
+    def handle(self, *args, **options):
+        try:
+            attendances = attendance_queryset(
+                college=options['college'],
+                branch=options['branch'],
+                year=options['year'],
+                date_from=options['date_from'],
+                date_to=options['date_to'],
+            )
+        except ExportError as exc:
+            raise CommandError(str(exc))
+        rows = export_rows(options['layout'], attendances, options['chunk_size'])
+        started = time.monotonic()
+
+        if options['format'] == 'xlsx':
+            if not options['output']:
+                raise CommandError('--output is required for XLSX exports.')
+            try:
+                count = write_xlsx(rows, options['output'])
+            except RuntimeError as exc:
+                raise CommandError(str(exc))
+        else:
+            count = -1
+            output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+            try:
+                for count, line in enumerate(stream_csv(rows)):
+                    output.write(line)
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+            count = max(count, 0)
+
+        if options['output']:
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(f'Wrote {count} row(s) to {options["output"]} in {elapsed:.2f}s.'))
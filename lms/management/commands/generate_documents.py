@@ -0,0 +1,93 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from lms.documents import (
+    certificate_hash,
+    certificate_snapshot,
+    document_filename,
+    is_current,
+    offer_letter_hash,
+    offer_letter_snapshot,
+    render_certificate_pdf,
+    render_offer_letter_pdf,
+    store_pdf,
+)
+from lms.models import Certificate, OfferLetter
+
+# kind -> (model, file field, filename prefix, hash, snapshot, renderer)
+DOCUMENTS = {
+    'offer_letters': (OfferLetter, 'offer_letter_file', 'offer_letter', offer_letter_hash, offer_letter_snapshot, render_offer_letter_pdf),
+    'certificates': (Certificate, 'certificate_file', 'certificate', certificate_hash, certificate_snapshot, render_certificate_pdf),
+}
+
+
+def _render(job):
+    """Worker entry point: render one snapshot. Runs in a child process without DB access."""
+    renderer, snapshot = job
+    return snapshot.pk, renderer(snapshot)
+
+
+class Command(BaseCommand):
+    help = 'Generate offer letter and certificate PDFs for a cohort in parallel.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=['offer_letters', 'certificates', 'all'], default='all', help='Documents to generate.')
+        parser.add_argument('--college', help='Only students from this college.')
+        parser.add_argument('--branch', help='Only students from this branch.')
+        parser.add_argument('--year', help='Only students in this year.')
+        parser.add_argument('--workers', type=int, default=None, help='Rendering processes (default: CPU count).')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Documents written and updated per batch.')
+        parser.add_argument('--force', action='store_true', help='Re-render documents whose stored file is already current.')
+
+    def handle(self, *args, **options):
+        student_filter = {
+            f'student__{field}': options[field]
+            for field in ('college', 'branch', 'year')
+            if options[field]
+        }
+        kinds = list(DOCUMENTS) if options['type'] == 'all' else [options['type']]
+
+        self.workers = options['workers'] or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for kind in kinds:
+                self.generate(pool, kind, student_filter, options['chunk_size'], options['force'])
+
+    def generate(self, pool, kind, student_filter, chunk_size, force):
+        model, field, prefix, content_hash, snapshot, renderer = DOCUMENTS[kind]
+        started = time.monotonic()
+
+        pending = {}
+        skipped = 0
+        queryset = model.objects.filter(**student_filter).select_related('student').order_by('pk')
+        for document in queryset.iterator(chunk_size=chunk_size):
+            filename = document_filename(prefix, document.pk, content_hash(document))
+            if not force and is_current(getattr(document, field), filename):
+                skipped += 1
+                continue
+            pending[document.pk] = (document, filename)
+
+        jobs = [(renderer, snapshot(document)) for document, filename in pending.values()]
+        changed = []
+        for pk, pdf_data in pool.map(_render, jobs, chunksize=max(1, len(jobs) // (self.workers * 4))):
+            document, filename = pending[pk]
+            store_pdf(getattr(document, field), filename, pdf_data)
+            changed.append(document)
+            if len(changed) >= chunk_size:
+                self.save(model, field, changed)
+                changed = []
+        self.save(model, field, changed)
+
+        elapsed = time.monotonic() - started
+        rate = len(jobs) / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{kind}: generated {len(jobs)}, up to date {skipped}, {elapsed:.2f}s ({rate:.1f} documents/s)'
+        ))
+
+    def save(self, model, field, documents):
+        if documents:
+            with transaction.atomic():
+                model.objects.bulk_update(documents, [field])
@@ -0,0 +1,73 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from lms.submissions import get_queue, process_batch
+
+
+class Command(BaseCommand):
+    help = 'Grade queued quiz submissions in batches using a pool of worker threads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Number of worker threads.')
+        parser.add_argument('--batch-size', type=int, default=50, help='Submissions claimed per batch.')
+        parser.add_argument('--poll-interval', type=float, default=0.5, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit instead of polling forever.')
+
+    def handle(self, *args, **options):
+        queue = get_queue()
+        # Only claims of dead or timed-out workers; other workers may be running.
+        released = queue.release_stale()
+        if released:
+            self.stdout.write(f'Released {released} stale submission(s) back to the queue.')
+
+        self.stop = threading.Event()
+        self.processed = 0
+        self.lock = threading.Lock()
+        workers = max(1, options['workers'])
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self.work, queue, f'{os.getpid()}-{i}', options['batch_size'], options['poll_interval'], options['once'])
+                for i in range(workers)
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except KeyboardInterrupt:
+                self.stop.set()
+
+        elapsed = time.monotonic() - started
+        rate = self.processed / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(f'Processed {self.processed} submission(s) in {elapsed:.2f}s ({rate:.1f}/s).'))
+
+    def work(self, queue, worker_id, batch_size, poll_interval, once):
+        try:
+            while not self.stop.is_set():
+                batch = queue.claim(batch_size, worker_id)
+                if not batch:
+                    if once:
+                        return
+                    time.sleep(poll_interval)
+                    continue
+
+                try:
+                    outcomes = process_batch(batch)
+                except Exception as exc:
+                    queue.fail({submission['receipt']: str(exc) for submission in batch})
+                    self.stderr.write(f'[{worker_id}] batch of {len(batch)} failed: {exc}')
+                    continue
+
+                failed = {receipt: result['error'] for receipt, result in outcomes.items() if 'error' in result}
+                if failed:
+                    queue.fail(failed)
+                queue.complete({receipt: result for receipt, result in outcomes.items() if 'error' not in result})
+                with self.lock:
+                    self.processed += len(batch)
+        finally:
+            close_old_connections()
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from lms.models import MaterialUpload
+from lms.uploads import process_upload
+
+
+class Command(BaseCommand):
+    help = 'Store fully received study material uploads that are waiting to be processed.'
+
+    def handle(self, *args, **options):
+        for upload in MaterialUpload.objects.filter(status='received').order_by('created_at'):
+            try:
+                material = process_upload(upload)
+            except Exception as exc:
+                self.stderr.write(self.style.ERROR(f'Upload {upload.pk} "{upload.filename}" failed: {exc}'))
+                continue
+            if material is not None:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Upload {upload.pk} "{upload.filename}" stored as material {material.pk} ({material.file_size} bytes).'
+                ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from lms.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index from the study material, sessions and internship agenda.'
+
+    def handle(self, *args, **options):
+        count = get_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} document(s).'))
@@ -0,0 +1,47 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from lms import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a reproducible synthetic cohort for `manage.py benchmark`. Run it against a scratch '
+        'database (LMS_DATABASE_PATH=bench.sqlite3) so the rows stay out of the real one.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200, help='Number of students.')
+        parser.add_argument('--sessions', type=int, default=120, help='Number of sessions; three quarters in the past.')
+        parser.add_argument('--attendance-rate', type=float, default=0.8, help='Share of past sessions each student attended.')
+        parser.add_argument('--mock-attempts', type=int, default=5, help='Mock test attempts per student.')
+        parser.add_argument('--notifications', type=int, default=30, help='Notifications per student.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed and scale give the same data.')
+        parser.add_argument('--reset', action='store_true', help='Delete an existing benchmark dataset first.')
+
+    def handle(self, *args, **options):
+        if options['students'] < 1:
+            raise CommandError('--students must be at least 1.')
+        if User.objects.filter(username__startswith=benchmark.USERNAME_PREFIX).exists():
+            if not options['reset']:
+                raise CommandError('A benchmark dataset already exists; pass --reset to replace it.')
+            benchmark.clear()
+            self.stdout.write('Deleted the previous benchmark dataset.')
+
+        start = time.perf_counter()
+        created = benchmark.seed(
+            students=options['students'],
+            sessions=options['sessions'],
+            attendance_rate=options['attendance_rate'],
+            mock_attempts=options['mock_attempts'],
+            notifications=options['notifications'],
+            random_seed=options['seed'],
+        )
+        for model, count in sorted(created.items()):
+            self.stdout.write(f'  {model}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {sum(created.values())} rows in {time.perf_counter() - start:.1f}s. '
+            f'Benchmark user: {benchmark.username(0)} / {benchmark.PASSWORD}'
+        ))
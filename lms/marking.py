@@ -0,0 +1,93 @@
+"""
+Bulk attendance marking for a session.
+
+A mentor submits the whole roster of a session at once; every row is upserted
+in a single ``INSERT ... ON CONFLICT (student_id, session_id) DO UPDATE`` so
+marking a 500-student session is one statement inside one transaction.
+"""
+import csv
+import io
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Attendance, Student
+from .summaries import invalidate_student_summaries
+
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'present', 'p'}
+FALSE_VALUES = {'0', 'false', 'f', 'no', 'n', 'absent', 'a', ''}
+
+
+class MarkingError(ValueError):
+    pass
+
+
+def parse_present(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise MarkingError(f'Invalid present flag: {value!r}')
+
+
+def parse_marks(entries):
+    """Turn ``[{'student_id': .., 'is_present': ..}, ...]`` into ``{student_id: is_present}``."""
+    marks = {}
+    for entry in entries:
+        try:
+            student_id = int(entry['student_id'])
+        except (KeyError, TypeError, ValueError):
+            raise MarkingError(f'Invalid student_id in {entry!r}')
+        marks[student_id] = parse_present(entry.get('is_present', True))
+    return marks
+
+
+def parse_marks_csv(uploaded_file):
+    """Read a CSV upload with ``student_id`` and ``is_present`` columns."""
+    reader = csv.DictReader(io.TextIOWrapper(uploaded_file, encoding='utf-8-sig'))
+    try:
+        if not reader.fieldnames or 'student_id' not in reader.fieldnames:
+            raise MarkingError('CSV must have a student_id column.')
+        return parse_marks(reader)
+    except UnicodeDecodeError:
+        raise MarkingError('CSV must be UTF-8 encoded.')
+    except csv.Error as exc:
+        raise MarkingError(f'Invalid CSV on line {reader.line_num}: {exc}')
+
+
+def mark_session_attendance(session, marks, complete=True):
+    """
+    Upsert attendance for ``session`` from ``{student_id: is_present}``.
+
+    Unknown student ids raise ``MarkingError`` before anything is written. When
+    ``complete`` is true the session is flagged ``is_completed`` in the same
+    transaction. Returns the number of rows written.
+    """
+    known = set(Student.objects.filter(id__in=marks).values_list('id', flat=True))
+    unknown = sorted(set(marks) - known)
+    if unknown:
+        raise MarkingError(f'Unknown student ids: {", ".join(map(str, unknown))}')
+
+    now = timezone.now()
+    rows = [
+        Attendance(student_id=student_id, session=session, is_present=is_present, marked_at=now)
+        for student_id, is_present in marks.items()
+    ]
+    with transaction.atomic():
+        Attendance.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['student', 'session'],
+            update_fields=['is_present', 'marked_at'],
+        )
+        if complete and not session.is_completed:
+            # Saved through the model so the session signals refresh the catalog and push the live event.
+            session.is_completed = True
+            session.save(update_fields=['is_completed'])
+
+    # bulk_create() bypasses the model signals.
+    invalidate_student_summaries(marks)
+    return len(rows)
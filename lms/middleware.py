@@ -0,0 +1,106 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import Resolver404, resolve
+
+from .db import read_database, reads_from
+from .instrumentation import arecord_queries, log_request, record_queries, server_timing
+
+PIN_COOKIE = 'lms_primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReadReplicaMiddleware:
+    """
+    Route the reads of each request to the primary or the read alias (see ``lms.db``).
+
+    Unsafe requests set a short-lived cookie; while it is present the client
+    reads from the primary, so e.g. the profile page right after
+    ``edit_profile`` shows the new values even if the replica lags.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with reads_from(self.read_alias(request)):
+            response = self.get_response(request)
+        return self.pin_after_write(request, response)
+
+    async def __acall__(self, request):
+        with reads_from(self.read_alias(request)):
+            response = await self.get_response(request)
+        return self.pin_after_write(request, response)
+
+    def read_alias(self, request):
+        alias = read_database()
+        if alias == DEFAULT_DB_ALIAS or request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES:
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if getattr(match.func, 'read_replica', False) or match.view_name in getattr(settings, 'LMS_REPLICA_VIEWS', ()):
+            return alias
+        return None
+
+    def pin_after_write(self, request, response):
+        if request.method not in SAFE_METHODS and read_database() != DEFAULT_DB_ALIAS:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'LMS_PRIMARY_PIN_SECONDS', 10),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record the queries of each request and report them (see ``lms.instrumentation``).
+
+    Put it first in ``MIDDLEWARE`` so the session and user lookups count too.
+    Queries run while a streaming response is consumed happen after it
+    returns and are not counted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, 'LMS_QUERY_INSTRUMENTATION', True):
+            return self.get_response(request)
+        start = time.perf_counter()
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        return self.report(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'LMS_QUERY_INSTRUMENTATION', True):
+            return await self.get_response(request)
+        start = time.perf_counter()
+        async with arecord_queries() as recorder:
+            response = await self.get_response(request)
+        return self.report(request, response, recorder, start)
+
+    def report(self, request, response, recorder, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        if getattr(settings, 'LMS_SERVER_TIMING', True):
+            timing = server_timing(recorder, total_ms)
+            response['Server-Timing'] = f'{response["Server-Timing"]}, {timing}' if response.has_header('Server-Timing') else timing
+        log_request(request, response, recorder, total_ms)
+        return response
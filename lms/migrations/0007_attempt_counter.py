@@ -0,0 +1,63 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def renumber_attempts(apps, schema_editor):
+    """Renumber duplicated attempts 1..n per student and mock test, then seed the counters."""
+    StudentMockTest = apps.get_model('lms', 'StudentMockTest')
+    MockTestAttemptCounter = apps.get_model('lms', 'MockTestAttemptCounter')
+
+    last_attempts = {}
+    changed = []
+    attempts = StudentMockTest.objects.order_by('student_id', 'mock_test_id', 'attempt_number', 'submitted_at', 'id')
+    for attempt in attempts.iterator():
+        pair = (attempt.student_id, attempt.mock_test_id)
+        number = last_attempts.get(pair, 0) + 1
+        last_attempts[pair] = number
+        if attempt.attempt_number != number:
+            attempt.attempt_number = number
+            changed.append(attempt)
+    StudentMockTest.objects.bulk_update(changed, ['attempt_number'], batch_size=500)
+
+    MockTestAttemptCounter.objects.bulk_create([
+        MockTestAttemptCounter(student_id=student_id, mock_test_id=mock_test_id, last_attempt=last)
+        for (student_id, mock_test_id), last in last_attempts.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0006_internshipagenda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MockTestAttemptCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_attempt', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='mocktestattemptcounter',
+            name='mock_test',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='lms.mocktest'),
+        ),
+        migrations.AddField(
+            model_name='mocktestattemptcounter',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='lms.student'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='mocktestattemptcounter',
+            unique_together={('student', 'mock_test')},
+        ),
+        migrations.RunPython(renumber_attempts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='studentmocktest',
+            constraint=models.UniqueConstraint(fields=('student', 'mock_test', 'attempt_number'), name='unique_mock_test_attempt'),
+        ),
+    ]
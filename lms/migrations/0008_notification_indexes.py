@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0007_attempt_counter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['student', '-created_at', '-id'], name='notification_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['student', 'is_read'], name='notification_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0009_broadcast'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['date', 'start_time'], name='session_schedule_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['mentor', 'date', 'start_time'], name='session_mentor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['topic', 'date', 'start_time'], name='session_topic_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(condition=models.Q(('recording_url', ''), _negated=True), fields=['-date', '-start_time'], name='session_recording_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+CREATE_INDEX = """
+CREATE VIRTUAL TABLE IF NOT EXISTS lms_search_index USING fts5(
+    kind UNINDEXED,
+    object_id UNINDEXED,
+    title,
+    body,
+    tokenize = 'porter unicode61'
+)
+"""
+
+BACKFILL = [
+    "INSERT INTO lms_search_index (kind, object_id, title, body) "
+    "SELECT 'study_material', id, title, description FROM lms_studymaterial",
+    "INSERT INTO lms_search_index (kind, object_id, title, body) "
+    "SELECT 'session', id, title, topic || char(10) || description FROM lms_session",
+    "INSERT INTO lms_search_index (kind, object_id, title, body) "
+    "SELECT 'internship_agenda', id, week, agenda || char(10) || deliverables FROM lms_internshipagenda",
+]
+
+
+def create_search_index(apps, schema_editor):
+    """Create and fill the FTS5 index; other databases use lms.search.DatabaseSearchBackend."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_INDEX)
+    for statement in BACKFILL:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS lms_search_index')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0010_session_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('lms', '0011_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studymaterial',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='studymaterial',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='studymaterial',
+            name='thumbnail',
+            field=models.FileField(blank=True, null=True, upload_to='study_materials/thumbnails/'),
+        ),
+        migrations.CreateModel(
+            name='MaterialUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('filename', models.CharField(max_length=255)),
+                ('total_size', models.PositiveBigIntegerField()),
+                ('received', models.PositiveBigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('received', 'Received'), ('processing', 'Processing'), ('complete', 'Complete'), ('failed', 'Failed')], default='uploading', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('material', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='lms.studymaterial')),
+                ('uploaded_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
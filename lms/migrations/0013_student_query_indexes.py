@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0012_material_uploads'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['student', '-issued_date'], name='certificate_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mockinterview',
+            index=models.Index(fields=['student', '-requested_date'], name='mockinterview_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offerletter',
+            index=models.Index(fields=['student', '-issued_date'], name='offerletter_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['student', '-submitted_at'], name='project_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentmocktest',
+            index=models.Index(fields=['student', '-submitted_at'], name='mocktest_attempt_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studymaterial',
+            index=models.Index(fields=['-uploaded_at'], name='studymaterial_uploaded_idx'),
+        ),
+    ]
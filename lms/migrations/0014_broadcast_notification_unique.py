@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0013_student_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('broadcast', 'student'), name='unique_broadcast_notification'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# Same documents as lms.search.document(), stored under
+# rowid = id * 16 + kind code (lms.search.document_rowid).
+REINDEX = [
+    'DELETE FROM lms_search_index',
+    "INSERT INTO lms_search_index (rowid, kind, object_id, title, body) "
+    "SELECT id * 16 + 1, 'study_material', id, title, coalesce(description, '') FROM lms_studymaterial",
+    "INSERT INTO lms_search_index (rowid, kind, object_id, title, body) "
+    "SELECT id * 16 + 2, 'session', id, title, coalesce(topic, '') || char(10) || coalesce(description, '') "
+    "FROM lms_session",
+    "INSERT INTO lms_search_index (rowid, kind, object_id, title, body) "
+    "SELECT id * 16 + 3, 'internship_agenda', id, week, coalesce(agenda, '') || char(10) || coalesce(deliverables, '') "
+    "FROM lms_internshipagenda",
+]
+
+
+def reindex_by_rowid(apps, schema_editor):
+    """Re-store every document under its deterministic rowid so updates and deletes need no scan."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in REINDEX:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0014_broadcast_notification_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(reindex_by_rowid, migrations.RunPython.noop),
+    ]
@@ -28,6 +28,10 @@ class Student(models.Model):
         return self.year
 
 
+# URLField(blank=True) stores '' rather than NULL for sessions without a recording.
+HAS_RECORDING = ~models.Q(recording_url='')
+
+
 class Session(models.Model):
     title = models.CharField(max_length=200)
     topic = models.CharField(max_length=200)
@@ -43,8 +47,21 @@ class Session(models.Model):
     def __str__(self):
         return self.title
 
+    @property
+    def has_recording(self):
+        return bool(self.recording_url)
+
     class Meta:
         ordering = ['-date', '-start_time']
+        indexes = [
+            models.Index(fields=['date', 'start_time'], name='session_schedule_idx'),
+            models.Index(fields=['mentor', 'date', 'start_time'], name='session_mentor_idx'),
+            models.Index(fields=['topic', 'date', 'start_time'], name='session_topic_idx'),
+            # Partial index: only sessions with a recording, in the recordings page order.
+            models.Index(
+                fields=['-date', '-start_time'], condition=HAS_RECORDING, name='session_recording_idx',
+            ),
+        ]
 
 
 class Attendance(models.Model):
@@ -115,6 +132,11 @@ class Project(models.Model):
     def __str__(self):
         return f"{self.student} - {self.title}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', '-submitted_at'], name='project_student_idx'),
+        ]
+
 
 class StudyMaterial(models.Model):
     title = models.CharField(max_length=200)
@@ -132,6 +154,10 @@ class StudyMaterial(models.Model):
         ('other', 'Other')
     ], default='pdf')
     file_size = models.PositiveIntegerField(null=True, blank=True)  # Size in bytes
+    # SHA-256 of the file content; identical uploads share one stored file
+    file_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)  # Pages or slides, when known
+    thumbnail = models.FileField(upload_to='study_materials/thumbnails/', blank=True, null=True)
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     uploaded_at = models.DateTimeField(default=timezone.now)
     is_active = models.BooleanField(default=True)
@@ -139,6 +165,38 @@ class StudyMaterial(models.Model):
     def __str__(self):
         return self.title
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-uploaded_at'], name='studymaterial_uploaded_idx'),
+        ]
+
+
+class MaterialUpload(models.Model):
+    """A chunked, resumable upload that becomes a StudyMaterial once processed."""
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=[
+        ('uploading', 'Uploading'),
+        ('received', 'Received'),
+        ('processing', 'Processing'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed')
+    ], default='uploading')
+    error = models.TextField(blank=True)
+    material = models.ForeignKey(StudyMaterial, on_delete=models.SET_NULL, null=True, blank=True)
+    uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.filename
+
+    class Meta:
+        ordering = ['-created_at']
+
 
 class Certificate(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
@@ -158,6 +216,11 @@ class Certificate(models.Model):
             self.verification_code = str(uuid.uuid4())[:8].upper()
         super().save(*args, **kwargs)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', '-issued_date'], name='certificate_student_idx'),
+        ]
+
 
 class JobOpening(models.Model):
     title = models.CharField(max_length=200)
@@ -216,16 +279,49 @@ class JobApplication(models.Model):
         return f"{self.student} - {self.job_opening}"
 
 
+NOTIFICATION_TYPES = [
+    ('info', 'Information'),
+    ('warning', 'Warning'),
+    ('success', 'Success'),
+    ('error', 'Error')
+]
+
+
+class Broadcast(models.Model):
+    """An announcement fanned out as one Notification per student of a cohort."""
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES, default='info')
+    # Cohort filter; blank fields match every student
+    college = models.CharField(max_length=100, blank=True)
+    branch = models.CharField(max_length=50, blank=True)
+    year = models.CharField(max_length=20, blank=True)
+    status = models.CharField(max_length=20, choices=[
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed')
+    ], default='pending')
+    recipients = models.PositiveIntegerField(default=0)
+    delivered = models.PositiveIntegerField(default=0)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.title
+
+    class Meta:
+        ordering = ['-created_at']
+
+
 class Notification(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    broadcast = models.ForeignKey(Broadcast, on_delete=models.SET_NULL, null=True, blank=True)
     title = models.CharField(max_length=200)
     message = models.TextField()
-    notification_type = models.CharField(max_length=20, choices=[
-        ('info', 'Information'),
-        ('warning', 'Warning'),
-        ('success', 'Success'),
-        ('error', 'Error')
-    ], default='info')
+    notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES, default='info')
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=timezone.now)
 
@@ -234,6 +330,14 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['student', '-created_at', '-id'], name='notification_feed_idx'),
+            models.Index(fields=['student', 'is_read'], name='notification_unread_idx'),
+        ]
+        constraints = [
+            # One copy of a broadcast per student, so a resumed delivery cannot duplicate it
+            models.UniqueConstraint(fields=['broadcast', 'student'], name='unique_broadcast_notification'),
+        ]
 
 
 class OfferLetter(models.Model):
@@ -254,6 +358,9 @@ class OfferLetter(models.Model):
 
     class Meta:
         ordering = ['-issued_date']
+        indexes = [
+            models.Index(fields=['student', '-issued_date'], name='offerletter_student_idx'),
+        ]
 
 
 class MockTest(models.Model):
@@ -282,6 +389,15 @@ class StudentMockTest(models.Model):
 
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['student', '-submitted_at'], name='mocktest_attempt_student_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'mock_test', 'attempt_number'],
+                name='unique_mock_test_attempt',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.mock_test} (Attempt {self.attempt_number})"
@@ -293,6 +409,19 @@ class StudentMockTest(models.Model):
         return 0
 
 
+class MockTestAttemptCounter(models.Model):
+    """Last attempt number handed out per student and mock test."""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    mock_test = models.ForeignKey(MockTest, on_delete=models.CASCADE)
+    last_attempt = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['student', 'mock_test']
+
+    def __str__(self):
+        return f"{self.student} - {self.mock_test}: {self.last_attempt}"
+
+
 class MockInterview(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     title = models.CharField(max_length=200)
@@ -313,6 +442,9 @@ class MockInterview(models.Model):
 
     class Meta:
         ordering = ['-requested_date']
+        indexes = [
+            models.Index(fields=['student', '-requested_date'], name='mockinterview_student_idx'),
+        ]
 
 
 class InternshipAgenda(models.Model):
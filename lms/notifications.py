@@ -0,0 +1,111 @@
+"""
+Notification feed helpers: unread counters and keyset pagination.
+
+The header badge needs only the number of unread notifications, so it is kept
+in the cache under a per-user key and computed with a ``COUNT`` on a miss. The
+signal handlers in ``lms.signals`` drop the key whenever a notification is
+created, changed or deleted; bulk writes must call
+``invalidate_unread_counts`` themselves because they bypass those signals.
+
+The feed is paginated on ``(created_at, id)`` rather than with ``OFFSET`` so
+every page is an index range scan on ``(student, created_at, id)`` no matter
+how deep the student scrolls.
+"""
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Notification, Student
+
+UNREAD_KEY = 'lms:unread-notifications:{user_id}'
+
+
+def _unread_timeout():
+    return getattr(settings, 'LMS_UNREAD_COUNT_TIMEOUT', 60)
+
+
+def get_unread_count(user_id):
+    """Return the number of unread notifications of the student behind ``user_id``."""
+    key = UNREAD_KEY.format(user_id=user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(student__user_id=user_id, is_read=False).count()
+        cache.set(key, count, _unread_timeout())
+    return count
+
+
+def invalidate_unread_count(user_id):
+    cache.delete(UNREAD_KEY.format(user_id=user_id))
+
+
+def invalidate_unread_counts(student_ids=None):
+    """Drop the cached counts of ``student_ids`` (every student when ``None``)."""
+    students = Student.objects.all() if student_ids is None else Student.objects.filter(id__in=student_ids)
+    user_ids = students.values_list('user_id', flat=True)
+    cache.delete_many([UNREAD_KEY.format(user_id=user_id) for user_id in user_ids.iterator()])
+
+
+FEED_PAGE_SIZE = 20
+MAX_FEED_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(notification):
+    raw = f'{notification.created_at.isoformat()}|{notification.pk}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeError):
+        raise InvalidCursor(f'Invalid cursor: {cursor!r}')
+
+
+def _feed_queryset(student, cursor):
+    notifications = Notification.objects.filter(student=student).order_by('-created_at', '-id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        notifications = notifications.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    return notifications
+
+
+def _split_page(page, limit):
+    if len(page) > limit:
+        page = page[:limit]
+        return page, encode_cursor(page[-1])
+    return page, None
+
+
+def _clamp_limit(limit):
+    return max(1, min(limit, MAX_FEED_PAGE_SIZE))
+
+
+def notification_page(student, cursor=None, limit=FEED_PAGE_SIZE):
+    """
+    Return ``(notifications, next_cursor)`` for one page of the student's feed, newest first.
+
+    ``next_cursor`` is ``None`` on the last page.
+    """
+    limit = _clamp_limit(limit)
+    return _split_page(list(_feed_queryset(student, cursor)[:limit + 1]), limit)
+
+
+async def anotification_page(student, cursor=None, limit=FEED_PAGE_SIZE):
+    """Async version of ``notification_page``."""
+    limit = _clamp_limit(limit)
+    return _split_page([n async for n in _feed_queryset(student, cursor)[:limit + 1]], limit)
+
+
+def mark_all_read(student):
+    """Mark every unread notification of ``student`` read with one UPDATE; return how many changed."""
+    updated = Notification.objects.filter(student=student, is_read=False).update(is_read=True)
+    invalidate_unread_count(student.user_id)
+    return updated
@@ -0,0 +1,188 @@
+"""
+Full-text search over the catalog: study material, sessions and the
+internship agenda.
+
+Every searchable row is stored as one document ``(kind, object_id, title,
+body)`` in an inverted index that the signal handlers in ``lms.signals`` keep
+up to date on each save and delete. ``SQLiteFTSBackend`` keeps the index in an
+FTS5 table of the main database (created by migration 0011, keyed by
+``document_rowid`` since 0015) and ranks matches with BM25, titles weighing
+more than bodies. ``DatabaseSearchBackend`` is a
+plain ``icontains`` fallback for databases without FTS5.
+
+``LMS_SEARCH_BACKEND`` names the backend class; another engine only needs the
+same ``index``/``remove``/``search``/``rebuild`` methods.
+"""
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection, connections, router, transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from .models import InternshipAgenda, Session, StudyMaterial
+
+INDEX_TABLE = 'lms_search_index'
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+SNIPPET_TOKENS = 16
+
+# title_field: shown as the result title; body_fields: the other indexed text;
+# url_name: the page that lists the object.
+Source = namedtuple('Source', ['model', 'title_field', 'body_fields', 'url_name'])
+
+SOURCES = {
+    'study_material': Source(StudyMaterial, 'title', ['description'], 'lms:study_material'),
+    'session': Source(Session, 'title', ['topic', 'description'], 'lms:session_details'),
+    'internship_agenda': Source(InternshipAgenda, 'week', ['agenda', 'deliverables'], 'lms:internship_agenda'),
+}
+KINDS = {source.model: kind for kind, source in SOURCES.items()}
+# Documents are stored under rowid = object_id * KIND_SLOTS + KIND_CODES[kind], so
+# an update or delete finds its row by rowid instead of scanning the UNINDEXED
+# kind/object_id columns. Codes are part of the stored data: never reuse one.
+KIND_CODES = {'study_material': 1, 'session': 2, 'internship_agenda': 3}
+KIND_SLOTS = 16
+
+SearchResult = namedtuple('SearchResult', ['kind', 'object_id', 'title', 'snippet', 'score'])
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def document(instance):
+    """Return ``(kind, object_id, title, body)`` for a searchable model instance."""
+    kind = KINDS[type(instance)]
+    source = SOURCES[kind]
+    body = '\n'.join(getattr(instance, field) or '' for field in source.body_fields)
+    return kind, instance.pk, getattr(instance, source.title_field), body
+
+
+def document_rowid(kind, object_id):
+    return object_id * KIND_SLOTS + KIND_CODES[kind]
+
+
+def query_terms(query):
+    """Split free text into search terms, dropping punctuation and query syntax."""
+    return _TOKEN_RE.findall(query.lower())
+
+
+def result_data(result):
+    return {
+        'type': result.kind,
+        'id': result.object_id,
+        'title': result.title,
+        'snippet': result.snippet,
+        'score': round(result.score, 4),
+        'url': reverse(SOURCES[result.kind].url_name),
+    }
+
+
+class SQLiteFTSBackend:
+    """Inverted index in an FTS5 virtual table next to the content tables."""
+
+    def index(self, instance):
+        kind, object_id, title, body = document(instance)
+        rowid = document_rowid(kind, object_id)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {INDEX_TABLE} WHERE rowid = %s', [rowid])
+            cursor.execute(
+                f'INSERT INTO {INDEX_TABLE} (rowid, kind, object_id, title, body) VALUES (%s, %s, %s, %s, %s)',
+                [rowid, kind, object_id, title, body],
+            )
+
+    def remove(self, instance):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {INDEX_TABLE} WHERE rowid = %s', [document_rowid(KINDS[type(instance)], instance.pk)]
+            )
+
+    def search(self, query, kinds=None, limit=SEARCH_LIMIT):
+        terms = query_terms(query)
+        if not terms:
+            return []
+        # Quote every term so user input is never parsed as FTS5 syntax; the
+        # last one is a prefix so results appear while the user is typing.
+        match = ' '.join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+        sql = (
+            f"SELECT kind, object_id, title, snippet({INDEX_TABLE}, 3, '', '', '...', {SNIPPET_TOKENS}), "
+            f"bm25({INDEX_TABLE}, 0, 0, 10.0, 1.0) AS rank "
+            f'FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s'
+        )
+        params = [match.strip()]
+        if kinds:
+            sql += f" AND kind IN ({', '.join(['%s'] * len(kinds))})"
+            params.extend(kinds)
+        sql += ' ORDER BY rank LIMIT %s'
+        params.append(limit)
+        with connections[router.db_for_read(StudyMaterial)].cursor() as cursor:
+            cursor.execute(sql, params)
+            # bm25() is lower for better matches; flip it so higher scores rank first.
+            return [SearchResult(kind, int(object_id), title, snippet, -rank) for kind, object_id, title, snippet, rank in cursor.fetchall()]
+
+    def rebuild(self):
+        """Re-index every searchable row; returns the number of documents."""
+        count = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {INDEX_TABLE}')
+            for source in SOURCES.values():
+                documents = [
+                    (document_rowid(kind, object_id), kind, object_id, title, body)
+                    for kind, object_id, title, body in map(document, source.model.objects.iterator())
+                ]
+                cursor.executemany(
+                    f'INSERT INTO {INDEX_TABLE} (rowid, kind, object_id, title, body) VALUES (%s, %s, %s, %s, %s)',
+                    documents,
+                )
+                count += len(documents)
+        return count
+
+
+class DatabaseSearchBackend:
+    """Unindexed fallback: ``icontains`` over the source fields, titles ranked first."""
+
+    def index(self, instance):
+        pass
+
+    def remove(self, instance):
+        pass
+
+    def search(self, query, kinds=None, limit=SEARCH_LIMIT):
+        terms = query_terms(query)
+        if not terms:
+            return []
+        results = []
+        for kind, source in SOURCES.items():
+            if kinds and kind not in kinds:
+                continue
+            fields = [source.title_field] + source.body_fields
+            matches = source.model.objects.all()
+            for term in terms:
+                term_filter = Q()
+                for field in fields:
+                    term_filter |= Q(**{f'{field}__icontains': term})
+                matches = matches.filter(term_filter)
+            for instance in matches[:limit]:
+                kind, object_id, title, body = document(instance)
+                score = sum(title.lower().count(term) * 10 + body.lower().count(term) for term in terms)
+                results.append(SearchResult(kind, object_id, title, body[:200], float(score)))
+        results.sort(key=lambda result: result.score, reverse=True)
+        return results[:limit]
+
+    def rebuild(self):
+        return 0
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(getattr(settings, 'LMS_SEARCH_BACKEND', 'lms.search.SQLiteFTSBackend'))()
+    return _backend
+
+
+def search(query, kinds=None, limit=SEARCH_LIMIT):
+    """Return up to ``limit`` ranked ``SearchResult``s for ``query``, optionally only of ``kinds``."""
+    return get_backend().search(query, kinds, max(1, min(limit, MAX_SEARCH_LIMIT)))
@@ -0,0 +1,108 @@
+"""
+Search and filtering over training sessions.
+
+Every filter maps onto one of the ``Session`` indexes: ``mentor`` and
+``topic`` onto ``(mentor|topic, date, start_time)``, a bare date range onto
+``(date, start_time)`` and ``has_recording`` onto the partial recordings
+index. Results come newest first and are paginated on ``(date, start_time,
+id)`` so a deep page is still an index range scan.
+"""
+import base64
+from datetime import date, time
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from .models import HAS_RECORDING, Session
+from .notifications import InvalidCursor
+
+SEARCH_PAGE_SIZE = 50
+MAX_SEARCH_PAGE_SIZE = 200
+
+
+def encode_cursor(session):
+    raw = f'{session.date.isoformat()}|{session.start_time.isoformat()}|{session.pk}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        day, start_time, pk = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return date.fromisoformat(day), time.fromisoformat(start_time), int(pk)
+    except (ValueError, UnicodeError):
+        raise InvalidCursor(f'Invalid cursor: {cursor!r}')
+
+
+def _parse_date(value, name):
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f'Invalid {name}: {value!r} (expected YYYY-MM-DD)')
+    return parsed
+
+
+def _parse_flag(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def session_queryset(topic=None, mentor=None, date_from=None, date_to=None, has_recording=None, is_completed=None):
+    """
+    Sessions matching the given filters; ``None`` or ``''`` leaves a filter out.
+
+    ``date_from``/``date_to`` accept dates or ``YYYY-MM-DD`` strings and
+    ``has_recording``/``is_completed`` accept booleans or ``'true'``/``'false'``.
+    Raises ``ValueError`` for a malformed date.
+    """
+    sessions = Session.objects.all()
+    if topic:
+        sessions = sessions.filter(topic=topic)
+    if mentor:
+        sessions = sessions.filter(mentor=mentor)
+    if date_from:
+        sessions = sessions.filter(date__gte=date_from if isinstance(date_from, date) else _parse_date(date_from, 'date_from'))
+    if date_to:
+        sessions = sessions.filter(date__lte=date_to if isinstance(date_to, date) else _parse_date(date_to, 'date_to'))
+    if has_recording not in (None, ''):
+        sessions = sessions.filter(HAS_RECORDING) if _parse_flag(has_recording) else sessions.exclude(HAS_RECORDING)
+    if is_completed not in (None, ''):
+        sessions = sessions.filter(is_completed=_parse_flag(is_completed))
+    return sessions.order_by('-date', '-start_time', '-id')
+
+
+def search_sessions(filters, cursor=None, limit=SEARCH_PAGE_SIZE):
+    """
+    Return ``(sessions, next_cursor)`` for one page of ``session_queryset(**filters)``.
+
+    ``next_cursor`` is ``None`` on the last page.
+    """
+    limit = max(1, min(limit, MAX_SEARCH_PAGE_SIZE))
+    sessions = session_queryset(**filters)
+    if cursor:
+        day, start_time, pk = decode_cursor(cursor)
+        sessions = sessions.filter(
+            Q(date__lt=day)
+            | Q(date=day, start_time__lt=start_time)
+            | Q(date=day, start_time=start_time, id__lt=pk)
+        )
+    page = list(sessions[:limit + 1])
+    if len(page) > limit:
+        page = page[:limit]
+        return page, encode_cursor(page[-1])
+    return page, None
+
+
+def session_data(session):
+    return {
+        'id': session.id,
+        'title': session.title,
+        'topic': session.topic,
+        'mentor': session.mentor,
+        'date': session.date.isoformat(),
+        'start_time': session.start_time.isoformat(),
+        'end_time': session.end_time.isoformat(),
+        'is_completed': session.is_completed,
+        'has_recording': session.has_recording,
+        'recording_url': session.recording_url,
+    }
@@ -0,0 +1,88 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .catalog import bump_catalog_version
+from .db import configure_sqlite_connection
+from .events import SESSIONS_CHANNEL, get_broker, publish_notification, session_event, student_channel
+from .models import (
+    Assessment, Attendance, InternshipAgenda, Notification, Session, Student, StudentAssessment, StudyMaterial,
+)
+from .notifications import get_unread_count, invalidate_unread_count
+from .search import get_backend as get_search_backend
+from .summaries import invalidate_all_summaries, invalidate_student_summary
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    configure_sqlite_connection(connection)
+
+
+@receiver([post_save, post_delete], sender=Attendance)
+@receiver([post_save, post_delete], sender=StudentAssessment)
+def student_summary_changed(sender, instance, **kwargs):
+    invalidate_student_summary(instance.student_id)
+
+
+@receiver([post_save, post_delete], sender=Session)
+@receiver([post_save, post_delete], sender=Assessment)
+def catalog_summary_changed(sender, instance, **kwargs):
+    invalidate_all_summaries()
+
+
+@receiver([post_save, post_delete], sender=Session)
+@receiver([post_save, post_delete], sender=StudyMaterial)
+@receiver([post_save, post_delete], sender=InternshipAgenda)
+def catalog_page_changed(sender, instance, **kwargs):
+    bump_catalog_version(sender)
+    if kwargs['signal'] is post_delete:
+        get_search_backend().remove(instance)
+    else:
+        get_search_backend().index(instance)
+
+
+@receiver([post_save, post_delete], sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    user_id = Student.objects.filter(pk=instance.student_id).values_list('user_id', flat=True).first()
+    if user_id is None:
+        return
+    invalidate_unread_count(user_id)
+    if kwargs.get('created') and get_broker().has_subscribers(student_channel(instance.student_id)):
+        transaction.on_commit(lambda: publish_notification(instance, get_unread_count(user_id)))
+
+
+def _is_upcoming(value):
+    """Whether a session dated ``value`` is today or later, so it is listed under upcoming sessions."""
+    # A date assigned from form or JSON input stays a string until the instance is reloaded.
+    if isinstance(value, str):
+        value = parse_date(value)
+    return value is not None and value >= timezone.now().date()
+
+
+@receiver(pre_save, sender=Session)
+def remember_session_date(sender, instance, **kwargs):
+    # session_changed needs the stored date to notice a session leaving the upcoming list.
+    instance._stored_date = None
+    if instance.pk is not None and get_broker().has_subscribers(SESSIONS_CHANNEL):
+        instance._stored_date = Session.objects.filter(pk=instance.pk).values_list('date', flat=True).first()
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def session_changed(sender, instance, **kwargs):
+    if not get_broker().has_subscribers(SESSIONS_CHANNEL):
+        return
+    # Edits to past sessions never show on a dashboard, so only upcoming ones are pushed; a
+    # session moved into the past is removed from the dashboards that still list it.
+    if _is_upcoming(instance.date):
+        event = 'session_deleted' if kwargs['signal'] is post_delete else 'session'
+    elif kwargs['signal'] is post_save and _is_upcoming(getattr(instance, '_stored_date', None)):
+        event = 'session_deleted'
+    else:
+        return
+    # Build the payload now: a deleted instance loses its pk once the delete completes.
+    data = session_event(instance)
+    transaction.on_commit(lambda: get_broker().publish(SESSIONS_CHANNEL, event, data))
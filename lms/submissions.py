@@ -0,0 +1,292 @@
+"""
+Queued quiz submissions.
+
+When ``LMS_QUIZ_SUBMISSION_MODE`` is ``'queued'``, ``quiz_submit`` only appends
+the POST to a durable local queue and redirects to a results page that polls
+for the outcome. Grading and the database writes happen in batches in the
+``process_quiz_submissions`` worker, so a burst of submissions at the end of a
+timed test turns into a handful of short write transactions instead of one
+per request.
+
+The queue lives in its own SQLite file (``LMS_SUBMISSION_QUEUE_PATH``) so
+appending to it never contends with the main database's write lock.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .attempts import allocate_attempt_number
+from .grading import DEFAULT_ANSWER_KEY, get_mock_test_answer_key, with_raw_questions
+from .models import Assessment, MockTest, Student, StudentAssessment, StudentMockTest
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+PROCESSING = 'processing'
+DONE = 'done'
+FAILED = 'failed'
+
+# Seconds after which a claim by a still-running process is considered abandoned.
+DEFAULT_CLAIM_TIMEOUT = 600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submission (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    receipt TEXT NOT NULL UNIQUE,
+    student_id INTEGER NOT NULL,
+    mock_test_id INTEGER,
+    answers TEXT NOT NULL,
+    submitted_at TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    claimed_by TEXT,
+    claimed_at TEXT,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS submission_status ON submission (status, id);
+"""
+
+
+def submission_mode():
+    return getattr(settings, 'LMS_QUIZ_SUBMISSION_MODE', 'sync')
+
+
+def claim_timeout():
+    return getattr(settings, 'LMS_SUBMISSION_CLAIM_TIMEOUT', DEFAULT_CLAIM_TIMEOUT)
+
+
+def _process_alive(worker_id):
+    """Whether the process in ``worker_id`` (``'<pid>-<thread>'``) still runs on this host."""
+    try:
+        pid = int(str(worker_id).split('-', 1)[0])
+    except ValueError:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SubmissionQueue:
+    """Durable FIFO of quiz submissions backed by a local SQLite file."""
+
+    def __init__(self, path=None):
+        self.path = str(path or settings.LMS_SUBMISSION_QUEUE_PATH)
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(submission)')}
+            if 'claimed_at' not in columns:  # queue files created before claim leases
+                conn.execute('ALTER TABLE submission ADD COLUMN claimed_at TEXT')
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, student_id, mock_test_id, answers):
+        """Append a submission and return its receipt."""
+        if not isinstance(answers, dict):
+            raise TypeError(f'answers must be a dict of question number to answer, not {type(answers).__name__}')
+        receipt = uuid.uuid4().hex
+        self.connection.execute(
+            'INSERT INTO submission (receipt, student_id, mock_test_id, answers, submitted_at) VALUES (?, ?, ?, ?, ?)',
+            (receipt, student_id, mock_test_id, json.dumps(answers), timezone.now().isoformat()),
+        )
+        return receipt
+
+    def claim(self, batch_size, worker_id):
+        """Atomically mark up to ``batch_size`` pending submissions as ours and return them."""
+        conn = self.connection
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                "UPDATE submission SET status = ?, claimed_by = ?, claimed_at = ? WHERE id IN "
+                "(SELECT id FROM submission WHERE status = ? ORDER BY id LIMIT ?)",
+                (PROCESSING, worker_id, timezone.now().isoformat(), PENDING, batch_size),
+            )
+            rows = conn.execute(
+                'SELECT * FROM submission WHERE status = ? AND claimed_by = ? ORDER BY id',
+                (PROCESSING, worker_id),
+            ).fetchall()
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [dict(row) for row in rows]
+
+    def complete(self, outcomes):
+        """Record ``{receipt: result}`` for a processed batch."""
+        self.connection.executemany(
+            'UPDATE submission SET status = ?, result = ? WHERE receipt = ?',
+            [(DONE, json.dumps(result), receipt) for receipt, result in outcomes.items()],
+        )
+
+    def fail(self, errors):
+        """Record ``{receipt: error message}`` for submissions that could not be graded."""
+        self.connection.executemany(
+            'UPDATE submission SET status = ?, error = ? WHERE receipt = ?',
+            [(FAILED, error, receipt) for receipt, error in errors.items()],
+        )
+
+    def release_stale(self, timeout=None):
+        """
+        Return abandoned claims to the queue and return how many were released.
+
+        A claim is abandoned when the claiming process is gone or it is older
+        than ``timeout`` seconds (``LMS_SUBMISSION_CLAIM_TIMEOUT``); claims of
+        live workers are left alone so nothing is graded twice.
+        """
+        timeout = claim_timeout() if timeout is None else timeout
+        cutoff = (timezone.now() - timedelta(seconds=timeout)).isoformat()
+        conn = self.connection
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            claims = conn.execute(
+                'SELECT DISTINCT claimed_by, claimed_at FROM submission WHERE status = ?', (PROCESSING,)
+            ).fetchall()
+            stale = [
+                (claim['claimed_by'], claim['claimed_at']) for claim in claims
+                if claim['claimed_at'] is None or claim['claimed_at'] < cutoff or not _process_alive(claim['claimed_by'])
+            ]
+            released = 0
+            for claimed_by, claimed_at in stale:
+                released += conn.execute(
+                    'UPDATE submission SET status = ?, claimed_by = NULL, claimed_at = NULL '
+                    'WHERE status = ? AND claimed_by IS ? AND claimed_at IS ?',
+                    (PENDING, PROCESSING, claimed_by, claimed_at),
+                ).rowcount
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return released
+
+    def get(self, receipt):
+        row = self.connection.execute('SELECT * FROM submission WHERE receipt = ?', (receipt,)).fetchone()
+        if row is None:
+            return None
+        submission = dict(row)
+        submission['result'] = json.loads(submission['result']) if submission['result'] else None
+        return submission
+
+
+_queue = None
+
+
+def get_queue():
+    global _queue
+    if _queue is None:
+        _queue = SubmissionQueue()
+    return _queue
+
+
+def grade_context(grade):
+    return {
+        'score': grade.score,
+        'total_questions': grade.total_questions,
+        'percentage': round(grade.percentage, 1),
+        'incorrect': grade.incorrect,
+        'results': grade.results,
+    }
+
+
+def save_default_quiz_result(student, answers, score, submitted_at=None):
+    """Store a default quiz attempt on the student's 'Python Basics Quiz' assessment."""
+    submitted_at = submitted_at or timezone.now()
+    assessment, created = Assessment.objects.get_or_create(
+        title='Python Basics Quiz',
+        defaults={
+            'description': 'Test your knowledge of Python fundamentals',
+            'topic': 'Python Programming',
+            'total_marks': 10,
+            'duration_minutes': 45,
+            'due_date': timezone.now() + timezone.timedelta(days=30),
+            'is_active': True
+        }
+    )
+
+    student_assessment, created = StudentAssessment.objects.get_or_create(
+        student=student,
+        assessment=assessment,
+        defaults={
+            'max_score': 10,
+            'answers': answers,
+            'submitted_at': submitted_at,
+            'is_completed': True
+        }
+    )
+    student_assessment.score = score
+    student_assessment.answers = answers
+    student_assessment.submitted_at = submitted_at
+    student_assessment.is_completed = True
+    student_assessment.save()
+    return student_assessment
+
+
+def grade_submission(submission, mock_tests):
+    """Grade and store one claimed submission; returns its quiz results context."""
+    answers = json.loads(submission['answers'])
+    submitted_at = datetime.fromisoformat(submission['submitted_at'])
+
+    if submission['mock_test_id']:
+        mock_test = mock_tests.get(submission['mock_test_id'])
+        if mock_test is None:
+            raise LookupError('Mock test not found')
+        grade = get_mock_test_answer_key(mock_test).grade(answers)
+        StudentMockTest.objects.create(
+            student_id=submission['student_id'],
+            mock_test=mock_test,
+            score=grade.score,
+            max_score=mock_test.total_marks,
+            answers=answers,
+            submitted_at=submitted_at,
+            is_completed=True,
+            attempt_number=allocate_attempt_number(submission['student_id'], mock_test.id),
+        )
+    else:
+        grade = DEFAULT_ANSWER_KEY.grade(answers)
+        student = Student(pk=submission['student_id'])
+        save_default_quiz_result(student, answers, grade.score, submitted_at)
+
+    return dict(grade_context(grade), mock_test_id=submission['mock_test_id'])
+
+
+def process_batch(submissions):
+    """
+    Grade and store a batch of claimed submissions in one transaction.
+
+    Each submission runs in its own savepoint, so a malformed one is rolled
+    back (its attempt number included) without failing the rest. Returns
+    ``{receipt: result}`` where ``result`` holds the quiz results context, or
+    ``{'error': message}`` for a submission that could not be graded.
+    """
+    mock_test_ids = {s['mock_test_id'] for s in submissions if s['mock_test_id']}
+    mock_tests = with_raw_questions(MockTest.objects).in_bulk(mock_test_ids)
+
+    outcomes = {}
+    with transaction.atomic():
+        for submission in submissions:
+            try:
+                with transaction.atomic():
+                    outcomes[submission['receipt']] = grade_submission(submission, mock_tests)
+            except Exception as exc:
+                logger.warning('Submission %s failed', submission['receipt'], exc_info=True)
+                outcomes[submission['receipt']] = {'error': str(exc) or type(exc).__name__}
+    return outcomes
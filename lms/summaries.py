@@ -0,0 +1,155 @@
+"""
+Per-student summaries for the dashboard and placement pages.
+
+The dashboard counters are computed with two aggregate queries and stored in
+the default cache. Per-student entries are dropped by the signal handlers in
+``lms.signals`` when the student's attendance or assessments change; writes to
+shared catalog tables (sessions, assessments) bump a global version instead so
+every student's entry goes stale at once.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Avg, Count, DecimalField, Exists, F, OuterRef, Q, Subquery, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import Assessment, Attendance, Session, StudentAssessment, StudentMockTest
+
+SUMMARY_KEY = 'lms:dashboard-summary:{student_id}:{version}:{today}'
+CATALOG_VERSION_KEY = 'lms:dashboard-summary:catalog-version'
+UPCOMING_SESSIONS_LIMIT = 3
+# Matches StudentMockTest.score/max_score, so the subqueries come back as Decimals.
+SCORE_FIELD = DecimalField(max_digits=5, decimal_places=2)
+
+
+def _summary_timeout():
+    return getattr(settings, 'LMS_DASHBOARD_SUMMARY_TIMEOUT', 300)
+
+
+def _catalog_version():
+    return cache.get_or_set(CATALOG_VERSION_KEY, 1, timeout=None)
+
+
+def _summary_key(student_id):
+    return SUMMARY_KEY.format(
+        student_id=student_id,
+        version=_catalog_version(),
+        today=timezone.now().date().isoformat(),
+    )
+
+
+def compute_dashboard_summary(student):
+    """Compute the dashboard counters for ``student`` straight from the database."""
+    attendance = Attendance.objects.filter(student=student).aggregate(
+        total=Count('id'),
+        present=Count('id', filter=Q(is_present=True)),
+    )
+    # Completion is an EXISTS probe per active assessment on the (student,
+    # assessment) unique index, so other students' rows are never read.
+    completed = StudentAssessment.objects.filter(student=student, assessment=OuterRef('pk'), is_completed=True)
+    assessments = Assessment.objects.filter(is_active=True).aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Exists(completed)),
+    )
+    upcoming_sessions = list(
+        Session.objects.filter(date__gte=timezone.now().date(), is_completed=False)
+        .order_by('date', 'start_time')[:UPCOMING_SESSIONS_LIMIT]
+    )
+
+    total_sessions = attendance['total']
+    attended_sessions = attendance['present']
+    attendance_percentage = (attended_sessions / total_sessions * 100) if total_sessions > 0 else 0
+
+    return {
+        'upcoming_sessions': upcoming_sessions,
+        'attendance_percentage': round(attendance_percentage, 1),
+        'total_sessions': total_sessions,
+        'attended_sessions': attended_sessions,
+        'total_assessments': assessments['total'],
+        'completed_assessments': assessments['completed'],
+    }
+
+
+def get_dashboard_summary(student):
+    """Return the dashboard counters for ``student``, served from cache when possible."""
+    key = _summary_key(student.pk)
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute_dashboard_summary(student)
+        cache.set(key, summary, _summary_timeout())
+    return summary
+
+
+def invalidate_student_summary(student_id):
+    cache.delete(_summary_key(student_id))
+
+
+def invalidate_student_summaries(student_ids):
+    cache.delete_many([_summary_key(student_id) for student_id in student_ids])
+
+
+def invalidate_all_summaries():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, 2, timeout=None)
+
+
+def _best_attempts_window(attempts):
+    ranked = attempts.order_by().annotate(
+        rank=Window(
+            RowNumber(),
+            partition_by=[F('mock_test_id')],
+            order_by=[F('score').desc(), F('submitted_at').desc()],
+        ),
+        attempts=Window(Count('id'), partition_by=[F('mock_test_id')]),
+    ).filter(rank=1)
+    return ranked.values('mock_test_id', 'score', 'max_score', 'submitted_at', 'attempts')
+
+
+def _best_attempts_grouped(attempts):
+    best = attempts.filter(mock_test_id=OuterRef('mock_test_id')).order_by('-score', '-submitted_at')
+    return (
+        attempts.order_by()
+        .values('mock_test_id')
+        .annotate(
+            attempts=Count('id'),
+            score=Subquery(best.values('score')[:1], output_field=SCORE_FIELD),
+            max_score=Subquery(best.values('max_score')[:1], output_field=SCORE_FIELD),
+            submitted_at=Subquery(best.values('submitted_at')[:1]),
+        )
+        .values('mock_test_id', 'score', 'max_score', 'submitted_at', 'attempts')
+    )
+
+
+def best_mock_test_attempts(student, using='default'):
+    """
+    Return ``{mock_test_id: row}`` with the best completed attempt of each mock test.
+
+    Each row carries the best ``score``, its ``percentage``, ``submitted_at`` and the
+    total number of ``attempts``. Backends with window functions answer in a single
+    ranked query; older SQLite builds fall back to one grouped query with
+    correlated subqueries for the best attempt.
+    """
+    attempts = StudentMockTest.objects.using(using).filter(student=student, is_completed=True)
+    if connections[using].features.supports_over_clause:
+        rows = _best_attempts_window(attempts)
+    else:
+        rows = _best_attempts_grouped(attempts)
+
+    best = {}
+    for row in rows:
+        score, max_score = row['score'], row['max_score']
+        row['percentage'] = (score / max_score) * 100 if score is not None and max_score > 0 else 0
+        best[row['mock_test_id']] = row
+    return best
+
+
+def assessment_counts(student, assessments):
+    """Return pending/completed counts and the average score from one conditional aggregate."""
+    return StudentAssessment.objects.filter(student=student, assessment__in=assessments).aggregate(
+        pending=Count('id', filter=Q(is_completed=False, assessment__due_date__gte=timezone.now().date())),
+        completed=Count('id', filter=Q(is_completed=True)),
+        average=Avg('score', filter=Q(is_completed=True, score__isnull=False)),
+    )
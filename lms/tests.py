@@ -0,0 +1,820 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from reportlab.pdfgen import canvas
+
+from . import documents, uploads, urls
+from .attempts import allocate_attempt_number, allocate_attempt_numbers
+from .broadcasts import deliver_broadcast
+from .db import ReadReplicaRouter
+from .downloads import file_etag, parse_range, serve_file
+from .grading import DEFAULT_ANSWER_KEY, DEFAULT_QUIZ_QUESTIONS, get_answer_key
+from .instrumentation import assert_query_budget, view_budget
+from .events import SESSIONS_CHANNEL
+from .marking import MarkingError, mark_session_attendance, parse_marks_csv
+from .middleware import PIN_COOKIE, ReadReplicaMiddleware
+from .models import (
+    Assessment, Attendance, Broadcast, Certificate, InternshipAgenda, MaterialUpload, MockInterview, MockTest, MockTestAttemptCounter,
+    Notification, OfferLetter, Project, Session, Student, StudentAssessment, StudentMockTest, StudyMaterial,
+)
+from .notifications import InvalidCursor, notification_page
+from .search import INDEX_TABLE, SQLiteFTSBackend
+from .session_search import search_sessions
+from .submissions import PENDING, PROCESSING, SubmissionQueue, process_batch
+from .summaries import get_dashboard_summary
+from .uploads import part_path, process_upload, start_upload, write_chunk
+
+# Query strings for pages that need one to do real work.
+QUERY_STRINGS = {
+    'search': '?q=python',
+    'session_search': '?mentor=Mentor&date_from=2020-01-01',
+}
+
+# Rows of each kind per student: enough that a query per row shows up as a blown budget.
+ROWS = 5
+
+
+class QueryBudgetTests(TestCase):
+    """Every page with a declared ``@query_budget`` stays within it on a cold cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('budget', password='password123')
+        student = Student.objects.create(user=cls.user, full_name='Budget Student')
+        questions = [{'question': 'Q', 'options': ['a', 'b'], 'correct': 'a'}]
+        for number in range(ROWS):
+            session = Session.objects.create(
+                title=f'Python session {number}', topic='Python', mentor='Mentor',
+                date=date.today() + timedelta(days=number - 2), start_time=time(10), end_time=time(11),
+                recording_url=f'https://example.com/{number}' if number % 2 else '',
+            )
+            Attendance.objects.create(student=student, session=session, is_present=bool(number % 2))
+            Assessment.objects.create(title=f'Assessment {number}', topic='Python', due_date=timezone.now() + timedelta(days=3))
+            mock_test = MockTest.objects.create(title=f'Mock test {number}', topic='Python', questions=questions, total_marks=1)
+            StudentMockTest.objects.create(
+                student=student, mock_test=mock_test, score=1, max_score=1, is_completed=True, attempt_number=1,
+            )
+            Project.objects.create(student=student, title=f'Project {number}', description='Python project')
+            Certificate.objects.create(student=student, title=f'Certificate {number}')
+            MockInterview.objects.create(student=student, title=f'Interview {number}')
+            Notification.objects.create(student=student, title=f'Notification {number}', message='Hello')
+            StudyMaterial.objects.create(title=f'Python notes {number}', file_type='pdf')
+            InternshipAgenda.objects.create(week=f'Week {number}', agenda='Python', order=number)
+        OfferLetter.objects.create(student=student, start_date=date.today(), compensation=10000)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs('lms.queries', 'INFO') as logs:
+            response = self.client.get(reverse('lms:profile'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", ')
+        self.assertIn('"view": "lms:profile"', logs.output[0])
+
+    @override_settings(LMS_QUERY_INSTRUMENTATION=False)
+    def test_views_stay_within_query_budget(self):
+        budgeted = [
+            pattern for pattern in urls.urlpatterns
+            if isinstance(pattern, URLPattern) and view_budget(pattern.callback) is not None
+        ]
+        self.assertTrue(budgeted)
+        for pattern in budgeted:
+            if pattern.pattern.converters:
+                continue
+            with self.subTest(view=pattern.name):
+                cache.clear()
+                path = reverse(f'{urls.app_name}:{pattern.name}') + QUERY_STRINGS.get(pattern.name, '')
+                response = assert_query_budget(self.client, path)
+                self.assertEqual(response.status_code, 200)
+
+
+def create_student(username):
+    user = User.objects.create_user(username, password='password123')
+    return Student.objects.create(user=user, full_name=username.title())
+
+
+class AttemptAllocationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_student('attempts')
+        cls.mock_test = MockTest.objects.create(title='Mock test', topic='Python', questions=[], total_marks=1)
+
+    def allocate(self, count=1):
+        with transaction.atomic():
+            return allocate_attempt_numbers(self.student.id, self.mock_test.id, count)
+
+    def test_numbers_are_consecutive(self):
+        self.assertEqual(self.allocate(), 1)
+        self.assertEqual(self.allocate(), 2)
+        self.assertEqual(self.allocate(count=3), 3)
+        self.assertEqual(self.allocate(), 6)
+
+    def test_rolled_back_allocation_gives_its_number_back(self):
+        self.allocate()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            allocate_attempt_number(self.student.id, self.mock_test.id)
+            raise RuntimeError
+        self.assertEqual(self.allocate(), 2)
+
+    def test_missing_counter_continues_after_existing_attempts(self):
+        for number in (1, 2):
+            StudentMockTest.objects.create(student=self.student, mock_test=self.mock_test, attempt_number=number)
+        self.assertEqual(self.allocate(), 3)
+        self.assertEqual(MockTestAttemptCounter.objects.get(student=self.student).last_attempt, 3)
+
+    def test_counter_created_concurrently(self):
+        competitor = []
+
+        def create_counter_first(execute, sql, params, many, context):
+            # Another submission creates the counter between our UPDATE and INSERT.
+            if 'MAX(' in sql and not competitor:
+                competitor.append(MockTestAttemptCounter.objects.create(
+                    student=self.student, mock_test=self.mock_test, last_attempt=1,
+                ))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(create_counter_first):
+            self.assertEqual(self.allocate(), 2)
+        self.assertTrue(competitor)
+        self.assertEqual(self.allocate(), 3)
+
+
+class AnswerKeyTests(SimpleTestCase):
+    questions = [
+        {'question': 'Single', 'options': ['a', 'b', 'c'], 'correct': 'b'},
+        {'question': 'Multi', 'options': ['a', 'b', 'c'], 'correct': ['a', 'c'], 'weight': 2},
+        {'question': 'Free text', 'options': [], 'correct': 42},
+    ]
+
+    def test_compiled_once_per_version(self):
+        raw = json.dumps(self.questions)
+        key = get_answer_key('answer-key-test', raw)
+        self.assertIs(get_answer_key('answer-key-test', raw), key)
+        self.assertEqual(key.max_score, 4)
+
+        changed = json.dumps(self.questions[:1])
+        recompiled = get_answer_key('answer-key-test', changed)
+        self.assertIsNot(recompiled, key)
+        self.assertEqual(len(recompiled), 1)
+
+    def test_multi_select_needs_exactly_the_correct_options(self):
+        key = get_answer_key('multi-select-test', self.questions)
+        cases = [
+            (['c', 'a'], True),
+            (['a'], False),
+            (['a', 'b', 'c'], False),
+            ('a', False),
+            ([], False),
+        ]
+        for answer, is_correct in cases:
+            with self.subTest(answer=answer):
+                grade = key.grade({'0': 'b', '1': answer, '2': '42'})
+                self.assertEqual(grade.results[1]['is_correct'], is_correct)
+                self.assertEqual(grade.score, 4 if is_correct else 2)
+        self.assertEqual(key.grade({'1': ['a', 'c']}).results[1]['correct_answer'], 'a, c')
+
+    def test_default_quiz_key(self):
+        answers = {str(number): question['correct'] for number, question in enumerate(DEFAULT_QUIZ_QUESTIONS)}
+        answers['0'] = 'Error'
+        grade = DEFAULT_ANSWER_KEY.grade(answers)
+        self.assertEqual(grade.score, len(DEFAULT_QUIZ_QUESTIONS) - 1)
+        self.assertEqual(grade.incorrect, 1)
+
+
+class KeysetCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_student('cursors')
+        created_at = timezone.now()
+        # Equal timestamps (as from a broadcast) are ordered by id.
+        for number in range(5):
+            Notification.objects.create(student=cls.student, title=f'N{number}', message='m', created_at=created_at)
+        Notification.objects.create(student=cls.student, title='Older', message='m', created_at=created_at - timedelta(days=1))
+        for number in range(5):
+            Session.objects.create(
+                title=f'S{number}', topic='Python', mentor='Mentor', date=date(2024, 1, 1 + number // 3),
+                start_time=time(10), end_time=time(11),
+            )
+
+    def collect(self, fetch):
+        items, cursor, pages = [], None, 0
+        while True:
+            page, cursor = fetch(cursor)
+            items += page
+            pages += 1
+            if cursor is None:
+                return items, pages
+
+    def test_notification_feed_pages(self):
+        items, pages = self.collect(lambda cursor: notification_page(self.student, cursor, limit=2))
+        expected = list(Notification.objects.filter(student=self.student).order_by('-created_at', '-id'))
+        self.assertEqual(items, expected)
+        self.assertEqual(pages, 3)
+
+    def test_session_search_pages(self):
+        items, pages = self.collect(lambda cursor: search_sessions({'mentor': 'Mentor'}, cursor, limit=2))
+        self.assertEqual(items, list(Session.objects.order_by('-date', '-start_time', '-id')))
+        self.assertEqual(pages, 3)
+
+    def test_invalid_cursor(self):
+        for cursor in ('not base64!', 'bm9waXBl'):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    notification_page(self.student, cursor)
+                with self.assertRaises(InvalidCursor):
+                    search_sessions({}, cursor)
+
+    def test_feed_view_rejects_invalid_cursor(self):
+        self.client.force_login(self.student.user)
+        response = self.client.get(reverse('lms:notification_feed'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 400)
+
+
+class RangeRequestTests(SimpleTestCase):
+    def test_parse_range(self):
+        cases = [
+            (None, None),
+            ('', None),
+            ('bytes=0-99', (0, 99)),
+            ('bytes=100-', (100, 999)),
+            ('bytes=-100', (900, 999)),
+            ('bytes=-5000', (0, 999)),
+            ('bytes=900-5000', (900, 999)),
+            ('bytes=0-1,5-6', None),
+            ('items=0-1', None),
+            ('bytes=-', None),
+        ]
+        for header, expected in cases:
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 1000), expected)
+        for header in ('bytes=1000-', 'bytes=5-4', 'bytes=-0'):
+            with self.subTest(header=header), self.assertRaises(ValueError):
+                parse_range(header, 1000)
+
+    def setUp(self):
+        file = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+        file.write(bytes(range(256)) * 4)
+        file.close()
+        self.path = file.name
+        self.addCleanup(os.remove, self.path)
+        self.etag = file_etag(os.stat(self.path))
+
+    def serve(self, **headers):
+        response = serve_file(RequestFactory().get('/', **headers), self.path)
+        return response, b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_range_with_matching_if_range(self):
+        response, body = self.serve(HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE=self.etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(body, bytes(range(10, 20)))
+
+    def test_stale_if_range_sends_whole_file(self):
+        response, body = self.serve(HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(body), 1024)
+
+    def test_unsatisfiable_range(self):
+        response, body = self.serve(HTTP_RANGE='bytes=2048-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_if_none_match(self):
+        response, body = self.serve(HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class OfferLetterPdfTests(TestCase):
+    """The offer letter PDF is rendered once per content hash and revalidated by ETag."""
+
+    @classmethod
+    def setUpTestData(cls):
+        student = create_student('offer')
+        cls.letter = OfferLetter.objects.create(
+            student=student, title='Intern', company='Manac', start_date=date(2026, 1, 5), compensation=15000,
+            reporting_to='Manager', location='Hyderabad',
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        media = self.settings(MEDIA_ROOT=directory.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.client.force_login(self.letter.student.user)
+        patcher = mock.patch('lms.documents.render_offer_letter_pdf', wraps=documents.render_offer_letter_pdf)
+        self.render = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def download(self, **headers):
+        response = self.client.get(reverse('lms:download_offer_letter'), headers=headers)
+        self.addCleanup(response.close)
+        return response
+
+    def test_pdf_is_cached_by_content_hash(self):
+        first = self.download()
+        self.assertEqual(first.status_code, 200)
+        pdf_data = first.getvalue()
+        self.assertTrue(pdf_data.startswith(b'%PDF'))
+        self.letter.refresh_from_db()
+        self.assertEqual(first['ETag'], f'"{documents.offer_letter_hash(self.letter)}"')
+        second = self.download()
+        self.assertEqual(second.getvalue(), pdf_data)
+        self.assertEqual(self.render.call_count, 1)
+
+    def test_changed_letter_is_regenerated(self):
+        first = self.download()
+        self.letter.refresh_from_db()
+        old_path = self.letter.offer_letter_file.path
+        self.letter.compensation = 20000
+        self.letter.save()
+
+        second = self.download()
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual(self.render.call_count, 2)
+        self.letter.refresh_from_db()
+        self.assertNotEqual(self.letter.offer_letter_file.path, old_path)
+        self.assertFalse(os.path.exists(old_path))
+
+    def test_if_none_match_skips_rendering(self):
+        etag = self.download()['ETag']
+        response = self.download(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.render.call_count, 1)
+        self.assertEqual(self.download(if_none_match='"stale"').status_code, 200)
+
+class AttendanceMarkingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = [create_student(f'marking{number}') for number in range(3)]
+        cls.session = Session.objects.create(
+            title='Marked', topic='Python', mentor='Mentor', date=date.today(), start_time=time(10), end_time=time(11),
+        )
+        cls.mentor = User.objects.create_user('mentor', password='password123', is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_upsert_updates_existing_rows(self):
+        first, second, third = self.students
+        Attendance.objects.create(student=first, session=self.session, is_present=False)
+        self.assertEqual(get_dashboard_summary(first)['attended_sessions'], 0)
+
+        written = mark_session_attendance(self.session, {first.id: True, second.id: False, third.id: True})
+
+        self.assertEqual(written, 3)
+        marks = dict(Attendance.objects.filter(session=self.session).values_list('student_id', 'is_present'))
+        self.assertEqual(marks, {first.id: True, second.id: False, third.id: True})
+        self.assertFalse(Attendance.objects.filter(session=self.session, marked_at__isnull=True).exists())
+        self.session.refresh_from_db()
+        self.assertTrue(self.session.is_completed)
+        # bulk_create() skips the signals, so the cached summary is dropped explicitly.
+        self.assertEqual(get_dashboard_summary(first)['attended_sessions'], 1)
+
+    def test_unknown_student_writes_nothing(self):
+        with self.assertRaises(MarkingError):
+            mark_session_attendance(self.session, {self.students[0].id: True, 999999: True})
+        self.assertFalse(Attendance.objects.filter(session=self.session).exists())
+        self.session.refresh_from_db()
+        self.assertFalse(self.session.is_completed)
+
+    def test_completing_session_publishes_event(self):
+        broker = mock.Mock()
+        broker.has_subscribers.return_value = True
+        with mock.patch('lms.signals.get_broker', return_value=broker), self.captureOnCommitCallbacks(execute=True):
+            mark_session_attendance(self.session, {self.students[0].id: True})
+        broker.publish.assert_called_once()
+        channel, event, data = broker.publish.call_args.args
+        self.assertEqual((channel, event, data['id'], data['is_completed']), (SESSIONS_CHANNEL, 'session', self.session.id, True))
+
+    def test_malformed_csv_is_a_marking_error(self):
+        for content in (b'student_id,is_present\n\xff\xfe,1\n', b'student_id,is_present\n"' + b'x' * (csv.field_size_limit() + 1) + b'",1\n'):
+            with self.subTest(content=content[:30]), self.assertRaises(MarkingError):
+                parse_marks_csv(io.BytesIO(content))
+
+        self.client.force_login(self.mentor)
+        path = reverse('lms:mark_attendance', args=[self.session.id])
+        upload = SimpleUploadedFile('marks.csv', b'student_id,is_present\n\xff,1\n', content_type='text/csv')
+        self.assertEqual(self.client.post(path, {'file': upload}).status_code, 400)
+
+    def test_view_rejects_malformed_body(self):
+        self.client.force_login(self.mentor)
+        path = reverse('lms:mark_attendance', args=[self.session.id])
+        for body in ({'attendance': 5}, {'attendance': {'student_id': 1}}, [1], {'attendance': [{'is_present': True}]}):
+            with self.subTest(body=body):
+                response = self.client.post(path, body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            path, {'attendance': [{'student_id': self.students[0].id, 'is_present': 'p'}], 'complete': False},
+            content_type='application/json',
+        )
+        self.assertEqual(response.json(), {'success': True, 'marked': 1, 'is_completed': False})
+
+
+class SessionEventTests(TestCase):
+    """Changes to upcoming sessions are pushed to the dashboards listening on the sessions channel."""
+
+    def setUp(self):
+        self.broker = mock.Mock()
+        self.broker.has_subscribers.return_value = True
+        patcher = mock.patch('lms.signals.get_broker', return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def save(self, session):
+        with self.captureOnCommitCallbacks(execute=True):
+            session.save()
+        return [call.args[1] for call in self.broker.publish.call_args_list]
+
+    def create_session(self, day):
+        return Session(title='Live', topic='Python', mentor='Mentor', date=day, start_time=time(10), end_time=time(11))
+
+    def test_string_date_is_compared_as_a_date(self):
+        tomorrow = date.today() + timedelta(days=1)
+        self.assertEqual(self.save(self.create_session(tomorrow.isoformat())), ['session'])
+
+    def test_past_session_is_not_pushed(self):
+        self.assertEqual(self.save(self.create_session(date.today() - timedelta(days=3))), [])
+
+    def test_session_moved_into_the_past_is_removed(self):
+        session = self.create_session(date.today() + timedelta(days=1))
+        self.save(session)
+        self.broker.publish.reset_mock()
+        session.date = (date.today() - timedelta(days=1)).isoformat()
+        self.assertEqual(self.save(session), ['session_deleted'])
+
+class SubmissionQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_student('queued')
+        cls.mock_test = MockTest.objects.create(
+            title='Queued test', topic='Python', total_marks=1,
+            questions=[{'question': 'Q', 'options': ['a', 'b'], 'correct': 'a'}],
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.queue = SubmissionQueue(os.path.join(directory.name, 'queue.sqlite3'))
+        self.addCleanup(lambda: self.queue.connection.close())
+
+    def status(self, receipt):
+        return self.queue.get(receipt)['status']
+
+    def test_claims_do_not_overlap(self):
+        receipts = [self.queue.enqueue(self.student.id, self.mock_test.id, {'0': 'a'}) for number in range(3)]
+        first = self.queue.claim(2, f'{os.getpid()}-1')
+        second = self.queue.claim(2, f'{os.getpid()}-2')
+        self.assertEqual([row['receipt'] for row in first], receipts[:2])
+        self.assertEqual([row['receipt'] for row in second], receipts[2:])
+        self.assertEqual(self.queue.claim(2, f'{os.getpid()}-3'), [])
+        self.assertEqual({self.status(receipt) for receipt in receipts}, {PROCESSING})
+
+    def test_enqueue_rejects_non_dict_answers(self):
+        with self.assertRaises(TypeError):
+            self.queue.enqueue(self.student.id, None, ['a'])
+
+    def test_release_stale_keeps_live_claims(self):
+        receipt = self.queue.enqueue(self.student.id, None, {})
+        self.queue.claim(1, f'{os.getpid()}-1')
+        self.assertEqual(self.queue.release_stale(), 0)
+        self.assertEqual(self.status(receipt), PROCESSING)
+        # An expired lease is released even though its worker is still running.
+        self.assertEqual(self.queue.release_stale(timeout=0), 1)
+        self.assertEqual(self.status(receipt), PENDING)
+
+    def test_release_stale_frees_claims_of_exited_workers(self):
+        exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+        receipt = self.queue.enqueue(self.student.id, None, {})
+        self.queue.enqueue(self.student.id, None, {})
+        self.queue.claim(1, f'{exited.stdout.strip()}-1')
+        self.queue.claim(1, f'{os.getpid()}-1')
+        self.assertEqual(self.queue.release_stale(), 1)
+        self.assertEqual(self.status(receipt), PENDING)
+
+    def test_bad_submission_fails_alone(self):
+        good = self.queue.enqueue(self.student.id, self.mock_test.id, {'0': 'a'})
+        missing = self.queue.enqueue(self.student.id, 999999, {'0': 'a'})
+        also_good = self.queue.enqueue(self.student.id, self.mock_test.id, {'0': 'b'})
+        with self.assertLogs('lms.submissions', 'WARNING') as logs:
+            outcomes = process_batch(self.queue.claim(10, f'{os.getpid()}-1'))
+        self.assertEqual(len(logs.records), 1)
+
+        self.assertEqual(outcomes[missing], {'error': 'Mock test not found'})
+        self.assertEqual(outcomes[good]['score'], 1)
+        self.assertEqual(outcomes[also_good]['score'], 0)
+        attempts = StudentMockTest.objects.filter(student=self.student).order_by('attempt_number')
+        self.assertEqual(list(attempts.values_list('attempt_number', 'score')), [(1, 1), (2, 0)])
+
+    def test_quiz_submit_rejects_non_object_answers(self):
+        self.client.force_login(self.student.user)
+        response = self.client.post(reverse('lms:quiz_submit'), {'answers': json.dumps(['a'])})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StudentAssessment.objects.filter(student=self.student).exists())
+
+
+class SQLiteSearchTests(TestCase):
+    """The FTS5 index follows saves and deletes through the model signals."""
+
+    def search(self, query):
+        return [(result.kind, result.object_id) for result in SQLiteFTSBackend().search(query)]
+
+    def documents(self, instance):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {INDEX_TABLE} WHERE object_id = %s', [instance.pk])
+            return cursor.fetchone()[0]
+
+    def test_index_update_and_remove(self):
+        material = StudyMaterial.objects.create(title='Django forms', description='Validation', file_type='pdf')
+        self.assertEqual(self.search('forms'), [('study_material', material.pk)])
+
+        material.title = 'Django templates'
+        material.save()
+        self.assertEqual(self.search('forms'), [])
+        self.assertEqual(self.search('templates'), [('study_material', material.pk)])
+        self.assertEqual(self.documents(material), 1)
+
+        material.delete()
+        self.assertEqual(self.search('templates'), [])
+
+    def test_same_id_in_different_kinds(self):
+        material = StudyMaterial.objects.create(title='Python notes', file_type='pdf')
+        session = Session.objects.create(
+            id=material.pk, title='Python live', topic='Python', mentor='Mentor',
+            date=date.today(), start_time=time(10), end_time=time(11),
+        )
+        session.delete()
+        self.assertEqual(self.search('python'), [('study_material', material.pk)])
+
+    def test_title_matches_rank_first(self):
+        in_body = StudyMaterial.objects.create(title='Week one', description='Intro to recursion', file_type='pdf')
+        in_title = StudyMaterial.objects.create(title='Recursion', description='Base cases', file_type='pdf')
+        results = SQLiteFTSBackend().search('recursion')
+        self.assertEqual([result.object_id for result in results], [in_title.pk, in_body.pk])
+        self.assertGreater(results[0].score, results[1].score)
+
+    def test_rebuild(self):
+        StudyMaterial.objects.create(title='Rebuilt', file_type='pdf')
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {INDEX_TABLE}')
+        self.assertEqual(SQLiteFTSBackend().rebuild(), 1)
+        self.assertEqual(len(self.search('rebuilt')), 1)
+
+
+@override_settings(LMS_UPLOAD_PROCESS_IN_PROCESS=False)
+class MaterialUploadTests(TestCase):
+    """Chunked uploads resume at the stored offset and store each distinct file once."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentor = User.objects.create_user('upload-mentor', password='password123', is_staff=True)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        paths = self.settings(
+            LMS_UPLOAD_TEMP_DIR=os.path.join(directory.name, 'parts'), MEDIA_ROOT=os.path.join(directory.name, 'media'),
+        )
+        paths.enable()
+        self.addCleanup(paths.disable)
+        self.client.force_login(self.mentor)
+
+    def upload(self, content, filename='notes.pdf'):
+        upload = start_upload(self.mentor, filename, len(content))
+        write_chunk(upload, io.BytesIO(content), 0, len(content))
+        return upload
+
+    def put(self, upload, chunk, offset):
+        path = reverse('lms:material_upload', args=[upload.pk])
+        return self.client.put(path, chunk, content_type='application/octet-stream', headers={'Upload-Offset': str(offset)})
+
+    def test_chunk_at_wrong_offset_is_rejected(self):
+        upload = start_upload(self.mentor, 'notes.txt', 8)
+        self.assertEqual(self.put(upload, b'abcd', 0).status_code, 200)
+        response = self.put(upload, b'abcd', 2)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 4)
+        self.assertEqual(os.path.getsize(part_path(upload)), 4)
+
+    def test_interrupted_upload_resumes(self):
+        upload = start_upload(self.mentor, 'notes.txt', 8)
+        self.put(upload, b'abcd', 0)
+        status = self.client.get(reverse('lms:material_upload', args=[upload.pk])).json()
+        self.assertEqual((status['offset'], status['status']), (4, 'uploading'))
+        response = self.put(upload, b'efgh', status['offset'])
+        self.assertEqual((response.json()['offset'], response.json()['status']), (8, 'received'))
+        with open(part_path(upload), 'rb') as part:
+            self.assertEqual(part.read(), b'abcdefgh')
+
+    def test_duplicate_content_reuses_stored_file(self):
+        first = process_upload(self.upload(b'same bytes', 'first.txt'))
+        upload = self.upload(b'same bytes', 'second.txt')
+        with self.captureOnCommitCallbacks(execute=True):
+            second = process_upload(upload)
+            # The part file is only removed once the new material is committed.
+            self.assertTrue(os.path.exists(part_path(upload)))
+        self.assertFalse(os.path.exists(part_path(upload)))
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(second.file_hash, first.file_hash)
+        self.assertEqual(StudyMaterial.objects.filter(file_hash=first.file_hash).count(), 2)
+
+    def test_pdf_pages_are_counted(self):
+        buffer = io.BytesIO()
+        pdf = canvas.Canvas(buffer)
+        for number in range(3):
+            pdf.drawString(72, 720, f'Page {number}')
+            pdf.showPage()
+        pdf.save()
+        material = process_upload(self.upload(buffer.getvalue()))
+        self.assertEqual((material.file_type, material.page_count), ('pdf', 3))
+
+    def test_page_markers_across_read_blocks(self):
+        # A marker split over the 1 MiB read boundary, plus /Pages, which is not a page.
+        content = b'/Type /Pages ' + b' ' * (1024 * 1024 - 20) + b'/Type /Page ' * 2
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        self.assertEqual(uploads._count_pdf_page_objects(file.name), 2)
+
+class CsrfProtectionTests(TestCase):
+    """Staff write endpoints need the CSRF token like every other form or fetch() call."""
+    token = 'x' * 32
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentor = User.objects.create_user('csrf-mentor', password='password123', is_staff=True)
+
+    def setUp(self):
+        self.client = Client(enforce_csrf_checks=True)
+        self.client.force_login(self.mentor)
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = self.token
+
+    def post(self, path, data, with_token):
+        headers = {'X-CSRFToken': self.token} if with_token else {}
+        return self.client.post(path, json.dumps(data), content_type='application/json', headers=headers)
+
+    @override_settings(LMS_BROADCAST_IN_PROCESS=False)
+    def test_broadcast_notification(self):
+        path = reverse('lms:broadcast_notification')
+        data = {'title': 'Hello', 'message': 'Everyone'}
+        self.assertEqual(self.post(path, data, with_token=False).status_code, 403)
+        self.assertEqual(self.post(path, data, with_token=True).status_code, 202)
+
+    def test_mark_attendance(self):
+        session = Session.objects.create(
+            title='CSRF', topic='Python', mentor='Mentor', date=date.today(), start_time=time(10), end_time=time(11),
+        )
+        path = reverse('lms:mark_attendance', args=[session.id])
+        data = {'attendance': [], 'complete': True}
+        self.assertEqual(self.post(path, data, with_token=False).status_code, 403)
+        session.refresh_from_db()
+        self.assertFalse(session.is_completed)
+        self.assertEqual(self.post(path, data, with_token=True).status_code, 200)
+
+    def test_material_upload(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with self.settings(LMS_UPLOAD_TEMP_DIR=directory.name):
+            path = reverse('lms:start_material_upload')
+            data = {'filename': 'notes.pdf', 'size': 4}
+            self.assertEqual(self.post(path, data, with_token=False).status_code, 403)
+            response = self.post(path, data, with_token=True)
+            self.assertEqual(response.status_code, 201)
+
+            chunk = reverse('lms:material_upload', args=[response.json()['upload_id']])
+            headers = {'Upload-Offset': '0'}
+            self.assertEqual(self.client.put(chunk, b'%PDF', content_type='application/octet-stream', headers=headers).status_code, 403)
+            self.assertEqual(MaterialUpload.objects.get().received, 0)
+
+
+class BroadcastDeliveryTests(TestCase):
+    """Broadcasts are delivered in chunks, once per student, and can be resumed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.students = [create_student(f'broadcast-{number}') for number in range(5)]
+        cls.mentor = User.objects.create_user('broadcast-mentor', password='password123', is_staff=True)
+
+    def create_broadcast(self, **fields):
+        return Broadcast.objects.create(title='Hello', message='Everyone', created_by=self.mentor, **fields)
+
+    def test_delivers_in_chunks(self):
+        broadcast = self.create_broadcast()
+        with CaptureQueriesContext(connection) as queries:
+            deliver_broadcast(broadcast, chunk_size=2)
+        inserts = [query['sql'] for query in queries.captured_queries if 'INSERT' in query['sql']]
+        self.assertEqual(len(inserts), 3)
+        broadcast.refresh_from_db()
+        self.assertEqual((broadcast.status, broadcast.recipients, broadcast.delivered), ('sent', 5, 5))
+        self.assertEqual(Notification.objects.filter(broadcast=broadcast).count(), 5)
+
+    def test_resume_counts_existing_notifications_once(self):
+        broadcast = self.create_broadcast()
+        for student in self.students[:3]:
+            Notification.objects.create(student=student, broadcast=broadcast, title='Hello', message='Everyone')
+        deliver_broadcast(broadcast, chunk_size=2)
+        broadcast.refresh_from_db()
+        self.assertEqual(broadcast.delivered, 5)
+        self.assertEqual(Notification.objects.filter(broadcast=broadcast).count(), 5)
+
+    def test_delivering_twice_is_idempotent(self):
+        broadcast = self.create_broadcast()
+        deliver_broadcast(broadcast, chunk_size=2)
+        deliver_broadcast(broadcast, chunk_size=2)
+        broadcast.refresh_from_db()
+        self.assertEqual(broadcast.delivered, 5)
+        self.assertEqual(
+            sorted(Notification.objects.filter(broadcast=broadcast).values_list('student_id', flat=True)),
+            [student.id for student in self.students],
+        )
+
+    @override_settings(LMS_BROADCAST_IN_PROCESS=False)
+    def test_view_rejects_invalid_input(self):
+        self.client.force_login(self.mentor)
+        path = reverse('lms:broadcast_notification')
+        for data in (
+            {'title': 'Hello', 'message': 'Everyone', 'notification_type': 'urgent'},
+            {'title': 'Hello', 'message': 'Everyone', 'college': ['A', 'B']},
+            {'title': 'Hello', 'message': 'Everyone', 'year': 'x' * 21},
+            ['Hello'],
+        ):
+            response = self.client.post(path, json.dumps(data), content_type='application/json')
+            self.assertEqual(response.status_code, 400, data)
+        self.assertFalse(Broadcast.objects.exists())
+
+        data = {'title': 'Hello', 'message': 'Everyone', 'college': None, 'notification_type': 'warning'}
+        response = self.client.post(path, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Broadcast.objects.get().college, '')
+
+
+@override_settings(LMS_READ_DATABASE='replica', LMS_PRIMARY_PIN_SECONDS=7)
+class ReadReplicaRoutingTests(SimpleTestCase):
+    """Safe requests to marked views read from the replica; writes and pinned clients use the primary."""
+
+    def setUp(self):
+        # The alias is only resolved by the router here; no query runs on it.
+        patcher = mock.patch.dict(connections.databases, {'replica': dict(connections.databases[DEFAULT_DB_ALIAS])})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+
+    def route(self, request):
+        """Return the alias reads go to while the view runs, and the response."""
+        routed = []
+
+        def get_response(request):
+            routed.append(Session.objects.all().db)
+            return HttpResponse()
+
+        response = ReadReplicaMiddleware(get_response)(request)
+        return routed[0], response
+
+    def test_marked_view_reads_from_replica(self):
+        alias, response = self.route(self.factory.get(reverse('lms:session_details')))
+        self.assertEqual(alias, 'replica')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_unmarked_view_reads_from_primary(self):
+        self.assertEqual(self.route(self.factory.get(reverse('lms:dashboard')))[0], DEFAULT_DB_ALIAS)
+        with self.settings(LMS_REPLICA_VIEWS=['lms:dashboard']):
+            self.assertEqual(self.route(self.factory.get(reverse('lms:dashboard')))[0], 'replica')
+
+    def test_write_pins_client_to_primary(self):
+        alias, response = self.route(self.factory.post(reverse('lms:session_details')))
+        self.assertEqual(alias, DEFAULT_DB_ALIAS)
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 7)
+
+        request = self.factory.get(reverse('lms:session_details'))
+        request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+        self.assertEqual(self.route(request)[0], DEFAULT_DB_ALIAS)
+
+    def test_router_writes_and_migrates_on_primary(self):
+        router = ReadReplicaRouter()
+        self.assertEqual(router.db_for_write(Session), DEFAULT_DB_ALIAS)
+        self.assertFalse(router.allow_migrate('replica', 'lms'))
+        self.assertIsNone(router.allow_migrate(DEFAULT_DB_ALIAS, 'lms'))
+
+    def test_falls_back_to_primary_without_replica_alias(self):
+        del connections.databases['replica']
+        self.assertEqual(self.route(self.factory.get(reverse('lms:session_details')))[0], DEFAULT_DB_ALIAS)
+        self.assertNotIn(PIN_COOKIE, self.route(self.factory.post(reverse('lms:session_details')))[1].cookies)
@@ -0,0 +1,310 @@
+"""
+Chunked, resumable study material uploads.
+
+A mentor opens a ``MaterialUpload`` with the file name and size, then sends
+the content in chunks; each chunk is streamed from the request straight onto
+the end of a part file under ``LMS_UPLOAD_TEMP_DIR`` and must start at the
+current offset, so an interrupted upload resumes from ``received`` bytes. The
+size of the part file is the source of truth for that offset. Every request
+carries the CSRF token in an ``X-CSRFToken`` header.
+
+Once every byte has arrived the upload is processed in the background (a
+thread of the web process when ``LMS_UPLOAD_PROCESS_IN_PROCESS`` is on, or
+``manage.py process_uploads``): the file is hashed, moved into media storage
+unless a material with the same SHA-256 is already stored, and its size,
+type, page count and (for PDFs, with PyMuPDF installed) a first-page
+thumbnail are recorded on a new ``StudyMaterial``.
+"""
+import hashlib
+import logging
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import MaterialUpload, StudyMaterial
+
+logger = logging.getLogger(__name__)
+
+READ_BLOCK_SIZE = 64 * 1024
+DEFAULT_MAX_CHUNK_SIZE = 16 * 1024 * 1024
+DEFAULT_MAX_UPLOAD_SIZE = 1024 * 1024 * 1024
+# PDF page objects, counted when pypdf is not installed; a marker is far shorter than the overlap.
+PAGE_MARKER = re.compile(rb'/Type\s{0,32}/Page(?![a-zA-Z])')
+PAGE_MARKER_OVERLAP = 64
+
+FILE_TYPES = {choice for choice, label in StudyMaterial._meta.get_field('file_type').choices}
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='lms-uploads')
+
+
+class UploadError(ValueError):
+    pass
+
+
+class OffsetMismatch(UploadError):
+    """A chunk did not start where the stored data ends; ``offset`` is where it should."""
+
+    def __init__(self, offset):
+        super().__init__(f'Chunk must start at byte {offset}.')
+        self.offset = offset
+
+
+class PartFile(File):
+    """A finished part file; ``FileSystemStorage`` moves it into place instead of copying it."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def max_upload_size():
+    return getattr(settings, 'LMS_UPLOAD_MAX_SIZE', DEFAULT_MAX_UPLOAD_SIZE)
+
+
+def max_chunk_size():
+    return getattr(settings, 'LMS_UPLOAD_MAX_CHUNK_SIZE', DEFAULT_MAX_CHUNK_SIZE)
+
+
+def part_path(upload):
+    return os.path.join(str(settings.LMS_UPLOAD_TEMP_DIR), f'{upload.pk}.part')
+
+
+def stored_offset(upload):
+    try:
+        return os.path.getsize(part_path(upload))
+    except FileNotFoundError:
+        return 0
+
+
+def _lock(part):
+    """Hold an exclusive lock on ``part`` until it is closed, so parallel retries of a chunk can't interleave."""
+    if fcntl is None:
+        return
+    try:
+        fcntl.flock(part.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise UploadError('Another chunk of this upload is being written; retry shortly.')
+
+
+def start_upload(user, filename, total_size, title='', description=''):
+    filename = os.path.basename(filename or '')
+    if not filename:
+        raise UploadError('Please provide a file name.')
+    if total_size <= 0 or total_size > max_upload_size():
+        raise UploadError(f'File size must be between 1 and {max_upload_size()} bytes.')
+    os.makedirs(str(settings.LMS_UPLOAD_TEMP_DIR), exist_ok=True)
+    return MaterialUpload.objects.create(
+        title=title or os.path.splitext(filename)[0],
+        description=description,
+        filename=filename,
+        total_size=total_size,
+        uploaded_by=user,
+    )
+
+
+def write_chunk(upload, stream, offset, length):
+    """
+    Append ``length`` bytes read from ``stream`` at ``offset`` and return the new offset.
+
+    Raises ``OffsetMismatch`` when ``offset`` is not where the part file ends.
+    """
+    if upload.status != 'uploading':
+        raise UploadError('This upload is already complete.')
+    if length <= 0 or length > max_chunk_size():
+        raise UploadError(f'Chunk size must be between 1 and {max_chunk_size()} bytes.')
+    with open(part_path(upload), 'ab') as part:
+        _lock(part)
+        current = os.fstat(part.fileno()).st_size
+        if offset != current:
+            raise OffsetMismatch(current)
+        if offset + length > upload.total_size:
+            raise UploadError('Chunk runs past the declared file size.')
+        remaining = length
+        while remaining:
+            block = stream.read(min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            part.write(block)
+            remaining -= len(block)
+    received = stored_offset(upload)
+
+    upload.received = received
+    update_fields = ['received']
+    if received == upload.total_size:
+        upload.status = 'received'
+        update_fields.append('status')
+    upload.save(update_fields=update_fields)
+    if received != offset + length:
+        raise UploadError(f'Connection closed after byte {received}; resume from there.')
+    return received
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def detect_file_type(filename):
+    extension = os.path.splitext(filename)[1].lstrip('.').lower()
+    return extension if extension in FILE_TYPES else 'other'
+
+
+def _count_pdf_page_objects(path):
+    """
+    Count ``/Type /Page`` objects a block at a time, for when pypdf is missing.
+
+    Misses pages kept in compressed object streams. Blocks overlap by
+    ``PAGE_MARKER_OVERLAP`` bytes so a marker split between two reads is still
+    seen, and counted once.
+    """
+    pages = 0
+    tail = b''
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            buffer = tail + block
+            # Markers starting in the last bytes are left for the next read, which sees how they end.
+            limit = max(len(buffer) - PAGE_MARKER_OVERLAP, 0)
+            pages += sum(1 for match in PAGE_MARKER.finditer(buffer) if match.start() < limit)
+            tail = buffer[limit:]
+    pages += len(PAGE_MARKER.findall(tail))
+    return pages or None
+
+
+def count_pages(path, file_type):
+    """Return the number of pages (PDF, DOCX) or slides (PPTX), or ``None`` when unknown."""
+    try:
+        if file_type == 'pdf':
+            try:
+                from pypdf import PdfReader
+            except ImportError:
+                return _count_pdf_page_objects(path)
+            return len(PdfReader(path).pages)
+        if file_type == 'pptx':
+            with zipfile.ZipFile(path) as archive:
+                return sum(1 for name in archive.namelist() if re.fullmatch(r'ppt/slides/slide\d+\.xml', name))
+        if file_type == 'docx':
+            with zipfile.ZipFile(path) as archive:
+                match = re.search(rb'<Pages>(\d+)</Pages>', archive.read('docProps/app.xml'))
+                return int(match.group(1)) if match else None
+    except Exception:
+        logger.warning('Could not count pages of %s', path, exc_info=True)
+    return None
+
+
+def render_thumbnail(path, file_type):
+    """Return PNG bytes of the first page of a PDF, or ``None`` (optional PyMuPDF)."""
+    if file_type != 'pdf':
+        return None
+    try:
+        import fitz
+    except ImportError:
+        return None
+    try:
+        with fitz.open(path) as pdf:
+            return pdf[0].get_pixmap(matrix=fitz.Matrix(0.5, 0.5)).tobytes('png')
+    except Exception:
+        logger.warning('Could not render a thumbnail of %s', path, exc_info=True)
+        return None
+
+
+def _remove_part(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def process_upload(upload):
+    """Hash, deduplicate and store a fully received upload as a ``StudyMaterial``."""
+    claimed = MaterialUpload.objects.filter(pk=upload.pk, status='received').update(status='processing')
+    if not claimed:
+        return None
+
+    path = part_path(upload)
+    try:
+        file_hash = file_sha256(path)
+        file_type = detect_file_type(upload.filename)
+        material = StudyMaterial(
+            title=upload.title,
+            description=upload.description,
+            file_type=file_type,
+            file_size=os.path.getsize(path),
+            file_hash=file_hash,
+            uploaded_by=upload.uploaded_by,
+        )
+        duplicate = StudyMaterial.objects.filter(file_hash=file_hash).exclude(file='').exclude(file=None).first()
+        if duplicate is not None:
+            material.file.name = duplicate.file.name
+            material.page_count = duplicate.page_count
+            material.thumbnail.name = duplicate.thumbnail.name
+        else:
+            material.page_count = count_pages(path, file_type)
+            thumbnail = render_thumbnail(path, file_type)
+            if thumbnail:
+                material.thumbnail.save(f'{file_hash[:16]}.png', ContentFile(thumbnail), save=False)
+            with open(path, 'rb') as part:
+                material.file.save(upload.filename, PartFile(part), save=False)
+            if os.path.exists(path):
+                os.remove(path)
+
+        with transaction.atomic():
+            material.save()
+            upload.material = material
+            upload.status = 'complete'
+            upload.completed_at = timezone.now()
+            upload.save(update_fields=['material', 'status', 'completed_at'])
+            if duplicate is not None:
+                # Keep the only copy of the data until the material pointing at the stored file is committed.
+                transaction.on_commit(lambda: _remove_part(path))
+    except Exception as exc:
+        MaterialUpload.objects.filter(pk=upload.pk).update(status='failed', error=str(exc))
+        raise
+    logger.info('Upload %s stored as material %s (%s)', upload.pk, material.pk, 'duplicate' if duplicate else 'new')
+    return material
+
+
+def _process_in_background(upload_id):
+    try:
+        process_upload(MaterialUpload.objects.get(pk=upload_id))
+    except Exception:
+        logger.exception('Upload %s failed', upload_id)
+    finally:
+        close_old_connections()
+
+
+def dispatch_upload(upload):
+    """
+    Queue a fully received upload for processing on the background worker.
+
+    When ``LMS_UPLOAD_PROCESS_IN_PROCESS`` is off it stays ``received`` for
+    ``manage.py process_uploads``.
+    """
+    if not getattr(settings, 'LMS_UPLOAD_PROCESS_IN_PROCESS', True):
+        return
+    transaction.on_commit(lambda: _executor.submit(_process_in_background, upload.pk))
+
+
+def upload_data(upload):
+    return {
+        'upload_id': upload.pk,
+        'filename': upload.filename,
+        'size': upload.total_size,
+        'offset': upload.received,
+        'status': upload.status,
+        'material_id': upload.material_id,
+        'error': upload.error,
+    }
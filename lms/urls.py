@@ -11,7 +11,11 @@ urlpatterns = [
     path('offer-letter/', views.offer_letter, name='offer_letter'),
     path('session-details/', views.session_details, name='session_details'),
     path('session-recordings/', views.session_recordings, name='session_recordings'),
+    path('search/', views.search_catalog, name='search'),
+    path('sessions/search/', views.session_search, name='session_search'),
     path('attendance/', views.attendance, name='attendance'),
+    path('attendance/export/', views.export_attendance, name='export_attendance'),
+    path('sessions/<int:session_id>/attendance/', views.mark_attendance, name='mark_attendance'),
     path('project-details/', views.project_details, name='project_details'),
     path('assessment/', views.assessment, name='assessment'),
     path('quiz/', views.quiz, name='quiz'),
@@ -19,13 +23,25 @@ urlpatterns = [
     path('quiz-submit/', views.quiz_submit, name='quiz_submit'),
     path('mock-test-quiz-submit/<int:mock_test_id>/', views.quiz_submit, name='mock_test_quiz_submit'),
     path('quiz-submit/<int:mock_test_id>/', views.quiz_submit, name='mock_test_quiz_submit'),
+    path('quiz-result/<str:receipt>/', views.quiz_result, name='quiz_result'),
+    path('quiz-result/<str:receipt>/status/', views.quiz_result_status, name='quiz_result_status'),
     path('study-material/', views.study_material, name='study_material'),
+    path('study-material/<int:material_id>/download/', views.download_study_material, name='download_study_material'),
+    path('uploads/', views.start_material_upload, name='start_material_upload'),
+    path('uploads/<int:upload_id>/', views.material_upload, name='material_upload'),
     path('certificate/', views.certificate, name='certificate'),
     path('placement-readiness/', views.placement_readiness, name='placement_readiness'),
     path('profile/', views.profile, name='profile'),
     path('edit-profile/', views.edit_profile, name='edit_profile'),
     path('change-password/', views.change_password, name='change_password'),
     path('notifications/', views.notifications, name='notifications'),
+    path('notifications/feed/', views.notification_feed, name='notification_feed'),
+    path('notifications/mark-all-read/', views.mark_all_notifications_read, name='mark_all_notifications_read'),
+    path('events/', views.event_stream, name='event_stream'),
+    path('notifications/badge/', views.notification_badge, name='notification_badge'),
+    path('notifications/<int:notification_id>/read/', views.mark_notification_read, name='mark_notification_read'),
+    path('broadcasts/', views.broadcast_notification, name='broadcast_notification'),
+    path('broadcasts/<int:broadcast_id>/', views.broadcast_status, name='broadcast_status'),
     path('submit-project/', views.submit_project, name='submit_project'),
     path('schedule-mock-interview/', views.schedule_mock_interview, name='schedule_mock_interview'),
     path('cancel-mock-interview/<int:interview_id>/', views.cancel_mock_interview, name='cancel_mock_interview'),
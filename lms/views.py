@@ -1,20 +1,41 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth import login, logout, authenticate
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth import login, logout, authenticate, get_user
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse, Http404
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, FileResponse, StreamingHttpResponse, Http404
+from django.utils.http import parse_etags, quote_etag
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import etag
 from django.utils import timezone
-from django.db import models
-from .models import Student, Session, Attendance, Assessment, StudentAssessment, Project, StudyMaterial, Certificate, Notification, OfferLetter, MockTest, StudentMockTest, MockInterview, InternshipAgenda
+from django.db import models, transaction
+from .models import NOTIFICATION_TYPES, Broadcast, MaterialUpload, Student, Session, Attendance, Assessment, StudentAssessment, Project, StudyMaterial, Certificate, Notification, OfferLetter, MockTest, StudentMockTest, MockInterview, InternshipAgenda
+from .async_utils import arender, async_login_required
+from .assignments import materialize_student_assessments
+from .attempts import allocate_attempt_number
+from .catalog import acatalog_fragment
+from .db import read_replica
+from .broadcasts import dispatch_broadcast
+from .documents import get_offer_letter_pdf, offer_letter_hash
+from .downloads import serve_file
+from .events import SESSIONS_CHANNEL, stream_events, student_channel
+from .exports import LAYOUTS, ExportError, attendance_queryset, export_rows, stream_csv
+from .grading import DEFAULT_ANSWER_KEY, DEFAULT_QUIZ_QUESTIONS, get_mock_test_answer_key, with_raw_questions
+from .instrumentation import query_budget
+from .marking import MarkingError, mark_session_attendance, parse_marks, parse_marks_csv, parse_present
+from .notifications import FEED_PAGE_SIZE, InvalidCursor, anotification_page, get_unread_count, mark_all_read, notification_page
+from .search import SOURCES, result_data, search
+from .session_search import SEARCH_PAGE_SIZE, search_sessions, session_data
+from .submissions import get_queue, grade_context, save_default_quiz_result, submission_mode
+from .summaries import UPCOMING_SESSIONS_LIMIT, assessment_counts, best_mock_test_attempts, get_dashboard_summary
+from .uploads import OffsetMismatch, UploadError, dispatch_upload, max_chunk_size, start_upload, upload_data, write_chunk
 import json
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from io import BytesIO
 
+@query_budget(7)
 @login_required
 def dashboard(request):
     if not request.user.is_authenticated:
@@ -31,20 +52,7 @@ def dashboard(request):
         }
     )
 
-    # Get recent sessions
-    upcoming_sessions = Session.objects.filter(date__gte=timezone.now().date(), is_completed=False).order_by('date', 'start_time')[:3]
-
-    # Get assessments data
-    assessments = Assessment.objects.filter(is_active=True)
-    student_assessments = StudentAssessment.objects.filter(student=student, assessment__in=assessments)
-
-    # Calculate real attendance stats
-    attendances = Attendance.objects.filter(student=student)
-    total_sessions = attendances.count()
-    attended_sessions = attendances.filter(is_present=True).count()
-    attendance_percentage = (attended_sessions / total_sessions * 100) if total_sessions > 0 else 0
-    total_assessments = assessments.count()
-    completed_assessments = student_assessments.filter(is_completed=True).count()
+    summary = get_dashboard_summary(student)
 
     # Sample recent activity
     recent_projects = [
@@ -60,18 +68,15 @@ def dashboard(request):
 
     context = {
         'student': student,
-        'upcoming_sessions': upcoming_sessions,
-        'attendance_percentage': round(attendance_percentage, 1),
-        'total_sessions': total_sessions,
-        'attended_sessions': attended_sessions,
-        'total_assessments': total_assessments,
-        'completed_assessments': completed_assessments,
+        **summary,
+        'upcoming_sessions_limit': UPCOMING_SESSIONS_LIMIT,
         'recent_projects': recent_projects,
         'recent_sessions': recent_sessions,
     }
 
     return render(request, 'lms/dashboard.html', context)
 
+@query_budget(5)
 @login_required
 def offer_letter(request):
     student = get_object_or_404(Student, user=request.user)
@@ -89,18 +94,52 @@ def offer_letter(request):
     context = {'student': student, 'offer_letter': offer_letter}
     return render(request, 'lms/offer_letter.html', context)
 
+@query_budget(4)
+@read_replica
+@async_login_required
+async def session_details(request):
+    context = {'catalog_html': await acatalog_fragment('sessions')}
+    return await arender(request, 'lms/session_details.html', context)
+
+@query_budget(4)
+@read_replica
+@async_login_required
+async def session_recordings(request):
+    context = {'catalog_html': await acatalog_fragment('recordings')}
+    return await arender(request, 'lms/session_recordings.html', context)
+
+@query_budget(3)
+@read_replica
 @login_required
-def session_details(request):
-    sessions = Session.objects.all().order_by('-date')
-    context = {'sessions': sessions}
-    return render(request, 'lms/session_details.html', context)
-
+def session_search(request):
+    filters = {
+        name: request.GET.get(name)
+        for name in ('topic', 'mentor', 'date_from', 'date_to', 'has_recording', 'is_completed')
+    }
+    try:
+        limit = int(request.GET.get('limit', SEARCH_PAGE_SIZE))
+        sessions, next_cursor = search_sessions(filters, request.GET.get('cursor'), limit)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    return JsonResponse({'results': [session_data(session) for session in sessions], 'next_cursor': next_cursor})
+
+@query_budget(3)
+@read_replica
 @login_required
-def session_recordings(request):
-    recordings = Session.objects.filter(recording_url__isnull=False).order_by('-date')
-    context = {'recordings': recordings}
-    return render(request, 'lms/session_recordings.html', context)
-
+def search_catalog(request):
+    query = request.GET.get('q', '').strip()
+    kinds = [kind for kind in request.GET.get('type', '').split(',') if kind]
+    unknown = [kind for kind in kinds if kind not in SOURCES]
+    if unknown:
+        return JsonResponse({'error': f'Unknown type: {", ".join(unknown)}'}, status=400)
+    try:
+        limit = int(request.GET.get('limit', 20))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit.'}, status=400)
+    results = search(query, kinds, limit) if query else []
+    return JsonResponse({'query': query, 'results': [result_data(result) for result in results]})
+
+@query_budget(7)
 @login_required
 def attendance(request):
     student = get_object_or_404(Student, user=request.user)
@@ -120,6 +159,53 @@ def attendance(request):
     }
     return render(request, 'lms/attendance.html', context)
 
+@read_replica
+@staff_member_required
+def export_attendance(request):
+    layout = request.GET.get('layout', 'rows')
+    if layout not in LAYOUTS:
+        return JsonResponse({'error': f'Unknown layout: {layout}'}, status=400)
+
+    try:
+        attendances = attendance_queryset(
+            college=request.GET.get('college'),
+            branch=request.GET.get('branch'),
+            year=request.GET.get('year'),
+            date_from=request.GET.get('date_from'),
+            date_to=request.GET.get('date_to'),
+        )
+    except ExportError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    response = StreamingHttpResponse(stream_csv(export_rows(layout, attendances)), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="attendance_{layout}_{timezone.now():%Y%m%d}.csv"'
+    return response
+
+# JSON or CSV upload from mentor tools; callers send the CSRF token in the X-CSRFToken header.
+@login_required
+def mark_attendance(request, session_id):
+    if not request.user.is_staff:
+        return JsonResponse({'success': False, 'message': 'Only mentors can mark attendance.'}, status=403)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method.'})
+
+    session = get_object_or_404(Session, id=session_id)
+    try:
+        if 'file' in request.FILES:
+            marks = parse_marks_csv(request.FILES['file'])
+            complete = request.POST.get('complete', 'true')
+        else:
+            data = json.loads(request.body)
+            if not isinstance(data, dict) or not isinstance(data.get('attendance', []), list):
+                raise MarkingError('attendance must be a list of {student_id, is_present} objects.')
+            marks = parse_marks(data.get('attendance', []))
+            complete = data.get('complete', True)
+        written = mark_session_attendance(session, marks, complete=parse_present(complete))
+    except (MarkingError, json.JSONDecodeError) as exc:
+        return JsonResponse({'success': False, 'message': str(exc)}, status=400)
+
+    return JsonResponse({'success': True, 'marked': written, 'is_completed': session.is_completed})
+
+@query_budget(5)
 @login_required
 def project_details(request):
     student = get_object_or_404(Student, user=request.user)
@@ -127,22 +213,21 @@ def project_details(request):
     context = {'projects': projects, 'student': student}
     return render(request, 'lms/project_details.html', context)
 
+@query_budget(9)
 @login_required
 def assessment(request):
     student = get_object_or_404(Student, user=request.user)
     assessments = Assessment.objects.filter(is_active=True)
-    student_assessments = StudentAssessment.objects.filter(student=student, assessment__in=assessments).select_related('assessment')
 
     # Create StudentAssessment objects for assessments not yet taken
-    for assessment in assessments:
-        if not student_assessments.filter(assessment=assessment).exists():
-            StudentAssessment.objects.create(student=student, assessment=assessment)
+    materialize_student_assessments(student, assessments)
 
     student_assessments = StudentAssessment.objects.filter(student=student, assessment__in=assessments).select_related('assessment')
+    counts = assessment_counts(student, assessments)
 
-    pending_count = student_assessments.filter(is_completed=False, assessment__due_date__gte=timezone.now().date()).count()
-    completed_count = student_assessments.filter(is_completed=True).count()
-    average_score = student_assessments.filter(is_completed=True, score__isnull=False).aggregate(avg=models.Avg('score')).get('avg', 0) or 0
+    pending_count = counts['pending']
+    completed_count = counts['completed']
+    average_score = counts['average'] or 0
 
     context = {
         'student_assessments': student_assessments,
@@ -152,21 +237,80 @@ def assessment(request):
     }
     return render(request, 'lms/assessment.html', context)
 
+@query_budget(4)
+@read_replica
+@async_login_required
+async def study_material(request):
+    context = {'catalog_html': await acatalog_fragment('study_material')}
+    return await arender(request, 'lms/study_material.html', context)
+
 @login_required
-def study_material(request):
-    materials = StudyMaterial.objects.all().order_by('-uploaded_at')
-    context = {'materials': materials}
-    return render(request, 'lms/study_material.html', context)
+def download_study_material(request, material_id):
+    material = get_object_or_404(StudyMaterial, id=material_id)
+    if not material.file:
+        if material.file_url:
+            return redirect(material.file_url)
+        raise Http404("File not found")
+    try:
+        return serve_file(request, material.file.path, material.file.name.rsplit('/', 1)[-1])
+    except FileNotFoundError:
+        raise Http404("File not found")
+
+# Resumable upload API (lms/uploads.py); callers send the CSRF token in the X-CSRFToken header.
+@login_required
+def start_material_upload(request):
+    if not request.user.is_staff:
+        return JsonResponse({'success': False, 'message': 'Only mentors can upload study material.'}, status=403)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method.'})
+
+    try:
+        data = json.loads(request.body)
+        upload = start_upload(
+            request.user,
+            data.get('filename'),
+            int(data.get('size', 0)),
+            title=data.get('title', ''),
+            description=data.get('description', ''),
+        )
+    except (UploadError, json.JSONDecodeError, TypeError, ValueError) as exc:
+        return JsonResponse({'success': False, 'message': str(exc)}, status=400)
+    return JsonResponse(dict(upload_data(upload), success=True, chunk_size=max_chunk_size()), status=201)
 
+@login_required
+def material_upload(request, upload_id):
+    upload = get_object_or_404(MaterialUpload, id=upload_id, uploaded_by=request.user)
+    if request.method == 'GET':
+        return JsonResponse(dict(upload_data(upload), success=True))
+    if request.method not in ('PUT', 'POST'):
+        return JsonResponse({'success': False, 'message': 'Invalid request method.'})
+
+    # Chunks are the raw request body, starting at the byte given in Upload-Offset.
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+        length = int(request.headers.get('Content-Length', ''))
+        write_chunk(upload, request, offset, length)
+    except OffsetMismatch as exc:
+        return JsonResponse({'success': False, 'message': str(exc), 'offset': exc.offset}, status=409)
+    except (UploadError, ValueError) as exc:
+        return JsonResponse({'success': False, 'message': str(exc), 'offset': upload.received}, status=400)
+
+    if upload.status == 'received':
+        dispatch_upload(upload)
+    return JsonResponse(dict(upload_data(upload), success=True))
+
+@query_budget(6)
+@read_replica
 @login_required
 def certificate(request):
     student = get_object_or_404(Student, user=request.user)
-    certificates = Certificate.objects.filter(student=student).order_by('-issued_date')
+    certificates = Certificate.objects.filter(student=student).select_related('student').order_by('-issued_date')
     context = {'certificates': certificates, 'student': student}
     return render(request, 'lms/certificate.html', context)
 
 
 
+@query_budget(7)
 @login_required
 def placement_readiness(request):
     student = get_object_or_404(Student, user=request.user)
@@ -202,28 +346,18 @@ def placement_readiness(request):
     mock_tests_queryset = MockTest.objects.filter(is_active=True)
     mock_tests = []
 
+    best_attempts = best_mock_test_attempts(student)
+
     for mock_test in mock_tests_queryset:
-        # Get the best attempt (highest score) for this student and mock test
-        best_attempt = StudentMockTest.objects.filter(
-            student=student,
-            mock_test=mock_test,
-            is_completed=True
-        ).order_by('-score').first()
+        best_attempt = best_attempts.get(mock_test.id)
 
         if best_attempt:
-            # Count total attempts
-            total_attempts = StudentMockTest.objects.filter(
-                student=student,
-                mock_test=mock_test,
-                is_completed=True
-            ).count()
-
             mock_tests.append({
                 'id': mock_test.id,
                 'title': mock_test.title,
-                'score': best_attempt.percentage_score,
-                'date': best_attempt.submitted_at.strftime('%Y-%m-%d') if best_attempt.submitted_at else None,
-                'attempts': total_attempts,
+                'score': best_attempt['percentage'],
+                'date': best_attempt['submitted_at'].strftime('%Y-%m-%d') if best_attempt['submitted_at'] else None,
+                'attempts': best_attempt['attempts'],
             })
         else:
             mock_tests.append({
@@ -240,6 +374,8 @@ def placement_readiness(request):
     }
     return render(request, 'lms/placement_readiness.html', context)
 
+@query_budget(4)
+@read_replica
 @login_required
 def profile(request):
     student = get_object_or_404(Student, user=request.user)
@@ -311,12 +447,147 @@ def submit_project(request):
 
     return JsonResponse({'success': False, 'message': 'Invalid request method.'})
 
+@query_budget(5)
+@async_login_required
+async def notifications(request):
+    try:
+        student = await Student.objects.aget(user=request.user)
+    except Student.DoesNotExist:
+        raise Http404("Student not found")
+    notifications, next_cursor = await anotification_page(student)
+    context = {'notifications': notifications, 'next_cursor': next_cursor}
+    return await arender(request, 'lms/notifications.html', context)
+
+@query_budget(4)
 @login_required
-def notifications(request):
+def notification_feed(request):
     student = get_object_or_404(Student, user=request.user)
-    notifications = Notification.objects.filter(student=student).order_by('-created_at')
-    context = {'notifications': notifications}
-    return render(request, 'lms/notifications.html', context)
+    try:
+        limit = int(request.GET.get('limit', FEED_PAGE_SIZE))
+        notifications, next_cursor = notification_page(student, request.GET.get('cursor'), limit)
+    except (InvalidCursor, ValueError) as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    results = [
+        {
+            'id': notification.id,
+            'title': notification.title,
+            'message': notification.message,
+            'notification_type': notification.notification_type,
+            'is_read': notification.is_read,
+            'created_at': notification.created_at.isoformat(),
+        }
+        for notification in notifications
+    ]
+    html = ''.join(
+        render_to_string('lms/notification_item.html', {'notification': notification}, request=request)
+        for notification in notifications
+    )
+    return JsonResponse({'results': results, 'next_cursor': next_cursor, 'html': html})
+
+@login_required
+def mark_all_notifications_read(request):
+    if request.method == 'POST':
+        student = get_object_or_404(Student, user=request.user)
+        updated = mark_all_read(student)
+        return JsonResponse({'success': True, 'updated': updated})
+
+    return JsonResponse({'success': False, 'message': 'Invalid request method.'})
+
+def _badge_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    return f'{request.user.pk}-{get_unread_count(request.user.pk)}'
+
+@query_budget(3)
+@login_required
+@etag(_badge_etag)
+def notification_badge(request):
+    response = JsonResponse({'unread': get_unread_count(request.user.pk)})
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+@login_required
+def mark_notification_read(request, notification_id):
+    if request.method == 'POST':
+        student = get_object_or_404(Student, user=request.user)
+        notification = get_object_or_404(Notification, id=notification_id, student=student)
+        if not notification.is_read:
+            notification.is_read = True
+            notification.save(update_fields=['is_read'])
+        return JsonResponse({'success': True, 'unread': get_unread_count(request.user.pk)})
+
+    return JsonResponse({'success': False, 'message': 'Invalid request method.'})
+
+# JSON API for staff tools; callers send the CSRF token in the X-CSRFToken header.
+@login_required
+def broadcast_notification(request):
+    if not request.user.is_staff:
+        return JsonResponse({'success': False, 'message': 'Only staff can broadcast notifications.'}, status=403)
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method.'})
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'message': 'Invalid JSON body.'}, status=400)
+    if not isinstance(data, dict) or not data.get('title') or not data.get('message'):
+        return JsonResponse({'success': False, 'message': 'Please provide a title and a message.'}, status=400)
+
+    notification_type = data.get('notification_type') or 'info'
+    if notification_type not in dict(NOTIFICATION_TYPES):
+        return JsonResponse({'success': False, 'message': f'Unknown notification_type: {notification_type}'}, status=400)
+    # Blank or missing cohort fields match every student.
+    cohort = {field: data.get(field) or '' for field in ('college', 'branch', 'year')}
+    for field, value in cohort.items():
+        if not isinstance(value, str) or len(value) > Broadcast._meta.get_field(field).max_length:
+            return JsonResponse({'success': False, 'message': f'Invalid {field}.'}, status=400)
+
+    broadcast = Broadcast.objects.create(
+        title=data['title'],
+        message=data['message'],
+        notification_type=notification_type,
+        **cohort,
+        created_by=request.user,
+    )
+    dispatch_broadcast(broadcast)
+    return JsonResponse({'success': True, 'broadcast_id': broadcast.id, 'status': broadcast.status}, status=202)
+
+@login_required
+def broadcast_status(request, broadcast_id):
+    if not request.user.is_staff:
+        return JsonResponse({'success': False, 'message': 'Only staff can view broadcasts.'}, status=403)
+    broadcast = get_object_or_404(Broadcast, id=broadcast_id)
+    return JsonResponse({
+        'broadcast_id': broadcast.id,
+        'status': broadcast.status,
+        'recipients': broadcast.recipients,
+        'delivered': broadcast.delivered,
+    })
+
+async def event_stream(request):
+    """Server-sent events with new notifications and session changes; needs the ASGI server."""
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'Live events require the ASGI server (manac_lms.asgi).'}, status=501)
+
+    user = await sync_to_async(get_user)(request)
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    student_id = await Student.objects.filter(user=user).values_list('id', flat=True).afirst()
+    if student_id is None:
+        raise Http404("Student not found")
+
+    unread = await sync_to_async(get_unread_count)(user.pk)
+    events = stream_events(
+        [student_channel(student_id), SESSIONS_CHANNEL],
+        initial=[('unread', {'unread': unread})],
+        heartbeat=settings.LMS_EVENT_STREAM_HEARTBEAT,
+        max_duration=settings.LMS_EVENT_STREAM_MAX_DURATION,
+    )
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 def login_view(request):
     if request.method == 'POST':
@@ -334,6 +605,7 @@ def logout_view(request):
     logout(request)
     return redirect('lms:login')
 
+@query_budget(3)
 @login_required
 def quiz(request, mock_test_id=None):
     if mock_test_id:
@@ -345,60 +617,8 @@ def quiz(request, mock_test_id=None):
         }
     else:
         # Default quiz (existing behavior)
-        default_questions = [
-            {
-                'question': 'What is the output of print(2 + 3)?',
-                'options': ['5', '23', 'Error', 'None'],
-                'correct': '5'
-            },
-            {
-                'question': 'Which keyword is used to define a function in Python?',
-                'options': ['def', 'function', 'fun', 'define'],
-                'correct': 'def'
-            },
-            {
-                'question': 'What does the len() function return?',
-                'options': ['Length of a string or list', 'Type of variable', 'Memory usage', 'File size'],
-                'correct': 'Length of a string or list'
-            },
-            {
-                'question': 'Which data type is mutable in Python?',
-                'options': ['List', 'Tuple', 'String', 'Integer'],
-                'correct': 'List'
-            },
-            {
-                'question': 'What is the correct way to comment in Python?',
-                'options': ['# This is a comment', '// This is a comment', '/* This is a comment */', '-- This is a comment'],
-                'correct': '# This is a comment'
-            },
-            {
-                'question': 'Which statement is used for conditional execution?',
-                'options': ['if', 'for', 'while', 'def'],
-                'correct': 'if'
-            },
-            {
-                'question': 'What is the built-in function to get user input?',
-                'options': ['print', 'input', 'read', 'get'],
-                'correct': 'input'
-            },
-            {
-                'question': 'What is the result of 3 * 2?',
-                'options': ['6', '32', 'Error', 'None'],
-                'correct': '6'
-            },
-            {
-                'question': 'Which symbol is used for string concatenation?',
-                'options': ['+', '-', '*', '/'],
-                'correct': '+'
-            },
-            {
-                'question': 'What does the break statement do?',
-                'options': ['Ends a loop prematurely', 'Starts a loop', 'Skips to next iteration', 'Ends the program'],
-                'correct': 'Ends a loop prematurely'
-            }
-        ]
         context = {
-            'questions': json.dumps(default_questions),
+            'questions': json.dumps(DEFAULT_QUIZ_QUESTIONS),
             'duration_minutes': 45,
         }
     return render(request, 'lms/quiz.html', context)
@@ -418,142 +638,76 @@ def quiz_submit(request, mock_test_id=None):
             }
         )
 
-        import json
         answers_str = request.POST.get('answers', '{}')
         try:
             answers = json.loads(answers_str) if answers_str else {}
         except json.JSONDecodeError:
             answers = {}
+        if not isinstance(answers, dict):
+            return JsonResponse({'success': False, 'message': 'answers must be a JSON object.'}, status=400)
+
+        if submission_mode() == 'queued':
+            if mock_test_id:
+                get_object_or_404(MockTest.objects.only('id'), id=mock_test_id, is_active=True)
+            receipt = get_queue().enqueue(student.id, mock_test_id, answers)
+            return redirect('lms:quiz_result', receipt=receipt)
 
         if mock_test_id:
             # Handle mock test submission
-            mock_test = get_object_or_404(MockTest, id=mock_test_id, is_active=True)
-            questions = mock_test.questions
-
-            score = 0
-            total_questions = len(questions)
-            results = []
-
-            for i, question in enumerate(questions):
-                user_answer = answers.get(str(i), '')
-                correct = question['correct']
-                is_correct = user_answer == correct
-                if is_correct:
-                    score += 1
-                results.append({
-                    'question_number': i + 1,
-                    'user_answer': user_answer,
-                    'correct_answer': correct,
-                    'is_correct': is_correct
-                })
-
-            percentage = (score / total_questions) * 100 if total_questions > 0 else 0
-            incorrect = total_questions - score
-
-            # Get the next attempt number for this student and mock test
-            last_attempt = StudentMockTest.objects.filter(
-                student=student,
-                mock_test=mock_test
-            ).order_by('-attempt_number').first()
-
-            attempt_number = (last_attempt.attempt_number + 1) if last_attempt else 1
+            mock_test = get_object_or_404(with_raw_questions(MockTest.objects), id=mock_test_id, is_active=True)
+            grade = get_mock_test_answer_key(mock_test).grade(answers)
 
             # Save to StudentMockTest (always create new record for each attempt)
-            student_mock_test = StudentMockTest.objects.create(
-                student=student,
-                mock_test=mock_test,
-                score=score,
-                max_score=mock_test.total_marks,
-                answers=answers,
-                submitted_at=timezone.now(),
-                is_completed=True,
-                attempt_number=attempt_number
-            )
-
-            context = {
-                'mock_test': mock_test,
-                'score': score,
-                'total_questions': total_questions,
-                'percentage': round(percentage, 1),
-                'incorrect': incorrect,
-                'results': results
-            }
+            with transaction.atomic():
+                student_mock_test = StudentMockTest.objects.create(
+                    student=student,
+                    mock_test=mock_test,
+                    score=grade.score,
+                    max_score=mock_test.total_marks,
+                    answers=answers,
+                    submitted_at=timezone.now(),
+                    is_completed=True,
+                    attempt_number=allocate_attempt_number(student.id, mock_test.id)
+                )
+
+            context = {'mock_test': mock_test, **grade_context(grade)}
         else:
             # Default quiz (existing behavior)
-            questions = [
-                {'correct': '14'},
-                {'correct': 'def'},
-                {'correct': 'Returns the length of a string or list'},
-                {'correct': 'List'},
-                {'correct': '# This is a comment'},
-                {'correct': 'Executes code if a condition is true'},
-                {'correct': 'print'},
-                {'correct': '3'},
-                {'correct': '[]'},
-                {'correct': 'Ends a loop prematurely'}
-            ]
-
-            score = 0
-            total_questions = len(questions)
-            results = []
-
-            for i, question in enumerate(questions):
-                user_answer = answers.get(str(i), '')
-                correct = question['correct']
-                is_correct = user_answer == correct
-                if is_correct:
-                    score += 1
-                results.append({
-                    'question_number': i + 1,
-                    'user_answer': user_answer,
-                    'correct_answer': correct,
-                    'is_correct': is_correct
-                })
-
-            percentage = (score / total_questions) * 100
-            incorrect = total_questions - score
+            grade = DEFAULT_ANSWER_KEY.grade(answers)
 
             # Save to database
-            assessment, created = Assessment.objects.get_or_create(
-                title='Python Basics Quiz',
-                defaults={
-                    'description': 'Test your knowledge of Python fundamentals',
-                    'topic': 'Python Programming',
-                    'total_marks': 10,
-                    'duration_minutes': 45,
-                    'due_date': timezone.now() + timezone.timedelta(days=30),
-                    'is_active': True
-                }
-            )
+            save_default_quiz_result(student, answers, grade.score)
 
-            student_assessment, created = StudentAssessment.objects.get_or_create(
-                student=student,
-                assessment=assessment,
-                defaults={
-                    'max_score': 10,
-                    'answers': answers,
-                    'submitted_at': timezone.now(),
-                    'is_completed': True
-                }
-            )
-            student_assessment.score = score
-            student_assessment.answers = answers
-            student_assessment.submitted_at = timezone.now()
-            student_assessment.is_completed = True
-            student_assessment.save()
-
-            context = {
-                'score': score,
-                'total_questions': total_questions,
-                'percentage': round(percentage, 1),
-                'incorrect': incorrect,
-                'results': results
-            }
+            context = grade_context(grade)
 
         return render(request, 'lms/quiz_results.html', context)
 
     return JsonResponse({'error': 'Invalid request method'})
 
+def _queued_submission(request, receipt):
+    student = get_object_or_404(Student, user=request.user)
+    submission = get_queue().get(receipt)
+    if submission is None or submission['student_id'] != student.id:
+        raise Http404("Submission not found")
+    return submission
+
+@login_required
+def quiz_result(request, receipt):
+    submission = _queued_submission(request, receipt)
+    if submission['status'] != 'done':
+        context = {'receipt': receipt, 'status': submission['status'], 'error': submission['error']}
+        return render(request, 'lms/quiz_pending.html', context)
+
+    context = dict(submission['result'])
+    if context.pop('mock_test_id', None):
+        context['mock_test'] = get_object_or_404(MockTest, id=submission['mock_test_id'])
+    return render(request, 'lms/quiz_results.html', context)
+
+@login_required
+def quiz_result_status(request, receipt):
+    submission = _queued_submission(request, receipt)
+    return JsonResponse({'receipt': receipt, 'status': submission['status'], 'error': submission['error']})
+
 @login_required
 def schedule_mock_interview(request):
     if request.method == 'POST':
@@ -588,11 +742,12 @@ def cancel_mock_interview(request, interview_id):
 
     return JsonResponse({'success': False, 'message': 'Invalid request method.'})
 
-@login_required
-def internship_agenda(request):
-    agenda_items = InternshipAgenda.objects.all()
-    context = {'agenda_items': agenda_items}
-    return render(request, 'lms/internship_agenda.html', context)
+@query_budget(4)
+@read_replica
+@async_login_required
+async def internship_agenda(request):
+    context = {'catalog_html': await acatalog_fragment('internship_agenda')}
+    return await arender(request, 'lms/internship_agenda.html', context)
 
 @login_required
 def download_offer_letter(request):
@@ -600,87 +755,23 @@ def download_offer_letter(request):
     offer_letter = OfferLetter.objects.filter(student=student).order_by('-issued_date').first()
     if not offer_letter:
         raise Http404("Offer letter not found")
-
-    # Create a buffer for the PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-
-    # Define custom styles
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        alignment=1,  # Center alignment
+    offer_letter.student = student
+
+    etag = quote_etag(offer_letter_hash(offer_letter))
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    # Serve the cached PDF, rendering it only when the letter's data changed
+    pdf_file = get_offer_letter_pdf(offer_letter)
+    response = FileResponse(
+        pdf_file,
+        as_attachment=True,
+        filename=f'offer_letter_{student.full_name.replace(" ", "_")}.pdf',
+        content_type='application/pdf',
     )
-    company_style = ParagraphStyle(
-        'Company',
-        parent=styles['Normal'],
-        fontSize=14,
-        spaceAfter=20,
-        alignment=1,
-    )
-    normal_style = styles['Normal']
-    bold_style = styles['Heading4']
-
-    # Build the PDF content
-    content = []
-
-    # Company header
-    content.append(Paragraph("Manac Infotech Pvt Ltd", title_style))
-    content.append(Paragraph("Excellence in Technology", company_style))
-    content.append(Spacer(1, 0.5*inch))
-
-    # Date
-    content.append(Paragraph(f"Date: {offer_letter.issued_date.strftime('%B %d, %Y')}", normal_style))
-    content.append(Spacer(1, 0.5*inch))
-
-    # Salutation
-    content.append(Paragraph(f"Dear {student.full_name},", bold_style))
-    content.append(Spacer(1, 0.25*inch))
-
-    # Body
-    content.append(Paragraph(f"We are delighted to extend this offer of employment for the position of <b>{offer_letter.title}</b> with {offer_letter.company}. We were very impressed with your background and skills, and we are confident that you will make a significant contribution to our team.", normal_style))
-    content.append(Spacer(1, 0.25*inch))
-
-    # Offer details table
-    data = [
-        ['Start Date', offer_letter.start_date.strftime('%B %d, %Y')],
-        ['Compensation', f"₹{offer_letter.compensation}/Month"],
-        ['Reporting To', offer_letter.reporting_to],
-        ['Location', offer_letter.location],
-    ]
-
-    table = Table(data, colWidths=[2*inch, 3*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ]))
-    content.append(table)
-    content.append(Spacer(1, 0.25*inch))
-
-    # Closing
-    content.append(Paragraph("Please review the attached document for full terms and conditions. By accepting this offer, you agree to the policies and procedures of our company.", normal_style))
-    content.append(Spacer(1, 0.5*inch))
-    content.append(Paragraph("Sincerely,", normal_style))
-    content.append(Paragraph("Manac Infotech Pvt Ltd", bold_style))
-
-    # Build the PDF
-    doc.build(content)
-
-    # Get the PDF data
-    pdf_data = buffer.getvalue()
-    buffer.close()
-
-    # Create the HTTP response
-    response = HttpResponse(pdf_data, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="offer_letter_{student.full_name.replace(" ", "_")}.pdf"'
-
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
     return response
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,7 +42,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'lms.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'lms.middleware.ReadReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -63,24 +66,112 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'lms.context_processors.notification_badge',
+                'lms.context_processors.live_events',
             ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'manac_lms.wsgi.application'
+ASGI_APPLICATION = 'manac_lms.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# LMS_DATABASE_PATH points the default database at another file, e.g. a
+# scratch database for `manage.py seed_benchmark_data` and `manage.py benchmark`.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('LMS_DATABASE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# LMS_DATABASE_PROFILE=sqlite-prod tunes SQLite for many concurrent users:
+# persistent connections, a busy timeout instead of immediate "database is
+# locked" errors, the pragmas below (applied by lms/db.py on every new
+# connection) and a 'readonly' alias for read-heavy views.
+LMS_DATABASE_PROFILE = os.environ.get('LMS_DATABASE_PROFILE', 'default')
+LMS_SQLITE_PRAGMAS = {}
+LMS_READ_DATABASE = 'default'
+
+if LMS_DATABASE_PROFILE == 'sqlite-prod':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'timeout': 20},
+    })
+    DATABASES['readonly'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f"file:{DATABASES['default']['NAME']}?mode=ro",
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'timeout': 20},
+        'TEST': {'MIRROR': 'default'},
+    }
+    LMS_SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,  # 256 MB
+        'cache_size': -65536,  # 64 MB
+        'temp_store': 'MEMORY',
+    }
+    LMS_READ_DATABASE = 'readonly'
+
+# LMS_REPLICA_DATABASE_PATH points a 'replica' alias at a read-only copy of the
+# database (kept in sync by e.g. Litestream or LiteFS). Views marked with
+# lms.db.read_replica, or named in LMS_REPLICA_VIEWS, read from it; a client is
+# pinned to the primary for LMS_PRIMARY_PIN_SECONDS after each write.
+LMS_REPLICA_DATABASE_PATH = os.environ.get('LMS_REPLICA_DATABASE_PATH')
+LMS_REPLICA_VIEWS = []
+LMS_PRIMARY_PIN_SECONDS = 10
+
+if LMS_REPLICA_DATABASE_PATH:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{LMS_REPLICA_DATABASE_PATH}?mode=ro',
+        'CONN_MAX_AGE': DATABASES['default'].get('CONN_MAX_AGE', 0),
+        'OPTIONS': {'timeout': 20},
+        'TEST': {'MIRROR': 'default'},
+    }
+    LMS_READ_DATABASE = 'replica'
+
+DATABASE_ROUTERS = ['lms.db.ReadReplicaRouter']
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+#
+# LMS_CACHE_BACKEND selects 'locmem' (per process), 'file' (shared by every
+# process on the host) or 'redis' (a local redis-server or compatible stand-in
+# such as Valkey, at LMS_REDIS_URL; needs the redis package). The sqlite-prod
+# profile runs several web processes, so it defaults to the shared file cache.
+
+LMS_CACHE_BACKEND = os.environ.get(
+    'LMS_CACHE_BACKEND', 'file' if LMS_DATABASE_PROFILE == 'sqlite-prod' else 'locmem',
+)
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'manac-lms',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('LMS_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[LMS_CACHE_BACKEND],
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -121,6 +212,10 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+# Uploaded and generated files (study materials, offer letters, certificates)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -131,5 +226,78 @@ LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/login/'
 
+# Seconds a cached dashboard summary stays valid (see lms/summaries.py)
+LMS_DASHBOARD_SUMMARY_TIMEOUT = 300
+
+# Seconds a rendered catalog listing stays cached; entries are versioned, so
+# this only bounds how long stale versions linger (see lms/catalog.py)
+LMS_CATALOG_CACHE_TIMEOUT = 86400
+
+# Study material downloads (lms/downloads.py): None serves files from Django;
+# 'x-accel-redirect' (nginx, internal location at LMS_DOWNLOAD_ACCEL_PREFIX
+# aliased to MEDIA_ROOT) or 'x-sendfile' (Apache/lighttpd) hands them off
+LMS_DOWNLOAD_OFFLOAD = None
+LMS_DOWNLOAD_ACCEL_PREFIX = '/protected-media/'
+
+# Chunked study material uploads (lms/uploads.py): where partial files are
+# kept, size limits in bytes, and whether finished uploads are processed on a
+# background thread (otherwise run `manage.py process_uploads`)
+LMS_UPLOAD_TEMP_DIR = BASE_DIR / 'upload_parts'
+LMS_UPLOAD_MAX_SIZE = 1024 * 1024 * 1024
+LMS_UPLOAD_MAX_CHUNK_SIZE = 16 * 1024 * 1024
+LMS_UPLOAD_PROCESS_IN_PROCESS = True
+
+# Full-text search backend (lms/search.py); use lms.search.DatabaseSearchBackend
+# on databases without SQLite FTS5
+LMS_SEARCH_BACKEND = 'lms.search.SQLiteFTSBackend'
+
+# Seconds a cached unread notification count stays valid (see lms/notifications.py)
+LMS_UNREAD_COUNT_TIMEOUT = 60
+
+# 'sync' grades quiz submissions inside the request; 'queued' appends them to
+# the local submission queue for the process_quiz_submissions worker
+LMS_QUIZ_SUBMISSION_MODE = 'sync'
+LMS_SUBMISSION_QUEUE_PATH = BASE_DIR / 'submission_queue.sqlite3'
+# Seconds before a worker's claim on queued submissions may be taken over
+# (claims of workers whose process has exited are released at once)
+LMS_SUBMISSION_CLAIM_TIMEOUT = 600
+
+# Deliver broadcasts on a background thread of the web process; turn off to
+# leave them pending for `manage.py broadcast_notification --pending`
+LMS_BROADCAST_IN_PROCESS = True
+# Seconds after which a broadcast still 'sending' counts as abandoned and is
+# resumed by `manage.py broadcast_notification --pending`
+LMS_BROADCAST_STALE_AFTER = 600
+
+# Live events (lms/events.py): whether pages served by the ASGI app open the
+# event stream, the broker class, heartbeat and stream lifetime in seconds
+LMS_LIVE_EVENTS = True
+LMS_EVENT_BROKER = 'lms.events.InProcessBroker'
+LMS_EVENT_STREAM_HEARTBEAT = 15
+LMS_EVENT_STREAM_MAX_DURATION = 300
+
+# Per-request query instrumentation (lms/instrumentation.py): record query
+# counts and database time, add them as Server-Timing headers, and log queries
+# slower than LMS_SLOW_QUERY_MS milliseconds and blown query budgets to the
+# lms.queries logger (LMS_QUERY_LOG_LEVEL=INFO adds one line per request)
+LMS_QUERY_INSTRUMENTATION = True
+LMS_SERVER_TIMING = True
+LMS_SLOW_QUERY_MS = 100
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'lms.queries': {
+            'handlers': ['console'],
+            'level': os.environ.get('LMS_QUERY_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 # Email settings (for development)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
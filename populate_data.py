@@ -9,6 +9,8 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'manac_lms.settings')
 django.setup()
 
 from django.contrib.auth.models import User
+from lms.catalog import bump_catalog_version
+from lms.summaries import invalidate_student_summaries
 from lms.models import Student, Session, Attendance, Assessment, StudentAssessment, Project, StudyMaterial, Notification
 
 # Get or create a user
@@ -186,13 +188,16 @@ for session_data in sessions_data:
 # Create Attendance for past sessions
 past_sessions = Session.objects.filter(is_completed=True)
 all_students = [student] + additional_students
-for session in past_sessions:
-    for stud in all_students:
-        Attendance.objects.get_or_create(
-            student=stud,
-            session=session,
-            defaults={'is_present': random.choice([True, False])}
-        )
+Attendance.objects.bulk_create(
+    [
+        Attendance(student=stud, session=session, is_present=random.choice([True, False]))
+        for session in past_sessions
+        for stud in all_students
+    ],
+    ignore_conflicts=True,
+)
+# bulk_create() bypasses the model signals that drop cached dashboard summaries.
+invalidate_student_summaries([stud.id for stud in all_students])
 
 # Create Assessments
 assessments_data = [
@@ -360,4 +365,7 @@ for material_data in study_materials_data:
         defaults=material_data
     )
 
+# Make the cached catalog pages pick up the new rows (needs a shared cache, see lms/catalog.py)
+bump_catalog_version(Session, StudyMaterial)
+
 print("Sample data populated successfully!")
@@ -5,6 +5,7 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'manac_lms.settings')
 django.setup()
 
+from lms.catalog import bump_catalog_version
 from lms.models import InternshipAgenda
 
 def populate_agenda():
@@ -81,6 +82,9 @@ def populate_agenda():
         first_item.responsibilities = responsibilities
         first_item.save()
 
+    # Make the cached agenda page pick up the new rows (needs a shared cache, see lms/catalog.py)
+    bump_catalog_version(InternshipAgenda)
+
     print("Internship agenda populated successfully!")
 
 if __name__ == '__main__':